@@ -0,0 +1,76 @@
+"""
+Compare block_to_block_type against the original regex-per-line classifier
+on documents made of long lists.
+
+Usage: python3 bench/bench_blocks.py [--items 10 100 1000] [--blocks 200] [--repeat 5]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simple_static_gen.block_markdown import block_to_block_type
+from simple_static_gen.inline_markdown import markdown_to_blocks
+from simple_static_gen.textnode import BlockType
+
+
+def original_block_to_block_type(block):
+    """The classifier block_to_block_type used to be."""
+    if re.match(r'^#{1,6} ', block):
+        return BlockType.HEADING
+    if block.startswith('```') and block.endswith('```'):
+        lines = block.split('\n')
+        if len(lines) >= 3 and lines[0] == '```' and lines[-1] == '```':
+            return BlockType.CODE
+    lines = block.split('\n')
+    if all(line.startswith('> ') or line == '>' for line in lines):
+        return BlockType.QUOTE
+    if all(line.startswith('- ') for line in lines):
+        return BlockType.UNORDERED_LIST
+    if all(re.match(rf'^{i}\. ', line) for i, line in enumerate(lines, start=1)):
+        return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
+
+
+def make_document(items, blocks):
+    parts = []
+    for i in range(blocks):
+        if i % 3 == 0:
+            parts.append("\n".join(f"{n}. ordered item {n}" for n in range(1, items + 1)))
+        elif i % 3 == 1:
+            parts.append("\n".join(f"- unordered item {n}" for n in range(items)))
+        else:
+            parts.append("A paragraph between the lists\nwith two lines")
+    return "\n\n".join(parts)
+
+
+def best_time(func, blocks, repeat):
+    return min(timeit.repeat(lambda: [func(block) for block in blocks], number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--blocks", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'original (ms)':>15} {'dispatch (ms)':>15} {'speedup':>9}")
+    for items in args.items:
+        blocks = markdown_to_blocks(make_document(items, args.blocks))
+        assert [original_block_to_block_type(b) for b in blocks] == [
+            block_to_block_type(b) for b in blocks
+        ]
+        original = best_time(original_block_to_block_type, blocks, args.repeat)
+        dispatch = best_time(block_to_block_type, blocks, args.repeat)
+        print(
+            f"{items:>8} {original * 1000:>15.2f} {dispatch * 1000:>15.2f}"
+            f" {original / dispatch:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Time ParentNode.to_html and write_html on wide lists and deep trees to check
+that serialization stays linear in the number of nodes.
+
+Usage: python3 bench/bench_html.py [--items 1000 10000 100000] [--repeat 3]
+"""
+import argparse
+import io
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simple_static_gen.htmlnode import LeafNode, ParentNode
+
+
+def make_list(items):
+    return ParentNode(
+        "ul",
+        [
+            ParentNode("li", [LeafNode("a", f"Entry {i}", {"href": f"/posts/{i}"})])
+            for i in range(items)
+        ],
+    )
+
+
+def best_time(func, repeat):
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'items':>8} {'to_html (ms)':>14} {'write_html (ms)':>16} {'us/item':>9}")
+    for items in args.items:
+        node = make_list(items)
+        to_html = best_time(node.to_html, args.repeat)
+        write_html = best_time(lambda: node.write_html(io.StringIO()), args.repeat)
+        print(
+            f"{items:>8} {to_html * 1000:>14.2f} {write_html * 1000:>16.2f}"
+            f" {to_html / items * 1e6:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Compare the single-pass text_to_textnodes tokenizer against the old chain of
+split_nodes_* passes on paragraphs with a growing number of links.
+
+Usage: python3 bench/bench_inline.py [--links 10 100 500] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from simple_static_gen.textnode import TextNode, TextType
+from simple_static_gen.inline_markdown import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+
+
+def chained_text_to_textnodes(text):
+    """The multi-pass tokenizer text_to_textnodes used to be."""
+    nodes = [TextNode(text.strip(), TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+def make_paragraph(links):
+    parts = []
+    for i in range(links):
+        parts.append(f"Some **bold {i}** text and a [link {i}](/posts/{i}) then `code`")
+        if i % 10 == 0:
+            parts.append(f"![image {i}](/images/{i}.png)")
+    return " ".join(parts)
+
+
+def best_time(func, text, repeat):
+    return min(timeit.repeat(lambda: func(text), number=1, repeat=repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--links", type=int, nargs="+", default=[10, 100, 500, 2000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'links':>8} {'chained (ms)':>14} {'single (ms)':>13} {'speedup':>9}")
+    for links in args.links:
+        text = make_paragraph(links)
+        assert chained_text_to_textnodes(text) == text_to_textnodes(text)
+        chained = best_time(chained_text_to_textnodes, text, args.repeat)
+        single = best_time(text_to_textnodes, text, args.repeat)
+        print(f"{links:>8} {chained * 1000:>14.2f} {single * 1000:>13.2f} {chained / single:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Measure the memory used to parse and render markdown pages: the size of the
+live TextNode/HTMLNode trees, the number of allocations, the tracemalloc peak
+and the peak RSS of a fresh process per page.
+
+Usage: python3 bench/bench_memory.py [FILE.md ...] [--synthetic-blocks 5000]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tracemalloc
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SRC_DIR)
+
+
+def make_synthetic_post(blocks):
+    parts = ["# Synthetic post"]
+    for i in range(blocks):
+        if i % 4 == 0:
+            parts.append("\n".join(f"- item {j} with a [link](/posts/{j})" for j in range(5)))
+        elif i % 4 == 1:
+            parts.append(f"> Quote {i} with **bold** and _italic_ text")
+        else:
+            parts.append(
+                f"Paragraph {i} with **bold**, `code`, a [link](/posts/{i}) and "
+                f"an ![image](/images/{i}.png) in it."
+            )
+    return "\n\n".join(parts)
+
+
+def measure(markdown):
+    """Build the node tree for markdown in this process and measure it."""
+    from simple_static_gen.block_markdown import markdown_to_html_node
+
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    node = markdown_to_html_node(markdown)
+    after = tracemalloc.take_snapshot()
+    tree_bytes, _ = tracemalloc.get_traced_memory()
+    html = node.to_html()
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    allocations = sum(stat.count_diff for stat in stats)
+    return {
+        "html_bytes": len(html),
+        "tree_kib": round(tree_bytes / 1024, 1),
+        "tree_allocations": allocations,
+        "peak_kib": round(peak_bytes / 1024, 1),
+        "peak_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "rss_growth_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline_rss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("files", nargs="*")
+    parser.add_argument("--synthetic-blocks", type=int, default=5000)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        if args.child == "-":
+            markdown = make_synthetic_post(args.synthetic_blocks)
+        else:
+            with open(args.child) as f:
+                markdown = f.read()
+        print(json.dumps(measure(markdown)))
+        return
+
+    pages = args.files or ["-"]
+    print(
+        f"{'page':<32} {'tree KiB':>9} {'allocs':>8} {'peak KiB':>9}"
+        f" {'RSS KiB':>8} {'RSS +KiB':>9}"
+    )
+    for page in pages:
+        # A fresh interpreter per page so that ru_maxrss is the page's own peak
+        output = subprocess.run(
+            [sys.executable, __file__, "--child", page,
+             "--synthetic-blocks", str(args.synthetic_blocks)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output)
+        name = f"synthetic ({args.synthetic_blocks} blocks)" if page == "-" else page
+        print(
+            f"{name[-32:]:<32} {result['tree_kib']:>9} {result['tree_allocations']:>8}"
+            f" {result['peak_kib']:>9} {result['peak_rss_kib']:>8} {result['rss_growth_kib']:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
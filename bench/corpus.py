@@ -0,0 +1,174 @@
+"""
+Generate a synthetic site (content/, static/ and template.html) for
+benchmarking the generator.
+
+Usage: python3 bench/corpus.py OUTPUT_DIR [--pages 1000] [--blocks 30]
+       [--link-density 0.3] [--depth 3] [--assets 20] [--seed 0]
+"""
+import argparse
+import os
+import random
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+# Relative weights of each block type in generated pages
+DEFAULT_BLOCK_MIX = {
+    "paragraph": 50,
+    "heading": 15,
+    "unordered_list": 10,
+    "ordered_list": 10,
+    "quote": 10,
+    "code": 5,
+}
+
+WORDS = (
+    "the road goes ever on and on down from the door where it began now far "
+    "ahead has gone and i must follow if i can pursuing it with eager feet "
+    "until it joins some larger way where many paths and errands meet"
+).split()
+
+
+class _PageWriter:
+    def __init__(self, rng, page_urls, asset_urls, link_density):
+        self.rng = rng
+        self.page_urls = page_urls
+        self.asset_urls = asset_urls
+        self.link_density = link_density
+
+    def words(self, count):
+        return " ".join(self.rng.choice(WORDS) for _ in range(count))
+
+    def inline_text(self, words=20):
+        """A run of text with inline markup; link_density is links per 10 words."""
+        parts = []
+        for _ in range(max(1, words // 10)):
+            parts.append(self.words(8))
+            roll = self.rng.random()
+            if roll < self.link_density:
+                parts.append(f"[{self.words(2)}]({self.rng.choice(self.page_urls)})")
+            elif roll < self.link_density + 0.05 and self.asset_urls:
+                parts.append(f"![{self.words(2)}]({self.rng.choice(self.asset_urls)})")
+            elif roll < self.link_density + 0.2:
+                parts.append(f"**{self.words(2)}**")
+            elif roll < self.link_density + 0.3:
+                parts.append(f"_{self.words(2)}_")
+            elif roll < self.link_density + 0.4:
+                parts.append(f"`{self.words(1)}`")
+        return " ".join(parts)
+
+    def block(self, block_type):
+        rng = self.rng
+        if block_type == "heading":
+            return "#" * rng.randint(2, 6) + " " + self.words(4)
+        if block_type == "unordered_list":
+            return "\n".join(f"- {self.inline_text(10)}" for _ in range(rng.randint(2, 8)))
+        if block_type == "ordered_list":
+            return "\n".join(
+                f"{i}. {self.inline_text(10)}" for i in range(1, rng.randint(2, 8) + 1)
+            )
+        if block_type == "quote":
+            return "\n".join(f"> {self.inline_text(10)}" for _ in range(rng.randint(1, 4)))
+        if block_type == "code":
+            lines = [f"    {self.words(5)}" for _ in range(rng.randint(2, 10))]
+            return "```\n" + "\n".join(lines) + "\n```"
+        return "\n".join(self.inline_text(30) for _ in range(rng.randint(1, 4)))
+
+    def page(self, title, blocks, block_mix):
+        types = list(block_mix)
+        weights = [block_mix[block_type] for block_type in types]
+        parts = [f"# {title}"]
+        for block_type in self.rng.choices(types, weights, k=blocks):
+            parts.append(self.block(block_type))
+        return "\n\n".join(parts) + "\n"
+
+
+def _page_path(index, depth, fanout=10):
+    """Spread pages over nested directories, depth levels deep."""
+    directories = [f"section{(index // fanout ** level) % fanout}" for level in range(depth)]
+    return os.path.join(*directories, f"post{index}", "index.md")
+
+
+def generate_corpus(root, pages=1000, blocks=30, link_density=0.3, depth=3, assets=20,
+                    block_mix=None, seed=0):
+    """
+    Write a synthetic site into root and return the number of files written.
+    The output only depends on the arguments, so runs are comparable.
+    """
+    rng = random.Random(seed)
+    block_mix = block_mix or DEFAULT_BLOCK_MIX
+    content_dir = os.path.join(root, "content")
+    static_dir = os.path.join(root, "static")
+
+    page_paths = [_page_path(i, depth) for i in range(pages)]
+    page_urls = ["/" + os.path.dirname(path).replace(os.sep, "/") for path in page_paths]
+    asset_urls = [f"/images/asset{i}.png" for i in range(assets)]
+
+    os.makedirs(os.path.join(static_dir, "images"), exist_ok=True)
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+    with open(os.path.join(static_dir, "index.css"), "w") as f:
+        f.write("body { font-family: sans-serif; }\n" * 50)
+    for i in range(assets):
+        with open(os.path.join(static_dir, "images", f"asset{i}.png"), "wb") as f:
+            f.write(rng.randbytes(rng.randint(1024, 64 * 1024)))
+
+    writer = _PageWriter(rng, page_urls, asset_urls, link_density)
+    for i, path in enumerate(page_paths):
+        full_path = os.path.join(content_dir, path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        with open(full_path, "w") as f:
+            f.write(writer.page(f"Post {i}", blocks, block_mix))
+    with open(os.path.join(content_dir, "index.md"), "w") as f:
+        f.write(writer.page("Home", blocks, block_mix))
+
+    return pages + assets + 3
+
+
+def parse_block_mix(text):
+    """Parse a block mix such as "paragraph=5,code=1"."""
+    mix = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        if name not in DEFAULT_BLOCK_MIX:
+            raise argparse.ArgumentTypeError(f"unknown block type: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def add_corpus_arguments(parser):
+    parser.add_argument("--pages", type=int, default=1000, help="number of pages")
+    parser.add_argument("--blocks", type=int, default=30, help="blocks per page")
+    parser.add_argument("--link-density", type=float, default=0.3,
+                        help="probability of a link per ten words")
+    parser.add_argument("--depth", type=int, default=3, help="directory nesting depth")
+    parser.add_argument("--assets", type=int, default=20, help="number of static images")
+    parser.add_argument("--block-mix", type=parse_block_mix, default=None,
+                        help='relative weights of block types, e.g. "paragraph=5,code=1"')
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("output")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    count = generate_corpus(
+        args.output, args.pages, args.blocks, args.link_density, args.depth, args.assets,
+        args.block_mix, args.seed,
+    )
+    print(f"Wrote {count} files to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
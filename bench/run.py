@@ -0,0 +1,158 @@
+"""
+Run the benchmark suite on a synthetic corpus and store the results as JSON.
+
+Times the whole build (src/main.py, run as a subprocess on the corpus) and
+micro-benchmarks the parser and HTML stages on the corpus pages. With
+--compare, exits non-zero if any benchmark got slower than the baseline by
+more than --threshold.
+
+Usage: python3 bench/run.py [--pages 1000] [--repeat 5] [--output FILE]
+       [--compare BASELINE.json] [--threshold 0.10]
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_DIR, "src"))
+
+from simple_static_gen.block_markdown import (
+    block_to_block_type,
+    iter_blocks,
+    markdown_to_html_node,
+)
+from simple_static_gen.inline_markdown import markdown_to_blocks, text_to_textnodes
+from simple_static_gen.textnode import BlockType
+from corpus import add_corpus_arguments, generate_corpus
+
+DEFAULT_OUTPUT = os.path.join(REPO_DIR, ".cache", "bench", "latest.json")
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def time_build(site_dir, repeat):
+    """Best wall clock time of a full, uncached build of the site."""
+    command = [sys.executable, os.path.join(REPO_DIR, "src", "main.py"), "--no-cache"]
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=site_dir, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def read_pages(content_dir):
+    pages = []
+    for dir_path, _, file_names in os.walk(content_dir):
+        for file_name in sorted(file_names):
+            if file_name.endswith(".md"):
+                with open(os.path.join(dir_path, file_name)) as f:
+                    pages.append(f.read())
+    return pages
+
+
+def micro_benchmarks(pages, repeat):
+    """Best time of one pass of each stage over every page in the corpus."""
+    blocks = [block for page in pages for block in markdown_to_blocks(page)]
+    paragraphs = [b for b in blocks if block_to_block_type(b) == BlockType.PARAGRAPH]
+    nodes = [markdown_to_html_node(page) for page in pages]
+
+    stages = {
+        "markdown_to_blocks": lambda: [markdown_to_blocks(page) for page in pages],
+        "block_to_block_type": lambda: [block_to_block_type(block) for block in blocks],
+        "iter_blocks": lambda: [list(iter_blocks(page)) for page in pages],
+        "iter_blocks (lines)": lambda: [list(iter_blocks(page.splitlines(True))) for page in pages],
+        "text_to_textnodes": lambda: [text_to_textnodes(text) for text in paragraphs],
+        "ParentNode.to_html": lambda: [node.to_html() for node in nodes],
+    }
+    return {
+        name: min(timeit.repeat(stage, number=1, repeat=repeat)) for name, stage in stages.items()
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print how each benchmark moved and return the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<24} {'baseline ms':>12} {'current ms':>12} {'change':>9}")
+    for name, seconds in results["benchmarks"].items():
+        before = baseline["benchmarks"].get(name)
+        if not before:
+            continue
+        change = seconds / before - 1
+        flag = "  REGRESSION" if change > threshold else ""
+        print(f"{name:<24} {before * 1000:>12.2f} {seconds * 1000:>12.2f} {change:>+8.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="where to write the results")
+    parser.add_argument("--compare", metavar="BASELINE", help="results of an earlier run")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown that counts as a regression, as a fraction")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as site_dir:
+        generate_corpus(
+            site_dir, args.pages, args.blocks, args.link_density, args.depth, args.assets,
+            args.block_mix, args.seed,
+        )
+        benchmarks = {"build": time_build(site_dir, args.repeat)}
+        benchmarks.update(micro_benchmarks(read_pages(os.path.join(site_dir, "content")), args.repeat))
+
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "corpus": {
+            "pages": args.pages,
+            "blocks": args.blocks,
+            "link_density": args.link_density,
+            "depth": args.depth,
+            "assets": args.assets,
+            "block_mix": args.block_mix,
+            "seed": args.seed,
+        },
+        "benchmarks": benchmarks,
+    }
+
+    print(f"{'benchmark':<24} {'best ms':>12}")
+    for name, seconds in benchmarks.items():
+        print(f"{name:<24} {seconds * 1000:>12.2f}")
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=1)
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != results["corpus"]:
+            print("warning: the baseline was measured on a different corpus")
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,2 +1,2 @@
 #!/bin/bash
-python3 src/main.py "/simple-static-gen/"
\ No newline at end of file
+python3 src/main.py "/simple-static-gen/" --site-url https://victoralexander132.github.io
\ No newline at end of file
@@ -1,48 +0,0 @@
-class HTMLNode:
-    def __init__(self, tag=None, value=None, children=None, props=None):
-        self.tag = tag
-        self.value = value
-        self.children = children
-        self.props = props
-
-    def to_html(self):
-        raise NotImplementedError
-
-    def props_to_html(self):
-        if self.props is None:
-            return ""
-        props_html = ""
-        for key, value in self.props.items():
-            props_html += f' {key}="{value}"'
-        return props_html
-
-    def __repr__(self):
-        return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
-
-
-class LeafNode(HTMLNode):
-    def __init__(self, tag, value, props=None):
-        super().__init__(tag, value, None, props)
-
-    def to_html(self):
-        if self.value is None:
-            raise ValueError("Value is required")
-        if self.tag is None:
-            return self.value
-        else:
-            return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
-
-
-class ParentNode(HTMLNode):
-    def __init__(self, tag, children, props=None):
-        super().__init__(tag, None, children, props)
-
-    def to_html(self):
-        if self.tag is None:
-            raise ValueError("Tag is required")
-        if self.children is None:
-            raise ValueError("Children are required")
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
@@ -0,0 +1 @@
+"""A static site generator that converts Markdown files to HTML pages."""
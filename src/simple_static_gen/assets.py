@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+
+from .manifest import GENERATOR_VERSION, hash_file
+from .sync import copy_file, list_files
+
+ASSETS_PATH = os.path.join(".cache", "assets.json")
+
+# Files given content-hashed names. Other static files, such as robots.txt or
+# favicon.ico, are looked up by well-known names and keep them.
+FINGERPRINT_EXTENSIONS = {
+    ".css", ".js", ".mjs", ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".avif",
+    ".ico", ".woff", ".woff2", ".ttf", ".otf",
+}
+HASH_LENGTH = 8
+
+
+def fingerprinted_name(rel_path, digest):
+    """images/logo.png -> images/logo.<hash>.png"""
+    base, extension = os.path.splitext(rel_path)
+    return f"{base}.{digest[:HASH_LENGTH]}{extension}"
+
+
+class AssetManifest:
+    """
+    Maps the site-absolute URL of every fingerprinted static file to its
+    content-hashed URL, e.g. "/index.css" -> "/index.3f2a9c1d.css".
+    """
+
+    def __init__(self, urls=None, files=None):
+        self.urls = urls or {}
+        # Hashes of the static files by relative path, with the size and
+        # mtime they were computed for, so unchanged files aren't read again
+        self.files = files or {}
+        self.digest = self._digest()
+
+    def _digest(self):
+        data = json.dumps(self.urls, sort_keys=True).encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def lookup(self, url):
+        """The fingerprinted form of url, keeping any query or fragment, or url itself."""
+        end = len(url)
+        for separator in "?#":
+            position = url.find(separator)
+            if position != -1:
+                end = min(end, position)
+        fingerprinted = self.urls.get(url[:end])
+        return url if fingerprinted is None else fingerprinted + url[end:]
+
+    def outputs(self, dest_dir):
+        """The paths the fingerprinted copies are written to."""
+        return [os.path.join(dest_dir, *url[1:].split("/")) for url in self.urls.values()]
+
+    def save(self, path=ASSETS_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"generator_version": GENERATOR_VERSION, "urls": self.urls, "files": self.files},
+                f, indent=1, sort_keys=True,
+            )
+        os.replace(tmp_path, path)
+
+
+def _load_files(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("generator_version") != GENERATOR_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def scan_assets(static_dir, path=ASSETS_PATH):
+    """
+    Hash every fingerprintable file in static_dir, reusing the hashes saved
+    at path for files whose size and mtime haven't changed, and return the
+    AssetManifest.
+    """
+    old_files = _load_files(path)
+    files = {}
+    urls = {}
+    if os.path.isdir(static_dir):
+        for rel_path in list_files(static_dir):
+            if os.path.splitext(rel_path)[1] not in FINGERPRINT_EXTENSIONS:
+                continue
+            stat = os.stat(os.path.join(static_dir, rel_path))
+            old = old_files.get(rel_path)
+            if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+                digest = old["hash"]
+            else:
+                digest = hash_file(os.path.join(static_dir, rel_path))
+            files[rel_path] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest}
+            url = "/" + rel_path.replace(os.sep, "/")
+            urls[url] = "/" + fingerprinted_name(rel_path, digest).replace(os.sep, "/")
+    return AssetManifest(urls, files)
+
+
+def write_fingerprinted(assets, dest_dir):
+    """
+    Write the fingerprinted copy of each asset next to the copy sync_tree made,
+    as a hard link where possible. Copies already present are left alone,
+    since their names say their contents are the same.
+    """
+    for url, fingerprinted_url in assets.urls.items():
+        dst_path = os.path.join(dest_dir, *fingerprinted_url[1:].split("/"))
+        if not os.path.exists(dst_path):
+            print(f"Fingerprinting {url} -> {fingerprinted_url}")
+            copy_file(os.path.join(dest_dir, *url[1:].split("/")), dst_path, link=True)
@@ -0,0 +1,285 @@
+import re
+from .textnode import BlockType, TextNode, TextType, text_node_to_html_node
+from .htmlnode import ParentNode, LeafNode
+from .inline_markdown import text_to_textnodes
+
+_HEADING_PATTERN = re.compile(r'#{1,6} ')
+_TITLE_PATTERN = re.compile(r'^# (.*)$', re.MULTILINE)
+
+
+def _heading_type(lines):
+    # 1-6 # characters followed by space
+    if _HEADING_PATTERN.match(lines[0]):
+        return BlockType.HEADING
+    return BlockType.PARAGRAPH
+
+
+def _code_type(lines):
+    # ``` alone on the first and last lines
+    if len(lines) >= 3 and lines[0] == '```' and lines[-1] == '```':
+        return BlockType.CODE
+    return BlockType.PARAGRAPH
+
+
+def _quote_type(lines):
+    # Every line starts with "> " or is just ">"
+    for line in lines:
+        if not (line.startswith('> ') or line == '>'):
+            return BlockType.PARAGRAPH
+    return BlockType.QUOTE
+
+
+def _unordered_list_type(lines):
+    # Every line starts with "- "
+    for line in lines:
+        if not line.startswith('- '):
+            return BlockType.PARAGRAPH
+    return BlockType.UNORDERED_LIST
+
+
+def _ordered_list_type(lines):
+    # Lines start with "1. ", "2. ", etc. A plain prefix test is cheaper here
+    # than any regular expression, compiled or not.
+    for number, line in enumerate(lines, start=1):
+        if not line.startswith(f'{number}. '):
+            return BlockType.PARAGRAPH
+    return BlockType.ORDERED_LIST
+
+
+# Every block type but paragraph is recognised by the first character of the
+# block, so that character picks the only check that can succeed.
+_BLOCK_TYPE_BY_FIRST_CHAR = {
+    '#': _heading_type,
+    '`': _code_type,
+    '>': _quote_type,
+    '-': _unordered_list_type,
+}
+_BLOCK_TYPE_BY_FIRST_CHAR.update(dict.fromkeys('0123456789', _ordered_list_type))
+
+
+def block_to_block_type(block):
+    classify = _BLOCK_TYPE_BY_FIRST_CHAR.get(block[:1])
+    if classify is None:
+        return BlockType.PARAGRAPH
+    return classify(block.split("\n"))
+
+
+def lines_to_block_type(lines):
+    """Classify a block given as its list of lines."""
+    classify = _BLOCK_TYPE_BY_FIRST_CHAR.get(lines[0][:1])
+    if classify is None:
+        return BlockType.PARAGRAPH
+    return classify(lines)
+
+
+def _finish_block(lines):
+    """
+    Strip a block's lines the way markdown_to_blocks strips a block, and
+    return (block_type, block), or None if nothing is left.
+    """
+    block = "\n".join(lines)
+    stripped = block.strip()
+    if len(stripped) == len(block):
+        # Nothing to strip, which is the usual case: the lines are the block's
+        return lines_to_block_type(lines), block
+    if not stripped:
+        return None
+    return block_to_block_type(stripped), stripped
+
+
+def iter_blocks(markdown):
+    """
+    Yield a (block_type, block) pair for each of the blocks
+    markdown_to_blocks would return. markdown is either a whole document,
+    which is split into blocks as markdown_to_blocks does, or any iterable
+    of lines, such as an open file, scanned line by line so that only the
+    block being scanned is held in memory.
+    """
+    if isinstance(markdown, str):
+        for block in markdown.split("\n\n"):
+            block = block.strip()
+            if block:
+                yield block_to_block_type(block), block
+        return
+
+    block_lines = []
+    for line in markdown:
+        if line[-1:] == "\n":
+            line = line[:-1]
+        if line:
+            block_lines.append(line)
+        elif block_lines:
+            block = _finish_block(block_lines)
+            if block is not None:
+                yield block
+            block_lines = []
+    if block_lines:
+        block = _finish_block(block_lines)
+        if block is not None:
+            yield block
+
+
+def text_to_children(text):
+    """
+    Convert text with inline markdown to a list of HTMLNode children.
+    This function handles bold, italic, code, links, and images.
+    """
+    text_nodes = text_to_textnodes(text)
+    children = []
+    for text_node in text_nodes:
+        html_node = text_node_to_html_node(text_node)
+        children.append(html_node)
+    return children
+
+
+def paragraph_to_html_node(block):
+    """Convert a paragraph block to an HTMLNode."""
+    lines = block.split("\n")
+    paragraph_text = " ".join(lines)
+    children = text_to_children(paragraph_text)
+    return ParentNode("p", children)
+
+
+def heading_to_html_node(block):
+    """Convert a heading block to an HTMLNode."""
+    level = 0
+    for char in block:
+        if char == "#":
+            level += 1
+        else:
+            break
+    
+    if level < 1 or level > 6:
+        raise ValueError(f"Invalid heading level: {level}")
+    
+    text = block[level + 1:]  # Skip the # characters and the space
+    children = text_to_children(text)
+    return ParentNode(f"h{level}", children)
+
+
+def code_to_html_node(block):
+    """Convert a code block to an HTMLNode."""
+    if not block.startswith("```") or not block.endswith("```"):
+        raise ValueError("Invalid code block")
+    
+    text = block[4:-3]  # Remove ``` from start and end, including newline after first ```
+    return ParentNode("pre", [LeafNode("code", text)])
+
+
+def quote_to_html_node(block):
+    """Convert a quote block to an HTMLNode."""
+    lines = block.split("\n")
+    new_lines = []
+    for line in lines:
+        if line == ">":
+            new_lines.append("")
+        elif line.startswith("> "):
+            new_lines.append(line[2:])
+        else:
+            raise ValueError("Invalid quote line")
+    
+    content = "\n".join(new_lines)
+    children = text_to_children(content)
+    return ParentNode("blockquote", children)
+
+
+def unordered_list_to_html_node(block):
+    """Convert an unordered list block to an HTMLNode."""
+    items = []
+    lines = block.split("\n")
+    for line in lines:
+        text = line[2:]  # Remove "- " from each line
+        children = text_to_children(text)
+        items.append(ParentNode("li", children))
+    return ParentNode("ul", items)
+
+
+def ordered_list_to_html_node(block):
+    """Convert an ordered list block to an HTMLNode."""
+    items = []
+    lines = block.split("\n")
+    for line in lines:
+        text = line.split(". ", 1)[1]  # Remove "1. ", "2. ", etc.
+        children = text_to_children(text)
+        items.append(ParentNode("li", children))
+    return ParentNode("ol", items)
+
+
+def block_to_html_node(block, block_type=None):
+    """
+    Convert a single block to an HTMLNode based on its type, which is worked
+    out from the block unless given.
+    """
+    if block_type is None:
+        block_type = block_to_block_type(block)
+
+    match block_type:
+        case BlockType.PARAGRAPH:
+            return paragraph_to_html_node(block)
+        case BlockType.HEADING:
+            return heading_to_html_node(block)
+        case BlockType.CODE:
+            return code_to_html_node(block)
+        case BlockType.QUOTE:
+            return quote_to_html_node(block)
+        case BlockType.UNORDERED_LIST:
+            return unordered_list_to_html_node(block)
+        case BlockType.ORDERED_LIST:
+            return ordered_list_to_html_node(block)
+        case _:
+            raise ValueError(f"Invalid block type: {block_type}")
+
+
+def markdown_to_html_node(markdown):
+    """
+    Convert a full markdown document into a single parent HTMLNode.
+    The parent HTMLNode contains child HTMLNode objects representing the nested elements.
+    """
+    children = []
+    
+    for block_type, block in iter_blocks(markdown):
+        html_node = block_to_html_node(block, block_type)
+        children.append(html_node)
+    
+    return ParentNode("div", children)
+
+
+def extract_title(markdown):
+    """
+    Extract the h1 header from a markdown document.
+    Returns the title text without the # and any leading/trailing whitespace.
+    Raises an exception if no h1 header is found.
+    """
+    # Searched for rather than split into lines, which would copy the document
+    match = _TITLE_PATTERN.search(markdown)
+    if match is None:
+        raise Exception("No h1 header found in markdown")
+    return match.group(1).strip()
+
+
+def blocks_to_html(blocks, fragments=None, transform=None):
+    """
+    Yield the HTML of each (block_type, block) pair in blocks. transform, if
+    given, is called with the tree of each block before it is serialized,
+    to rewrite it in place. With a FragmentCache, blocks rendered before are
+    taken from it instead of being parsed and serialized again.
+    """
+    for block_type, block in blocks:
+        html = fragments.get(block_type, block) if fragments is not None else None
+        if html is None:
+            html_node = block_to_html_node(block, block_type)
+            if transform is not None:
+                transform(html_node)
+            html = html_node.to_html()
+            if fragments is not None:
+                fragments.put(block_type, block, html)
+        yield html
+
+
+def markdown_to_html(markdown, fragments=None, transform=None):
+    """
+    Convert a full markdown document into the HTML of markdown_to_html_node,
+    a block at a time, so that a FragmentCache can supply repeated blocks.
+    """
+    blocks = iter_blocks(markdown)
+    return "<div>" + "".join(blocks_to_html(blocks, fragments, transform)) + "</div>"
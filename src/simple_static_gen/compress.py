@@ -0,0 +1,199 @@
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .manifest import GENERATOR_VERSION
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Text formats worth compressing; images and fonts are compressed already
+COMPRESSIBLE_EXTENSIONS = {
+    ".html", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".md", ".map",
+}
+DEFAULT_MIN_SIZE = 1024
+COMPRESS_PATH = os.path.join(".cache", "compress.json")
+
+
+def _gzip(data):
+    # A fixed mtime keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+COMPRESSORS = {".gz": _gzip}
+if brotli is not None:
+    COMPRESSORS[".br"] = _brotli
+
+# Suffixes of every compressed sibling, whether or not brotli is installed
+COMPRESSED_SUFFIXES = (".gz", ".br")
+
+
+def sibling_source(path):
+    """
+    The file a compressed sibling such as index.html.gz was made from, or None
+    if path isn't one.
+    """
+    base, suffix = os.path.splitext(path)
+    if suffix in COMPRESSED_SUFFIXES and os.path.splitext(base)[1] in COMPRESSIBLE_EXTENSIONS:
+        return base
+    return None
+
+
+class CompressResult:
+    """Counts of what compress_tree did."""
+
+    def __init__(self):
+        self.compressed = []
+        self.unchanged = 0
+        self.removed = []
+        # Suffixes whose compressed copy wasn't smaller than the file
+        self.incompressible = []
+
+    def __repr__(self):
+        return (
+            f"CompressResult(compressed={len(self.compressed)}, unchanged={self.unchanged}, "
+            f"removed={len(self.removed)})"
+        )
+
+
+def _remove(path, result):
+    if os.path.exists(path):
+        os.remove(path)
+        result.removed.append(path)
+
+
+def _is_unchanged(path, sibling_path):
+    """A sibling carries its source's mtime, so equal mtimes mean it is current."""
+    try:
+        return os.stat(sibling_path).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path, suffixes=None, min_size=DEFAULT_MIN_SIZE, incompressible=()):
+    """
+    Write a compressed sibling of path (path.gz, path.br) for each suffix, with
+    the mtime of path. Files smaller than min_size, or that don't get any
+    smaller, get no sibling and lose any they had. Suffixes in incompressible
+    are already known not to make the file smaller and aren't tried again.
+    Returns a CompressResult.
+    """
+    result = CompressResult()
+    suffixes = list(COMPRESSORS) if suffixes is None else suffixes
+    for suffix in COMPRESSED_SUFFIXES:
+        if suffix not in suffixes:
+            # Left over from a build with other formats, and now stale
+            _remove(path + suffix, result)
+    if os.path.getsize(path) < min_size:
+        for suffix in suffixes:
+            _remove(path + suffix, result)
+        return result
+
+    pending = []
+    for suffix in suffixes:
+        if suffix in incompressible:
+            _remove(path + suffix, result)
+            result.incompressible.append(suffix)
+        elif not _is_unchanged(path, path + suffix):
+            pending.append(suffix)
+    result.unchanged = len(suffixes) - len(pending)
+    if not pending:
+        return result
+
+    with open(path, "rb") as f:
+        data = f.read()
+    source_stat = os.stat(path)
+    for suffix in pending:
+        sibling_path = path + suffix
+        compressed = COMPRESSORS[suffix](data)
+        if len(compressed) >= len(data):
+            _remove(sibling_path, result)
+            result.incompressible.append(suffix)
+            continue
+        tmp_path = f"{sibling_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressed)
+        os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_path, sibling_path)
+        result.compressed.append(sibling_path)
+    return result
+
+
+def _load_incompressible(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("generator_version") != GENERATOR_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def _save_incompressible(path, files):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(
+            {"generator_version": GENERATOR_VERSION, "files": files}, f, indent=1, sort_keys=True
+        )
+    os.replace(tmp_path, path)
+
+
+def compress_tree(root, min_size=DEFAULT_MIN_SIZE, threads=None, record_path=None):
+    """
+    Bring the compressed siblings of every text file below root up to date,
+    compressing only the files that changed since their siblings were written,
+    in a pool of threads (zlib and brotli release the GIL while compressing).
+    Siblings whose source is gone are removed. With record_path, the files
+    that didn't get smaller are recorded there with their size and mtime, so
+    later builds leave them alone until they change. Returns a CompressResult.
+    """
+    result = CompressResult()
+    to_compress = []
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            source = sibling_source(path)
+            if source is not None:
+                if not os.path.exists(source):
+                    _remove(path, result)
+            elif os.path.splitext(path)[1] in COMPRESSIBLE_EXTENSIONS:
+                to_compress.append(path)
+
+    recorded = _load_incompressible(record_path) if record_path else {}
+
+    def compress(path):
+        stat = os.stat(path)
+        known = recorded.get(os.path.relpath(path, root))
+        incompressible = ()
+        if known and known["size"] == stat.st_size and known["mtime_ns"] == stat.st_mtime_ns:
+            incompressible = known["suffixes"]
+        return stat, compress_file(path, min_size=min_size, incompressible=incompressible)
+
+    incompressible = {}
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        for path, (stat, file_result) in zip(
+            sorted(to_compress), executor.map(compress, sorted(to_compress))
+        ):
+            result.compressed += file_result.compressed
+            result.unchanged += file_result.unchanged
+            result.removed += file_result.removed
+            if file_result.incompressible:
+                incompressible[os.path.relpath(path, root)] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "suffixes": file_result.incompressible,
+                }
+    if record_path and incompressible != recorded:
+        _save_incompressible(record_path, incompressible)
+    return result
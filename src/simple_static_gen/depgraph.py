@@ -0,0 +1,92 @@
+import os
+
+# Kinds of dependency between an output and the files it was built from
+SOURCE = "source"
+TEMPLATE = "template"
+LINK = "link"
+ASSET = "asset"
+
+# An output is rebuilt when one of these dependencies changes. Links and
+# assets are recorded for --explain and for outputs that embed them, but
+# changing them does not change the HTML of the pages that reference them.
+INVALIDATING_KINDS = frozenset({SOURCE, TEMPLATE})
+
+
+class DependencyGraph:
+    """
+    What each output was built from: for every output path, the paths of the
+    files it depends on and the kind of each dependency.
+    """
+
+    def __init__(self, edges=None):
+        self.edges = edges if edges is not None else {}
+
+    def set_dependencies(self, output, dependencies):
+        self.edges[output] = dict(dependencies)
+
+    def prune(self, outputs):
+        """Forget the outputs that are not in outputs."""
+        outputs = set(outputs)
+        for output in list(self.edges):
+            if output not in outputs:
+                del self.edges[output]
+
+    def dependents(self):
+        """Return {path: [(output, kind), ...]}, the graph in reverse."""
+        reverse = {}
+        for output, dependencies in self.edges.items():
+            for path, kind in dependencies.items():
+                reverse.setdefault(path, []).append((output, kind))
+        return reverse
+
+    def affected(self, changes, kinds=INVALIDATING_KINDS):
+        """
+        Return {output: [reason, ...]} for every output depending, through a
+        dependency of one of kinds, on a path in changes, which maps each
+        changed path to what happened to it, such as "changed".
+        """
+        affected = {}
+        reverse = self.dependents()
+        for path in sorted(changes):
+            for output, kind in reverse.get(path, ()):
+                if kind in kinds:
+                    affected.setdefault(output, []).append(f"{kind} {path} {changes[path]}")
+        return affected
+
+
+def _url_path(url):
+    """The path of a site-absolute URL, or None for any other URL."""
+    if not url.startswith("/") or url.startswith("//"):
+        return None
+    return url.split("#", 1)[0].split("?", 1)[0]
+
+
+def page_dependencies(src_path, template_path, urls, sources_by_url, static_dir):
+    """
+    The dependencies of a page: its source, its template, and the pages and
+    static files behind the site-absolute URLs it references.
+    sources_by_url maps each page's URL to its markdown source.
+    """
+    dependencies = {src_path: SOURCE, template_path: TEMPLATE}
+    for url in urls:
+        path = _url_path(url)
+        if not path:
+            continue
+        source = sources_by_url.get(path) or sources_by_url.get(path.rstrip("/") + "/")
+        if source is not None:
+            if source != src_path:
+                dependencies[source] = LINK
+            continue
+        asset_path = os.path.join(static_dir, *path.lstrip("/").split("/"))
+        if os.path.isfile(asset_path):
+            dependencies[asset_path] = ASSET
+    return dependencies
+
+
+def print_explanation(reasons, total):
+    """Print why each output in reasons ({output: [reason, ...]}) is rebuilt."""
+    for output in sorted(reasons):
+        print(f"Rebuilding {output}:")
+        for reason in reasons[output]:
+            print(f"  {reason}")
+    print(f"{total - len(reasons)} of {total} pages up to date")
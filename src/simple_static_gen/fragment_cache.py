@@ -0,0 +1,86 @@
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class FragmentCache:
+    """
+    In-memory cache of the HTML of single blocks, keyed by each block's type
+    and text, so that paragraphs, lists and callouts repeated across pages
+    are parsed and serialized once per build. Entries are evicted least
+    recently used first once the markdown and HTML they hold pass max_bytes.
+    The HTML of a block depends on the basepath and on the asset and image
+    manifests, so a cache must only be shared by pages of the same build.
+    Safe to use from several threads. Pickles as an empty cache of the same
+    size, which is what each worker process of a build starts with.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, block_type, block):
+        """Return the HTML stored for the block, or None."""
+        key = (block_type, block)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, block_type, block, html):
+        entry_size = len(block) + len(html)
+        if entry_size > self.max_bytes:
+            return
+        key = (block_type, block)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(block) + len(previous)
+            self._entries[key] = html
+            self.size += entry_size
+            while self.size > self.max_bytes:
+                (_, old_block), old_html = self._entries.popitem(last=False)
+                self.size -= len(old_block) + len(old_html)
+                self.evictions += 1
+
+    def take_stats(self):
+        """Return (hits, misses, evictions) since the last call, and reset them."""
+        with self._lock:
+            stats = self.hits, self.misses, self.evictions
+            self.hits = self.misses = self.evictions = 0
+        return stats
+
+    def add_stats(self, hits, misses, evictions):
+        """Add the statistics of another cache, such as a worker process's."""
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.evictions += evictions
+
+    def report(self):
+        """Print the hit rate of the cache."""
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0
+        print(
+            f"Fragment cache: {self.hits} hit(s), {self.misses} miss(es) ({rate:.0f}% hits), "
+            f"{self.evictions} evicted"
+        )
@@ -0,0 +1,135 @@
+import datetime
+import itertools
+
+FRONT_MATTER_DELIMITER = "---"
+TOML_DELIMITER = "+++"
+
+
+def _parse_value(text):
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [_parse_value(item) for item in text[1:-1].split(",") if item.strip()]
+    if len(text) >= 2 and text[0] == text[-1] and text[0] in "\"'":
+        return text[1:-1]
+    if text in ("true", "false"):
+        return text == "true"
+    return text
+
+
+def parse_front_matter(text):
+    """
+    Parse "key: value" lines into a dict. Values in square brackets become
+    lists, true and false become booleans, and surrounding quotes are removed.
+    """
+    metadata = {}
+    for line in text.split("\n"):
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        key, separator, value = line.partition(":")
+        if not separator:
+            raise ValueError(f"Invalid front matter line: {line}")
+        metadata[key.strip()] = _parse_value(value)
+    return metadata
+
+
+def _plain(value):
+    # Dates become strings, as in "key: value" front matter, so that the
+    # metadata can be stored as JSON
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, list):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
+
+
+def parse_toml_front_matter(text):
+    """Parse TOML front matter into a dict, with dates as ISO 8601 strings."""
+    # Imported here so that sites without TOML front matter don't load it
+    import tomllib
+
+    try:
+        return _plain(tomllib.loads(text))
+    except tomllib.TOMLDecodeError as e:
+        raise ValueError(f"Invalid TOML front matter: {e}") from e
+
+
+_PARSERS = {
+    FRONT_MATTER_DELIMITER: parse_front_matter,
+    TOML_DELIMITER: parse_toml_front_matter,
+}
+
+
+def split_front_matter(markdown):
+    """
+    Split a document into its front matter and its body.
+    Front matter is a block of "key: value" lines between two "---" lines, or
+    of TOML between two "+++" lines, at the very start of the document.
+    Returns (metadata dict, body).
+    """
+    for delimiter, parse in _PARSERS.items():
+        if markdown.startswith(delimiter + "\n"):
+            break
+    else:
+        return {}, markdown
+    start = len(delimiter) + 1
+    end = markdown.find("\n" + delimiter + "\n", start - 1)
+    if end == -1:
+        if not markdown.endswith("\n" + delimiter):
+            return {}, markdown
+        end = len(markdown) - len(delimiter) - 1
+    metadata = parse(markdown[start:end])
+    return metadata, markdown[end + len(delimiter) + 2:]
+
+
+def _read_front_matter(f):
+    """
+    Read the front matter at the start of the open file f, leaving f at the
+    start of the body. Returns the metadata and the lines already read that
+    belong to the body.
+    """
+    first_line = f.readline()
+    delimiter = first_line.rstrip("\n")
+    if delimiter not in _PARSERS:
+        return {}, [first_line]
+    lines = []
+    for line in f:
+        if line.rstrip("\n") == delimiter:
+            return _PARSERS[delimiter]("".join(lines)[:-1]), []
+        lines.append(line)
+    # Never closed, so not front matter after all
+    return {}, [first_line] + lines
+
+
+def read_front_matter(path):
+    """
+    The front matter of the markdown file at path, reading only as far as
+    its end, and not the body.
+    """
+    with open(path, "r") as f:
+        return _read_front_matter(f)[0]
+
+
+def read_page_header(path):
+    """
+    Return the front matter and title of the markdown file at path, reading
+    only as far as the first "# " heading, or not at all past the front
+    matter when it has a title. The title is None when there is neither.
+    """
+    with open(path, "r") as f:
+        metadata, body_lines = _read_front_matter(f)
+        if "title" in metadata:
+            return metadata, str(metadata["title"])
+        for line in itertools.chain(body_lines, f):
+            if line.startswith("# "):
+                return metadata, line[2:].strip()
+    return metadata, None
+
+
+def iter_body_lines(path):
+    """Yield the lines of the markdown file at path after its front matter."""
+    with open(path, "r") as f:
+        _, body_lines = _read_front_matter(f)
+        yield from body_lines
+        yield from f
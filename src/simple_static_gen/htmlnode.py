@@ -0,0 +1,91 @@
+class HTMLNode:
+    # Pages create thousands of nodes, so skip the per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+    def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        """Yield the node's HTML as a sequence of string fragments."""
+        raise NotImplementedError
+
+    def write_html(self, fp):
+        """Stream the node's HTML to a file-like object without building it in memory."""
+        fp.writelines(self.iter_html())
+
+    def props_to_html(self):
+        if self.props is None:
+            return ""
+        return "".join(f' {key}="{value}"' for key, value in self.props.items())
+
+    def __repr__(self):
+        return f"HTMLNode(tag={self.tag}, value={self.value}, children={self.children}, props={self.props})"
+
+
+class LeafNode(HTMLNode):
+    __slots__ = ()
+
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+    def iter_html(self):
+        if self.value is None:
+            raise ValueError("Value is required")
+        if self.tag is None:
+            yield self.value
+        else:
+            yield f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+
+
+class ParentNode(HTMLNode):
+    __slots__ = ()
+
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+    def iter_html(self):
+        if self.tag is None:
+            raise ValueError("Tag is required")
+        if self.children is None:
+            raise ValueError("Children are required")
+        yield f"<{self.tag}{self.props_to_html()}>"
+        for child in self.children:
+            yield from child.iter_html()
+        yield f"</{self.tag}>"
+
+
+def rewrite_urls(node, rewrite_url):
+    """
+    Pass the href and src attributes, and each URL of the srcset attribute,
+    of every node in the tree through rewrite_url, in place.
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.props:
+            for attribute in ("href", "src"):
+                url = current.props.get(attribute)
+                if url is not None:
+                    current.props[attribute] = rewrite_url(url)
+            srcset = current.props.get("srcset")
+            if srcset is not None:
+                current.props["srcset"] = rewrite_srcset(srcset, rewrite_url)
+        if current.children:
+            stack.extend(current.children)
+
+
+def rewrite_srcset(srcset, rewrite_url):
+    """Pass each URL of a srcset attribute value through rewrite_url."""
+    candidates = []
+    for candidate in srcset.split(","):
+        parts = candidate.split(None, 1)
+        if parts:
+            parts[0] = rewrite_url(parts[0])
+            candidates.append(" ".join(parts))
+    return ", ".join(candidates)
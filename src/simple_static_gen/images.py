@@ -0,0 +1,278 @@
+import hashlib
+import json
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from PIL import Image, features
+except ImportError:
+    Image = None
+
+from .manifest import GENERATOR_VERSION, hash_file
+from .sync import copy_file, list_files
+
+IMAGES_PATH = os.path.join(".cache", "images.json")
+DERIVATIVES_DIR = os.path.join(".cache", "images")
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif", ".webp"}
+# Animated GIFs would lose their frames, so they are only measured
+RESIZABLE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".webp"}
+DEFAULT_WIDTHS = (480, 960, 1600)
+DEFAULT_QUALITY = 80
+HASH_LENGTH = 8
+
+# JPEG start-of-frame markers, which carry the image size
+_JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _webp_supported():
+    return Image is not None and features.check("webp")
+
+
+def _jpeg_size(f):
+    f.seek(2)
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if marker[1] in _JPEG_SOF_MARKERS:
+            header = f.read(5)
+            if len(header) < 5:
+                return None
+            height, width = struct.unpack(">HH", header[1:5])
+            return width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+
+
+def image_size(path):
+    """
+    The (width, height) of a PNG, GIF or JPEG image, read from its header, or
+    None if it can't be read. Other formats are measured with Pillow, when
+    it is installed.
+    """
+    with open(path, "rb") as f:
+        header = f.read(24)
+        if header.startswith(b"\x89PNG\r\n\x1a\n") and header[12:16] == b"IHDR":
+            return struct.unpack(">II", header[16:24])
+        if header[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", header[6:10])
+        if header.startswith(b"\xff\xd8"):
+            return _jpeg_size(f)
+    if Image is not None:
+        try:
+            with Image.open(path) as image:
+                return image.size
+        except OSError:
+            return None
+    return None
+
+
+def _derivative_extension(extension):
+    if _webp_supported():
+        return ".webp"
+    return extension
+
+
+def _derivative_key(digest, width, extension, quality):
+    """Cache key of a derivative: the source's hash and every resize parameter."""
+    data = f"{digest}:{width}:{extension}:{quality}".encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def _resize_job(job):
+    """Worker entry point for process_images: write one resized copy."""
+    source_path, cache_path, width, quality = job
+    with Image.open(source_path) as image:
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+    extension = os.path.splitext(cache_path)[1]
+    if extension in (".jpg", ".jpeg") and resized.mode == "RGBA":
+        resized = resized.convert("RGB")
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    options = {"optimize": True} if extension == ".png" else {"quality": quality}
+    resized.save(tmp_path, format=Image.registered_extensions()[extension], **options)
+    os.replace(tmp_path, cache_path)
+    return cache_path
+
+
+class ImageManifest:
+    """
+    Size and resized derivatives of every image among the static files, by
+    site-absolute URL: {"width": ..., "height": ..., "srcset": [[url, width], ...]}.
+    """
+
+    def __init__(self, images=None, files=None, derivatives=None):
+        self.images = images or {}
+        # Hash and size of the images by relative path, with the size and mtime
+        # they were computed for, so unchanged images aren't read again
+        self.files = files or {}
+        # The cached file behind each derivative's URL
+        self.derivatives = derivatives or {}
+        self.digest = hashlib.sha256(
+            json.dumps(self.images, sort_keys=True).encode()
+        ).hexdigest()
+
+    def lookup(self, url):
+        """The record of the image at url, ignoring any query or fragment, or None."""
+        return self.images.get(url.split("#", 1)[0].split("?", 1)[0])
+
+    def outputs(self, dest_dir):
+        """The paths the derivatives are written to."""
+        return [os.path.join(dest_dir, *url[1:].split("/")) for url in self.derivatives]
+
+    def save(self, path=IMAGES_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "generator_version": GENERATOR_VERSION,
+                    "images": self.images,
+                    "files": self.files,
+                    "derivatives": self.derivatives,
+                },
+                f, indent=1, sort_keys=True,
+            )
+        os.replace(tmp_path, path)
+
+
+def _load_files(path):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("generator_version") != GENERATOR_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def _scan_images(static_dir, path):
+    old_files = _load_files(path)
+    files = {}
+    if not os.path.isdir(static_dir):
+        return files
+    for rel_path in list_files(static_dir):
+        if os.path.splitext(rel_path)[1].lower() not in IMAGE_EXTENSIONS:
+            continue
+        source_path = os.path.join(static_dir, rel_path)
+        stat = os.stat(source_path)
+        old = old_files.get(rel_path)
+        if old and old["size"] == stat.st_size and old["mtime_ns"] == stat.st_mtime_ns:
+            files[rel_path] = old
+            continue
+        size = image_size(source_path)
+        if size is None:
+            continue
+        files[rel_path] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "hash": hash_file(source_path),
+            "width": size[0],
+            "height": size[1],
+        }
+    return files
+
+
+def process_images(static_dir, widths=DEFAULT_WIDTHS, jobs=1, path=IMAGES_PATH,
+                   cache_dir=DERIVATIVES_DIR, quality=DEFAULT_QUALITY):
+    """
+    Measure every image in static_dir and, when Pillow is installed, make
+    copies of it resized to each of widths narrower than the image, as WebP
+    where Pillow supports it. Resized copies are kept in cache_dir under
+    their source's hash and the resize parameters, so each is only made once,
+    and missing ones are made in a pool of jobs processes.
+    Returns the ImageManifest.
+    """
+    files = _scan_images(static_dir, path)
+    images = {}
+    derivatives = {}
+    jobs_by_cache_path = {}
+    for rel_path, info in sorted(files.items()):
+        url = "/" + rel_path.replace(os.sep, "/")
+        srcset = []
+        base, extension = os.path.splitext(rel_path)
+        if Image is not None and extension.lower() in RESIZABLE_EXTENSIONS:
+            derivative_extension = _derivative_extension(extension.lower())
+            for width in sorted(set(widths)):
+                if width >= info["width"]:
+                    continue
+                key = _derivative_key(info["hash"], width, derivative_extension, quality)
+                name = f"{base}-{width}w.{key[:HASH_LENGTH]}{derivative_extension}"
+                derivative_url = "/" + name.replace(os.sep, "/")
+                cache_path = os.path.join(cache_dir, key + derivative_extension)
+                derivatives[derivative_url] = cache_path
+                jobs_by_cache_path[cache_path] = (os.path.join(static_dir, rel_path), width)
+                srcset.append([derivative_url, width])
+        if srcset:
+            srcset.append([url, info["width"]])
+        images[url] = {"width": info["width"], "height": info["height"], "srcset": srcset}
+
+    missing = [
+        (source_path, cache_path, width, quality)
+        for cache_path, (source_path, width) in sorted(jobs_by_cache_path.items())
+        if not os.path.exists(cache_path)
+    ]
+    if missing:
+        os.makedirs(cache_dir, exist_ok=True)
+        if jobs > 1 and len(missing) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                list(executor.map(_resize_job, missing))
+        else:
+            for job in missing:
+                _resize_job(job)
+    if jobs_by_cache_path:
+        cached = len(jobs_by_cache_path) - len(missing)
+        print(f"Resized {len(missing)} image(s), {cached} cached")
+
+    # Forget derivatives no longer made from any image
+    if os.path.isdir(cache_dir):
+        for file_name in os.listdir(cache_dir):
+            cache_path = os.path.join(cache_dir, file_name)
+            if cache_path not in jobs_by_cache_path:
+                os.remove(cache_path)
+    return ImageManifest(images, files, derivatives)
+
+
+def write_derivatives(images, dest_dir):
+    """
+    Write the resized copies in the ImageManifest images to dest_dir, as hard
+    links to the cached files where possible. Copies already present are left
+    alone, since their names carry a hash of what they were made from.
+    """
+    for url, cache_path in images.derivatives.items():
+        dst_path = os.path.join(dest_dir, *url[1:].split("/"))
+        if not os.path.exists(dst_path):
+            copy_file(cache_path, dst_path, link=True)
+
+
+def add_image_attributes(node, images):
+    """
+    Give every img in the tree whose image is in the ImageManifest images its
+    width and height, so browsers reserve its space before it loads, and a
+    srcset of its resized copies, in place. Runs before the URLs are rewritten.
+    """
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current.tag == "img" and current.props and "src" in current.props:
+            record = images.lookup(current.props["src"])
+            if record is not None:
+                current.props.setdefault("width", str(record["width"]))
+                current.props.setdefault("height", str(record["height"]))
+                if record["srcset"]:
+                    current.props.setdefault("srcset", ", ".join(
+                        f"{url} {width}w" for url, width in record["srcset"]
+                    ))
+        if current.children:
+            stack.extend(current.children)
@@ -1,5 +1,5 @@
 import re
-from textnode import TextNode, TextType
+from .textnode import TextNode, TextType
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -53,47 +53,56 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
+_IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+# Every inline construct in one alternation, so text_to_textnodes can tokenize
+# a paragraph in a single left-to-right scan. Alternatives are tried in the
+# same precedence the old chained passes used: ** before *, images before links.
+# A delimiter that matches none of them was opened but never closed.
+_INLINE_PATTERN = re.compile(
+    r"!\[(?P<image_alt>[^\[\]]*)\]\((?P<image_url>[^\(\)]*)\)"
+    r"|(?<!!)\[(?P<link_text>[^\[\]]*)\]\((?P<link_url>[^\(\)]*)\)"
+    r"|\*\*(?P<bold>.*?)\*\*"
+    r"|\*(?P<star_italic>[^*]+)\*"
+    r"|_(?P<underscore_italic>[^_]*)_"
+    r"|`(?P<code>[^`]*)`"
+    r"|(?P<unclosed>[*_`])",
+    re.DOTALL,
+)
+_DELIMITER_TYPES = {
+    "bold": TextType.BOLD,
+    "star_italic": TextType.ITALIC,
+    "underscore_italic": TextType.ITALIC,
+    "code": TextType.CODE,
+}
+
+
 def extract_markdown_images(text):
-    matches = re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = _IMAGE_PATTERN.findall(text)
     return matches
 
 
 def extract_markdown_links(text):
 
-    matches = re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+    matches = _LINK_PATTERN.findall(text)
     return matches
 
 
 def split_nodes_image(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
-
-        old_text = old_node.text
-        images = extract_markdown_images(old_text)
-
-        if len(images) == 0:
-            new_nodes.append(old_node)
-            continue
+    return _split_nodes_pattern(old_nodes, _IMAGE_PATTERN, TextType.IMAGE)
 
-        for image in images:
-            sections = old_text.split(f"![{image[0]}]({image[1]})")
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(image[0], TextType.IMAGE, image[1]))
-            old_text = sections[1]
 
-        if old_text != "":
-            new_nodes.append(TextNode(old_text, TextType.TEXT))
-
-    return new_nodes
+def split_nodes_link(old_nodes):
+    return _split_nodes_pattern(old_nodes, _LINK_PATTERN, TextType.LINK)
 
 
-def split_nodes_link(old_nodes):
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    """
+    Split every text node around the matches of an image or link pattern.
+    Walks the matches by offset so each node is scanned once, rather than
+    re-splitting the remaining text for every match.
+    """
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != TextType.TEXT:
@@ -101,23 +110,17 @@ def split_nodes_link(old_nodes):
             continue
 
         old_text = old_node.text
-        links = extract_markdown_links(old_text)
-
-        if len(links) == 0:
+        position = 0
+        for match in pattern.finditer(old_text):
+            if match.start() > position:
+                new_nodes.append(TextNode(old_text[position:match.start()], TextType.TEXT))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
+
+        if position == 0:
             new_nodes.append(old_node)
-            continue
-
-        for link in links:
-            sections = old_text.split(f"[{link[0]}]({link[1]})")
-            if len(sections) != 2:
-                raise ValueError("Invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.TEXT))
-            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
-            old_text = sections[1]
-
-        if old_text != "":
-            new_nodes.append(TextNode(old_text, TextType.TEXT))
+        elif position < len(old_text):
+            new_nodes.append(TextNode(old_text[position:], TextType.TEXT))
 
     return new_nodes
 
@@ -140,13 +143,26 @@ def text_to_textnodes(text):
     ]
     """
     text = text.strip()
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    nodes = []
+    position = 0
+    for match in _INLINE_PATTERN.finditer(text):
+        start = match.start()
+        if start > position:
+            nodes.append(TextNode(text[position:start], TextType.TEXT))
+        position = match.end()
+
+        kind = match.lastgroup
+        if kind == "unclosed":
+            raise Exception("Invalid markdown, formatted section not closed")
+        elif kind == "image_url":
+            nodes.append(TextNode(match["image_alt"], TextType.IMAGE, match["image_url"]))
+        elif kind == "link_url":
+            nodes.append(TextNode(match["link_text"], TextType.LINK, match["link_url"]))
+        elif match[kind] != "":
+            nodes.append(TextNode(match[kind], _DELIMITER_TYPES[kind]))
+
+    if position < len(text):
+        nodes.append(TextNode(text[position:], TextType.TEXT))
     return nodes
 
 #Create a new function called markdown_to_blocks(markdown). It takes a raw Markdown string (representing a full document) as input and returns a list of "block" strings. The example above would be split into these three strings:
@@ -0,0 +1,1082 @@
+import json
+import os
+import sys
+import time
+import argparse
+from .textnode import TextNode, TextType
+from . import block_markdown
+from .block_markdown import blocks_to_html, extract_title, markdown_to_html
+from .inline_markdown import extract_markdown_images, extract_markdown_links
+from .template import (
+    TEMPLATE_FILENAME,
+    clear_template_cache,
+    load_template,
+    resolve_template,
+)
+from .parse_cache import ParseCache, DEFAULT_MAX_BYTES
+from .sync import (
+    list_files,
+    make_dirs,
+    sync_tree,
+    write_counts,
+    write_if_changed,
+    write_stream_if_changed,
+)
+from .pipeline import DEFAULT_IO_THREADS, DEFAULT_MAX_IN_FLIGHT, run_pipeline
+from .profiler import Profiler, activate, get_profiler
+from .frontmatter import (
+    iter_body_lines,
+    read_front_matter,
+    read_page_header,
+    split_front_matter,
+)
+from .site_index import (
+    DEFAULT_PAGE_SIZE,
+    INDEX_PATH,
+    SiteIndex,
+    build_collections,
+    page_entry,
+    page_url,
+)
+from .depgraph import (
+    ASSET,
+    INVALIDATING_KINDS,
+    DependencyGraph,
+    page_dependencies,
+    print_explanation,
+)
+from .assets import ASSETS_PATH, scan_assets, write_fingerprinted
+from .memory import MemoryBudget
+from .renderer import block_transform
+from .fragment_cache import FragmentCache
+from .manifest import (
+    MANIFEST_PATH,
+    hash_file,
+    load_manifest,
+    new_manifest,
+    save_manifest,
+    remove_manifest,
+)
+
+
+# The benchmark suite, which is only in source checkouts, two levels above
+# the package in src/
+BENCH_SCRIPT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "bench", "run.py",
+)
+
+
+def generate_page(from_path, template_path, dest_path, basepath="/", *, cache=None,
+                  assets=None, images=None, fragments=None):
+    """
+    Generate an HTML page from a markdown file using a template, and return
+    the page's site index entry.
+    When a ParseCache is given, documents rendered by a previous build are
+    taken from it instead of being parsed again. When an AssetManifest is
+    given, references to static files point at their fingerprinted copies.
+    When an ImageManifest is given, images get their size and resized copies.
+    When a FragmentCache is given, blocks already rendered for other pages of
+    the build are taken from it.
+    """
+    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    return _render_page_to_file(
+        from_path, template_path, dest_path, basepath,
+        cache=cache, assets=assets, images=images, fragments=fragments,
+    )
+
+
+def _render_page_to_file(from_path, template_path, dest_path, basepath, *, cache=None,
+                         assets=None, images=None, fragments=None):
+    """
+    Render a markdown file through the template, write the result and return
+    the page's site index entry. Does the work of generate_page without
+    logging, so that it can run in worker processes.
+    """
+    profiler = get_profiler()
+    page_start = time.perf_counter()
+    markdown_content = _read_source(from_path)
+    final_html, entry = _render_markdown(
+        markdown_content, from_path, template_path, dest_path, basepath,
+        cache=cache, assets=assets, images=images, fragments=fragments,
+    )
+    _write_output(dest_path, final_html)
+    profiler.count("pages")
+    profiler.record_page(from_path, time.perf_counter() - page_start)
+    return entry
+
+
+def _read_source(from_path):
+    profiler = get_profiler()
+    with profiler.phase("read"), open(from_path, 'r') as f:
+        markdown_content = f.read()
+        if profiler.enabled:
+            profiler.count("bytes_read", os.fstat(f.fileno()).st_size)
+    return markdown_content
+
+
+def _render_markdown(markdown_content, from_path, template_path, dest_path, basepath, *,
+                     cache=None, assets=None, images=None, fragments=None):
+    """
+    Render the markdown of the page at from_path through the template, and
+    return the HTML and the page's site index entry.
+    """
+    profiler = get_profiler()
+    metadata, body = split_front_matter(markdown_content)
+    urls = [url for _, url in extract_markdown_links(body)]
+    image_urls = [url for _, url in extract_markdown_images(body)]
+    urls += image_urls
+    cache_key = None
+    if cache is not None:
+        variant = "".join(assets.lookup(url) for url in urls) if assets is not None else ""
+        if images is not None:
+            variant += json.dumps([images.lookup(url) for url in image_urls])
+        cache_key = cache.key(markdown_content, basepath, variant)
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        profiler.count("cache_hits")
+        title, html_content = cached
+    else:
+        # Convert markdown to HTML, pointing site-absolute links at the basepath
+        with profiler.phase("parse"):
+            html_content = markdown_to_html(
+                body, fragments, block_transform(basepath, assets, images)
+            )
+        
+        # Extract the title, unless the front matter gives one
+        title = str(metadata["title"]) if "title" in metadata else extract_title(body)
+        if cache is not None:
+            cache.put(cache_key, title, html_content)
+    
+    # Fill the compiled template, which has its own URLs rewritten already
+    with profiler.phase("template"):
+        template = load_template(template_path, basepath, assets)
+        final_html = template.render(Title=title, Content=html_content)
+    return final_html, page_entry(from_path, dest_path, title, metadata, urls + template.urls)
+
+
+def _write_output(dest_path, final_html, make_dirs=True):
+    profiler = get_profiler()
+    with profiler.phase("write"):
+        # Leave the file alone if its contents are unchanged, keeping its mtime
+        data = final_html.encode()
+        if write_if_changed(dest_path, data, make_dirs) and profiler.enabled:
+            profiler.count("bytes_written", len(data))
+
+
+def _stream_page_to_file(from_path, template_path, dest_path, basepath, *, assets=None,
+                         images=None, fragments=None):
+    """
+    Render a markdown file through the template like _render_page_to_file,
+    but a block at a time: each block is read, parsed and written to the
+    output before the next one is read, so neither the document, its tree nor
+    its HTML is ever held whole. Doesn't use the parse cache.
+    """
+    profiler = get_profiler()
+    page_start = time.perf_counter()
+    with profiler.phase("read"):
+        metadata, title = read_page_header(from_path)
+        if profiler.enabled:
+            profiler.count("bytes_read", os.path.getsize(from_path))
+    if title is None:
+        raise Exception("No h1 header found in markdown")
+    links = []
+    image_urls = []
+
+    def blocks():
+        # Looked up on the module, where the profiler instruments it
+        for block_type, block in block_markdown.iter_blocks(iter_body_lines(from_path)):
+            links.extend(url for _, url in extract_markdown_links(block))
+            image_urls.extend(url for _, url in extract_markdown_images(block))
+            yield block_type, block
+
+    def write_content(fp):
+        # In the div that markdown_to_html_node puts around the blocks
+        fp.write("<div>")
+        transform = block_transform(basepath, assets, images)
+        fp.writelines(blocks_to_html(blocks(), fragments, transform))
+        fp.write("</div>")
+
+    template = load_template(template_path, basepath, assets)
+    with profiler.phase("stream"):
+        written = write_stream_if_changed(
+            dest_path, lambda fp: template.write(fp, Title=title, Content=write_content)
+        )
+        if written and profiler.enabled:
+            profiler.count("bytes_written", os.path.getsize(dest_path))
+    profiler.count("pages")
+    profiler.record_page(from_path, time.perf_counter() - page_start)
+    return page_entry(from_path, dest_path, title, metadata, links + image_urls + template.urls)
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", *,
+                             cache=None, index=None, assets=None, images=None, drafts=False,
+                             site_template=None, fragments=None):
+    """
+    Recursively generate HTML pages for all markdown files in a directory.
+    Maintains the same directory structure in the destination.
+    A template.html inside a content directory replaces template_path for
+    that directory and everything below it, and a template named in a page's
+    front matter, relative to the directory of site_template (template_path
+    when not given), replaces it for that page. Drafts are skipped unless
+    drafts is set.
+    Each page is recorded in the SiteIndex index, if given.
+    """
+    site_template = site_template or template_path
+    local_template = os.path.join(dir_path_content, TEMPLATE_FILENAME)
+    if os.path.isfile(local_template):
+        template_path = local_template
+
+    # List all entries in the content directory
+    entries = os.listdir(dir_path_content)
+    
+    for entry in entries:
+        src_path = os.path.join(dir_path_content, entry)
+        dest_path = os.path.join(dest_dir_path, entry)
+        
+        if os.path.isfile(src_path):
+            # If it's a markdown file, generate HTML
+            if src_path.endswith('.md'):
+                template_name, skip = page_options(src_path, drafts)
+                if skip:
+                    continue
+                page_template = (
+                    resolve_template(src_path, dir_path_content, site_template, template_name)
+                    if template_name else template_path
+                )
+                # Change .md extension to .html for destination
+                html_dest_path = dest_path[:-3] + '.html'
+                index_entry = generate_page(
+                    src_path, page_template, html_dest_path, basepath,
+                    cache=cache, assets=assets, images=images, fragments=fragments,
+                )
+                if index is not None:
+                    index.add(index_entry)
+        else:
+            # If it's a directory, create it in destination and recurse
+            if not os.path.exists(dest_path):
+                os.makedirs(dest_path)
+            generate_pages_recursive(
+                src_path, template_path, dest_path, basepath, cache=cache, index=index,
+                assets=assets, images=images, drafts=drafts, site_template=site_template,
+                fragments=fragments,
+            )
+
+
+class BuildError(Exception):
+    """Raised when one or more pages failed to build."""
+
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to build:"]
+        lines += [f"  {path}: {error}" for path, error in failures]
+        super().__init__("\n".join(lines))
+
+
+def page_options(src_path, drafts=False):
+    """
+    The template named in a page's front matter, or None, and whether to skip
+    the page as a draft. Reads only the front matter; front matter that can't
+    be parsed is left for rendering to report.
+    """
+    try:
+        metadata = read_front_matter(src_path)
+    except ValueError:
+        return None, False
+    return metadata.get("template"), bool(metadata.get("draft")) and not drafts
+
+
+def discover_pages(dir_path_content, dest_dir_path, template_path, drafts=False):
+    """
+    Return (markdown path, html path, template path) triples for every
+    markdown file in the content directory, in a deterministic order.
+    Pages marked "draft: true" in their front matter are left out unless
+    drafts is set.
+    """
+    pages = []
+    for rel_path in list_files(dir_path_content):
+        if rel_path.endswith(".md"):
+            src_path = os.path.join(dir_path_content, rel_path)
+            template_name, skip = page_options(src_path, drafts)
+            if skip:
+                continue
+            dest_path = os.path.join(dest_dir_path, rel_path[:-3] + ".html")
+            page_template = resolve_template(
+                src_path, dir_path_content, template_path, template_name
+            )
+            pages.append((src_path, dest_path, page_template))
+    return pages
+
+
+# The FragmentCache of a worker process of generate_pages, shared by every
+# page the worker renders
+_worker_fragments = None
+
+
+def _init_worker(fragments):
+    global _worker_fragments
+    _worker_fragments = fragments
+
+
+def _generate_page_job(job):
+    """
+    Worker entry point for generate_pages. Returns an (error, profile, entry,
+    write counts, fragment stats) tuple: the error message on failure, so
+    that one bad page does not stop the others, the page's measurements when
+    profiling, so that the parent can merge them, the page's site index
+    entry, and the counts of outputs written and left unchanged and the
+    fragment cache statistics since the worker last reported them.
+    With a MemoryBudget, the page is streamed to its output, and garbage is
+    collected afterwards if the worker is over budget.
+    """
+    (from_path, template_path, dest_path, basepath, cache, assets, images, profile,
+     budget, fragments) = job
+    if fragments is None:
+        fragments = _worker_fragments
+    profiler = Profiler() if profile else None
+    previous = activate(profiler) if profile else None
+    error = entry = None
+    try:
+        if budget is not None:
+            entry = _stream_page_to_file(
+                from_path, template_path, dest_path, basepath,
+                assets=assets, images=images, fragments=fragments,
+            )
+            budget.check()
+        else:
+            entry = _render_page_to_file(
+                from_path, template_path, dest_path, basepath,
+                cache=cache, assets=assets, images=images, fragments=fragments,
+            )
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finally:
+        if profile:
+            activate(previous)
+    profile_data = profiler.to_dict() if profile and error is None else None
+    fragment_stats = fragments.take_stats() if fragments is not None else None
+    return error, profile_data, entry, write_counts.take(), fragment_stats
+
+
+def generate_pages(pages, basepath="/", *, jobs=1, cache=None, index=None, assets=None,
+                   images=None, memory_budget=None, fragments=None):
+    """
+    Generate every (markdown path, html path, template path) triple in pages,
+    fanning the work out across a pool of jobs processes when jobs > 1, and
+    record them in the SiteIndex index, if given. Returns the pages' site
+    index entries.
+    With a MemoryBudget, pages are streamed from their sources to their
+    outputs a block at a time instead of being cached, and each process
+    keeps to the budget as far as collecting garbage between pages allows.
+    With a FragmentCache, repeated blocks are rendered once per process, and
+    the statistics of the workers' caches are added to it.
+    Every page is attempted; if any of them fail a BuildError listing all the
+    failures is raised at the end.
+    """
+    profiler = get_profiler()
+    parallel = jobs > 1 and len(pages) > 1
+    # Workers each get an empty copy of the fragment cache when they start
+    job_fragments = None if parallel else fragments
+    job_args = [
+        (src, template, dest, basepath, cache, assets, images, profiler.enabled, memory_budget,
+         job_fragments)
+        for src, dest, template in pages
+    ]
+    if parallel:
+        # Imported here, as it is slow to import and only parallel builds need it
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = max(1, len(job_args) // (jobs * 4))
+        with ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(fragments,)
+        ) as executor:
+            results = list(executor.map(_generate_page_job, job_args, chunksize=chunksize))
+    else:
+        results = [_generate_page_job(job) for job in job_args]
+
+    failures = []
+    entries = []
+    for (src_path, dest_path, _), result in zip(pages, results):
+        error, profile, entry, counts, fragment_stats = result
+        write_counts.add(*counts)
+        if fragment_stats is not None:
+            fragments.add_stats(*fragment_stats)
+        if profile is not None:
+            profiler.merge(profile)
+        if error is None:
+            print(f"Generated page from {src_path} to {dest_path}")
+            entries.append(entry)
+            if index is not None:
+                index.add(entry)
+        else:
+            failures.append((src_path, error))
+    if failures:
+        raise BuildError(failures)
+    return entries
+
+
+def generate_pages_pipelined(pages, basepath="/", *, cache=None, index=None, assets=None,
+                             images=None, threads=DEFAULT_IO_THREADS,
+                             max_in_flight=DEFAULT_MAX_IN_FLIGHT, fragments=None):
+    """
+    Generate pages like generate_pages, but in this process, with sources
+    read and outputs written in a pool of threads while pages are rendered,
+    and at most max_in_flight pages read but not yet written. Every output
+    directory is created once, up front.
+    """
+    profiler = get_profiler()
+    make_dirs(os.path.dirname(dest) for _, dest, _ in pages)
+
+    def read(page):
+        return _read_source(page[0])
+
+    def render(page, markdown_content):
+        src_path, dest_path, template_path = page
+        print(f"Generating page from {src_path} to {dest_path} using {template_path}")
+        page_start = time.perf_counter()
+        rendered = _render_markdown(
+            markdown_content, src_path, template_path, dest_path, basepath,
+            cache=cache, assets=assets, images=images, fragments=fragments,
+        )
+        profiler.count("pages")
+        profiler.record_page(src_path, time.perf_counter() - page_start)
+        return rendered
+
+    def write(page, rendered):
+        final_html, entry = rendered
+        _write_output(page[1], final_html, make_dirs=False)
+        return entry
+
+    failures = []
+    entries = []
+    outcomes = run_pipeline(pages, read, render, write, threads, max_in_flight)
+    for (src_path, _, _), (entry, error) in zip(pages, outcomes):
+        if error is None:
+            entries.append(entry)
+            if index is not None:
+                index.add(entry)
+        else:
+            failures.append((src_path, f"{type(error).__name__}: {error}"))
+    if failures:
+        raise BuildError(failures)
+    return entries
+
+
+def _stale_pages(pages, old_entries, graph, asset_changes=None):
+    """
+    Work out which pages need rendering again and why. Returns the new page
+    manifest entries, keyed by output path, and {output path: [reason, ...]}
+    for the stale pages.
+    asset_changes maps the static files whose fingerprinted names changed to
+    a description of the change; the pages referencing them are stale too.
+    """
+    template_hashes = {}
+    entries = {}
+    reasons = {}
+    for src_path, dest_path, page_template in pages:
+        if page_template not in template_hashes:
+            template_hashes[page_template] = hash_file(page_template)
+        entries[dest_path] = {
+            "source": src_path,
+            "source_hash": hash_file(src_path),
+            "template": page_template,
+            "template_hash": template_hashes[page_template],
+        }
+
+    # Files that changed since the previous build, for the dependency graph
+    changes = {}
+    for dest_path, entry in entries.items():
+        old_entry = old_entries.get(dest_path)
+        if old_entry is None:
+            continue
+        if old_entry["source_hash"] != entry["source_hash"]:
+            changes[entry["source"]] = "changed"
+        if (
+            old_entry["template"] == entry["template"]
+            and old_entry["template_hash"] != entry["template_hash"]
+        ):
+            changes[entry["template"]] = "changed"
+    kinds = INVALIDATING_KINDS
+    if asset_changes:
+        changes.update(asset_changes)
+        kinds = kinds | {ASSET}
+    affected = graph.affected(changes, kinds)
+
+    for dest_path, entry in entries.items():
+        old_entry = old_entries.get(dest_path)
+        page_reasons = []
+        if old_entry is None:
+            page_reasons.append("new page")
+        elif dest_path not in graph.edges:
+            page_reasons.append("no dependencies recorded by the previous build")
+        elif old_entry["template"] != entry["template"]:
+            page_reasons.append(f"template is now {entry['template']}")
+        page_reasons += affected.get(dest_path, [])
+        if not os.path.exists(dest_path):
+            page_reasons.append("output missing")
+        if page_reasons:
+            reasons[dest_path] = page_reasons
+    return entries, reasons
+
+
+def _generate_pages_incremental(pages, basepath, old_entries, graph, static_dir, dest_dir, *,
+                                jobs=1, cache=None, index=None, explain=False, assets=None,
+                                images=None, asset_changes=None, io_threads=0,
+                                max_in_flight=DEFAULT_MAX_IN_FLIGHT, memory_budget=None,
+                                fragments=None):
+    """
+    Generate the pages affected by what changed since the previous build,
+    according to the dependency graph it recorded, which is updated in place.
+    Up to date pages missing from the SiteIndex index, if given, are added
+    to it from their front matter and title alone.
+    With io_threads and a single job, pages are generated in a pipeline.
+    With a MemoryBudget, pages are streamed as by generate_pages. Pages
+    share the blocks rendered in the FragmentCache fragments, if given.
+    Returns the new page manifest entries, keyed by output path.
+    """
+    with get_profiler().phase("hash_sources"):
+        entries, reasons = _stale_pages(pages, old_entries, graph, asset_changes)
+    if explain:
+        print_explanation(reasons, len(pages))
+    stale_pages = [page for page in pages if page[1] in reasons]
+
+    if jobs > 1 or memory_budget is not None:
+        rendered = generate_pages(
+            stale_pages, basepath, jobs=jobs, cache=cache, index=index, assets=assets,
+            images=images, memory_budget=memory_budget, fragments=fragments,
+        )
+    elif io_threads > 0:
+        rendered = generate_pages_pipelined(
+            stale_pages, basepath, cache=cache, index=index, assets=assets, images=images,
+            threads=io_threads, max_in_flight=max_in_flight, fragments=fragments,
+        )
+    else:
+        rendered = []
+        for src_path, dest_path, page_template in stale_pages:
+            entry = generate_page(
+                src_path, page_template, dest_path, basepath,
+                cache=cache, assets=assets, images=images, fragments=fragments,
+            )
+            rendered.append(entry)
+            if index is not None:
+                index.add(entry)
+
+    if index is not None:
+        missing = [(src, dest) for src, dest, _ in pages if dest not in index.pages]
+        for src_path, dest_path in missing:
+            metadata, title = read_page_header(src_path)
+            index.add(page_entry(src_path, dest_path, title, metadata))
+        if missing:
+            print(f"Indexed {len(missing)} page(s) from their front matter")
+
+    sources_by_url = {page_url(dest, dest_dir): src for src, dest, _ in pages}
+    for entry in rendered:
+        graph.set_dependencies(entry["dest"], page_dependencies(
+            entry["source"], entries[entry["dest"]]["template"], entry["urls"],
+            sources_by_url, static_dir,
+        ))
+    graph.prune(entries)
+    return entries
+
+
+def build_incremental(content_dir, static_dir, template_path, dest_dir, basepath="/",
+                      manifest_path=MANIFEST_PATH, *, jobs=1, cache=None, checksum=False,
+                      index=None, site_url=None, page_size=DEFAULT_PAGE_SIZE, explain=False,
+                      compress=False, assets=None, images=None, io_threads=0,
+                      max_in_flight=DEFAULT_MAX_IN_FLIGHT, drafts=False, memory_budget=None,
+                      fragments=None):
+    """
+    Build the site, only re-copying static files and re-rendering pages whose
+    inputs changed since the build recorded in the manifest, and deleting the
+    outputs whose sources no longer exist.
+    When the SiteIndex of the previous build is given, collection pages are
+    built from it once the changed pages have updated it.
+    With explain, print why each page is rebuilt. With compress, compressed
+    siblings of the outputs are kept for compress_tree to bring up to date,
+    instead of being removed. With an AssetManifest, fingerprinted copies of
+    the static files are written and pages referencing a static file whose
+    fingerprint changed are rebuilt. Likewise with an ImageManifest for the
+    resized copies of images. With io_threads and a single job, pages are
+    read and written in that many threads while others are rendered. Drafts
+    are treated as removed unless drafts is set. With a MemoryBudget, pages
+    are streamed from their sources to their outputs instead. With a
+    FragmentCache, blocks repeated across pages are rendered once.
+    """
+    profiler = get_profiler()
+    clear_template_cache()
+    old_manifest = load_manifest(manifest_path, basepath)
+    manifest = new_manifest(basepath)
+
+    with profiler.phase("discover"):
+        pages = discover_pages(content_dir, dest_dir, template_path, drafts)
+    keep = [dest for _, dest, _ in pages]
+    if index is not None:
+        keep += index.outputs
+    if assets is not None:
+        keep += assets.outputs(dest_dir)
+    if images is not None:
+        keep += images.outputs(dest_dir)
+    with profiler.phase("static_sync"):
+        sync_tree(
+            static_dir, dest_dir, keep=keep, checksum=checksum,
+            keep_siblings=_compressed_siblings(compress),
+        )
+        if assets is not None:
+            write_fingerprinted(assets, dest_dir)
+        if images is not None:
+            from .images import write_derivatives
+
+            write_derivatives(images, dest_dir)
+
+    old_asset_urls = old_manifest.get("asset_urls", {})
+    asset_urls = assets.urls if assets is not None else {}
+    asset_changes = {
+        os.path.join(static_dir, *url[1:].split("/")): "fingerprint changed"
+        for url in set(old_asset_urls) | set(asset_urls)
+        if old_asset_urls.get(url) != asset_urls.get(url)
+    }
+    old_images = old_manifest.get("images", {})
+    image_records = images.images if images is not None else {}
+    for url in set(old_images) | set(image_records):
+        if old_images.get(url) != image_records.get(url):
+            path = os.path.join(static_dir, *url[1:].split("/"))
+            asset_changes.setdefault(path, "image size or copies changed")
+    graph = DependencyGraph(old_manifest["graph"])
+    manifest["pages"] = _generate_pages_incremental(
+        pages, basepath, old_manifest["pages"], graph, static_dir, dest_dir,
+        jobs=jobs, cache=cache, index=index, explain=explain, assets=assets, images=images,
+        asset_changes=asset_changes, io_threads=io_threads, max_in_flight=max_in_flight,
+        memory_budget=memory_budget, fragments=fragments,
+    )
+    manifest["graph"] = graph.edges
+    manifest["asset_urls"] = asset_urls
+    manifest["images"] = image_records
+    save_manifest(manifest_path, manifest)
+
+    if index is not None:
+        index.prune(dest for _, dest, _ in pages)
+        with profiler.phase("collections"):
+            build_collections(
+                index, content_dir, dest_dir, template_path, basepath, site_url, page_size,
+                assets,
+            )
+        index.save()
+
+
+def parse_args(argv):
+    if argv and argv[0] == "serve":
+        return _parse_serve_args(argv[1:])
+    if argv and argv[0] == "cache":
+        return _parse_cache_args(argv[1:])
+    if argv and argv[0] == "clean":
+        return _parse_clean_args(argv[1:])
+    if argv and argv[0] == "bench":
+        # bench/run.py parses its own arguments
+        return argparse.Namespace(command="bench", bench_args=argv[1:])
+    # "build" may be left out
+    if argv and argv[0] == "build":
+        argv = argv[1:]
+
+    parser = argparse.ArgumentParser(
+        prog=_prog("build"),
+        description="Build the static site. The other commands are 'serve' for the dev "
+                    "server, 'clean' to remove the site and caches, 'cache clear' to "
+                    "remove the parse cache and 'bench' to run the benchmarks; run them "
+                    "with --help for their options.",
+    )
+    parser.add_argument(
+        "basepath", nargs="?", default="/",
+        help='URL prefix the site is served under (default: "/")',
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="only rebuild outputs whose inputs changed since the last build",
+    )
+    parser.add_argument(
+        "--explain", action="store_true",
+        help="with --incremental, print why each page is rebuilt",
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of processes used to render pages (default: 1)",
+    )
+    parser.add_argument(
+        "--io-threads", type=int, default=DEFAULT_IO_THREADS,
+        help="with a single job, read and write pages in this many threads while "
+             "others are rendered; 0 does everything in turn (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+        help="most pages read but not yet written at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--memory-budget", type=int, metavar="MB",
+        help="build in low-memory mode, streaming each page from its source to its "
+             "output, and keep each process within this many MB where possible",
+    )
+    parser.add_argument(
+        "--checksum", action="store_true",
+        help="compare static files by content instead of by size and mtime",
+    )
+    parser.add_argument(
+        "--no-cache", dest="cache", action="store_false",
+        help="parse every page instead of reusing pages rendered by earlier builds",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="maximum size of the parse cache in MB (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--fragment-cache-size", type=int, default=0, metavar="MB",
+        help="memory in MB for the HTML of blocks repeated across pages, such as "
+             "footers, rendered once per build; 0 turns it off (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--drafts", action="store_true",
+        help='also build pages marked "draft: true" in their front matter',
+    )
+    parser.add_argument(
+        "--no-collections", dest="collections", action="store_false",
+        help="don't generate section and tag listings, feed.xml and sitemap.xml",
+    )
+    parser.add_argument(
+        "--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+        help="entries per listing page (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--site-url",
+        help="absolute URL of the site, such as https://example.com; "
+             "feed.xml and sitemap.xml are only written when it is given",
+    )
+    parser.add_argument(
+        "--compress", action="store_true",
+        help="write .gz (and .br, when the brotli module is installed) copies of text "
+             "files next to them, for servers such as nginx with gzip_static",
+    )
+    parser.add_argument(
+        "--compress-min-size", type=int,
+        help="smallest file in bytes that --compress compresses (default: 1024)",
+    )
+    parser.add_argument(
+        "--fingerprint", action="store_true",
+        help="also write static files under content-hashed names, such as "
+             "index.3f2a9c1d.css, and reference those from pages",
+    )
+    parser.add_argument(
+        "--images", action="store_true",
+        help="give images their width and height and, when Pillow is installed, "
+             "a srcset of resized copies",
+    )
+    parser.add_argument(
+        "--image-widths", type=_parse_widths,
+        help="comma-separated widths of the resized copies (default: 480,960,1600)",
+    )
+    parser.add_argument(
+        "--profile", action="store_true",
+        help="time each build phase and print a report of phases, counters and slowest pages",
+    )
+    parser.add_argument(
+        "--profile-json", default=os.path.join(".cache", "profile.json"),
+        help="where --profile writes its JSON report (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile-top", type=int, default=10,
+        help="number of slowest pages listed by --profile (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.io_threads < 0:
+        parser.error("--io-threads must not be negative")
+    if args.max_in_flight < 1:
+        parser.error("--max-in-flight must be at least 1")
+    if args.explain and not args.incremental:
+        parser.error("--explain only applies to --incremental builds")
+    if args.page_size < 1:
+        parser.error("--page-size must be at least 1")
+    if args.fragment_cache_size < 0:
+        parser.error("--fragment-cache-size must not be negative")
+    if args.memory_budget is not None and args.memory_budget < 1:
+        parser.error("--memory-budget must be at least 1")
+    args.command = "build"
+    return args
+
+
+def _parse_widths(text):
+    try:
+        widths = tuple(int(width) for width in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid width list: {text!r}")
+    if not widths or min(widths) < 1:
+        raise argparse.ArgumentTypeError(f"invalid width list: {text!r}")
+    return widths
+
+
+def _prog(command):
+    return f"{os.path.basename(sys.argv[0]) or 'main.py'} {command}"
+
+
+def _parse_cache_args(argv):
+    parser = argparse.ArgumentParser(
+        prog=_prog("cache"), description="Manage the cache of parsed pages."
+    )
+    parser.add_argument("action", choices=["clear"])
+    args = parser.parse_args(argv)
+    args.command = "cache"
+    return args
+
+
+def _parse_serve_args(argv):
+    parser = argparse.ArgumentParser(
+        prog=_prog("serve"), description="Build the site and serve it locally."
+    )
+    parser.add_argument("--port", type=int, default=8888, help="port to serve on (default: 8888)")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="rebuild changed pages and assets and reload the browser on every edit",
+    )
+    parser.add_argument(
+        "--poll", action="store_true",
+        help="watch for changes by polling instead of inotify",
+    )
+    args = parser.parse_args(argv)
+    args.command = "serve"
+    return args
+
+
+def _parse_clean_args(argv):
+    parser = argparse.ArgumentParser(
+        prog=_prog("clean"), description="Remove the generated site and the build caches."
+    )
+    parser.add_argument(
+        "--keep-cache", action="store_true",
+        help="only remove the generated site, keeping .cache/ for the next build",
+    )
+    args = parser.parse_args(argv)
+    args.command = "clean"
+    return args
+
+
+def _compressed_siblings(compress):
+    """
+    The keep_siblings function for sync_tree: with compress, compressed
+    copies of outputs are kept for compress_tree to bring up to date.
+    """
+    if not compress:
+        return None
+    # Compression is only imported by builds using it, to keep startup fast
+    from .compress import sibling_source
+
+    return sibling_source
+
+
+def compress_output(dest_dir, min_size=None):
+    """Write compressed siblings of the text files that changed in dest_dir."""
+    from .compress import COMPRESS_PATH, COMPRESSORS, DEFAULT_MIN_SIZE, compress_tree
+
+    if min_size is None:
+        min_size = DEFAULT_MIN_SIZE
+    with get_profiler().phase("compress"):
+        result = compress_tree(dest_dir, min_size, record_path=COMPRESS_PATH)
+    formats = " and ".join(suffix[1:] for suffix in COMPRESSORS)
+    print(
+        f"\nCompressed {len(result.compressed)} file(s) with {formats}, "
+        f"{result.unchanged} unchanged, {len(result.removed)} removed"
+    )
+
+
+def build(args):
+    """Build the site as described by the parsed command line arguments."""
+    profiler = get_profiler()
+    basepath = args.basepath
+    
+    print(f"Using basepath: {basepath}")
+    write_counts.take()
+    cache = ParseCache(max_bytes=args.cache_size * 1024 * 1024) if args.cache else None
+    budget = None
+    if args.memory_budget is not None:
+        # Streamed pages skip the parse cache, which would hold whole pages
+        budget = MemoryBudget(args.memory_budget * 1024 * 1024)
+        cache = None
+    fragments = None
+    if args.fragment_cache_size:
+        fragments = FragmentCache(args.fragment_cache_size * 1024 * 1024)
+    assets = None
+    if args.fingerprint:
+        with profiler.phase("fingerprint"):
+            assets = scan_assets("static", ASSETS_PATH)
+        assets.save(ASSETS_PATH)
+    images = None
+    if args.images:
+        # Imported only when used, as Pillow is slow to import
+        from .images import DEFAULT_WIDTHS, IMAGES_PATH, process_images
+
+        widths = args.image_widths or DEFAULT_WIDTHS
+        with profiler.phase("images"):
+            images = process_images("static", widths, args.jobs, IMAGES_PATH)
+        images.save(IMAGES_PATH)
+
+    if args.incremental:
+        build_incremental(
+            "content", "static", "template.html", "docs", basepath,
+            jobs=args.jobs, cache=cache, checksum=args.checksum,
+            index=SiteIndex.load(INDEX_PATH) if args.collections else None,
+            site_url=args.site_url, page_size=args.page_size, explain=args.explain,
+            compress=args.compress, assets=assets, images=images,
+            io_threads=args.io_threads, max_in_flight=args.max_in_flight, drafts=args.drafts,
+            memory_budget=budget, fragments=fragments,
+        )
+        if cache is not None:
+            cache.evict()
+        if args.compress:
+            compress_output("docs", args.compress_min_size)
+        report_writes()
+        if fragments is not None:
+            fragments.report()
+        if budget is not None:
+            budget.report()
+        print("\nIncremental build finished successfully!")
+        return
+
+    # A full build doesn't record page hashes, so the manifest would be stale
+    remove_manifest(MANIFEST_PATH)
+    
+    # Sync static files to docs directory, removing anything that is neither
+    # a static file nor a page
+    with profiler.phase("discover"):
+        pages = discover_pages("content", "docs", "template.html", args.drafts)
+    keep = [dest for _, dest, _ in pages]
+    if args.collections:
+        # Listings are rewritten from scratch, but kept until then so that
+        # unchanged ones aren't written again
+        index = SiteIndex(INDEX_PATH)
+        index.outputs = SiteIndex.load(INDEX_PATH).outputs
+        keep += index.outputs
+    else:
+        index = None
+    if assets is not None:
+        keep += assets.outputs("docs")
+    if images is not None:
+        keep += images.outputs("docs")
+    with profiler.phase("static_sync"):
+        sync_tree(
+            "static", "docs", keep=keep, checksum=args.checksum,
+            keep_siblings=_compressed_siblings(args.compress),
+        )
+        if assets is not None:
+            write_fingerprinted(assets, "docs")
+        if images is not None:
+            from .images import write_derivatives
+
+            write_derivatives(images, "docs")
+    print("\nStatic files synced successfully!")
+    
+    # Generate all pages, recursively or across a process pool
+    if args.jobs > 1 or budget is not None:
+        generate_pages(
+            pages, basepath, jobs=args.jobs, cache=cache, index=index, assets=assets,
+            images=images, memory_budget=budget, fragments=fragments,
+        )
+    elif args.io_threads > 0:
+        generate_pages_pipelined(
+            pages, basepath, cache=cache, index=index, assets=assets, images=images,
+            threads=args.io_threads, max_in_flight=args.max_in_flight, fragments=fragments,
+        )
+    else:
+        generate_pages_recursive(
+            "content", "template.html", "docs", basepath, cache=cache, index=index,
+            assets=assets, images=images, drafts=args.drafts, fragments=fragments,
+        )
+    if cache is not None:
+        cache.evict()
+    print("\nAll pages generated successfully!")
+
+    # Listing pages, feed and sitemap, from the index filled in above
+    if index is not None:
+        with profiler.phase("collections"):
+            build_collections(
+                index, "content", "docs", "template.html", basepath, args.site_url,
+                args.page_size, assets,
+            )
+        index.save()
+
+    if args.compress:
+        compress_output("docs", args.compress_min_size)
+    report_writes()
+    if fragments is not None:
+        fragments.report()
+    if budget is not None:
+        budget.report()
+
+
+def clean(dest_dir, cache_dir, keep_cache=False):
+    """Remove the generated site and, unless keep_cache is set, the build caches."""
+    import shutil
+
+    for path in [dest_dir] if keep_cache else [dest_dir, cache_dir]:
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+            print(f"Removed {path}")
+
+
+def run_bench(argv):
+    """Run bench/run.py with the arguments argv and return its exit status."""
+    import subprocess
+
+    if not os.path.isfile(BENCH_SCRIPT):
+        print(f"{BENCH_SCRIPT} not found: benchmarks run from a source checkout",
+              file=sys.stderr)
+        return 2
+    return subprocess.call([sys.executable, BENCH_SCRIPT, *argv])
+
+
+def report_writes():
+    """Print how many pages and listings were written, and how many were unchanged."""
+    written, unchanged = write_counts.take()
+    print(f"\nWrote {written} file(s), {unchanged} unchanged")
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    if args.command == "serve":
+        # Imported here so that plain builds don't load the server
+        from .server import serve
+        serve("content", "static", "template.html", "docs", args.port, args.watch, args.poll)
+        return
+    if args.command == "cache":
+        ParseCache().clear()
+        print("Parse cache cleared")
+        return
+    if args.command == "clean":
+        clean("docs", ".cache", args.keep_cache)
+        return
+    if args.command == "bench":
+        sys.exit(run_bench(args.bench_args))
+
+    if not args.profile:
+        build(args)
+        return
+
+    profiler = Profiler()
+    activate(profiler)
+    try:
+        build(args)
+    finally:
+        activate(None)
+        profiler.stop()
+        print("\n" + profiler.report(args.profile_top))
+        profiler.write_json(args.profile_json)
+        print(f"\nProfile written to {args.profile_json}")
+
+
+def cli():
+    """Entry point of the simple-static-gen command."""
+    try:
+        main()
+    except BuildError as e:
+        print(f"\n{e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,70 @@
+import hashlib
+import json
+import os
+
+# Bump whenever a change to the generator alters the HTML it produces, so that
+# incremental builds made by an older version are thrown away.
+GENERATOR_VERSION = "4"
+
+MANIFEST_PATH = os.path.join(".cache", "manifest.json")
+
+
+def hash_file(path):
+    """Return the sha256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def new_manifest(basepath):
+    """Return an empty manifest for a build using the given basepath."""
+    return {
+        "generator_version": GENERATOR_VERSION,
+        "basepath": basepath,
+        "pages": {},
+        "graph": {},
+    }
+
+
+def load_manifest(path, basepath):
+    """
+    Load the manifest written by the previous build.
+    Returns an empty manifest if there is none, if it cannot be read, or if it
+    was produced by another generator version or for another basepath, since
+    none of its outputs can be reused in that case.
+    """
+    try:
+        with open(path, "r") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return new_manifest(basepath)
+
+    if (
+        not isinstance(manifest, dict)
+        or manifest.get("generator_version") != GENERATOR_VERSION
+        or manifest.get("basepath") != basepath
+    ):
+        return new_manifest(basepath)
+
+    manifest.setdefault("pages", {})
+    manifest.setdefault("graph", {})
+    return manifest
+
+
+def save_manifest(path, manifest):
+    """Atomically write the manifest to disk."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def remove_manifest(path):
+    """Delete the manifest, if any."""
+    if os.path.exists(path):
+        os.remove(path)
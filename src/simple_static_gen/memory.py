@@ -0,0 +1,71 @@
+import gc
+import os
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss(children=False):
+    """
+    The peak resident set size in bytes of this process, or with children of
+    the largest of its finished child processes, or None where unknown.
+    """
+    if resource is None:
+        return None
+    who = resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF
+    peak = resource.getrusage(who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def build_peak_rss():
+    """
+    The peak resident set size in bytes of this process or of any of its
+    finished child processes, such as the workers of a build, or None.
+    """
+    peaks = [peak for peak in (peak_rss(), peak_rss(children=True)) if peak is not None]
+    return max(peaks) if peaks else None
+
+
+def current_rss():
+    """The resident set size of this process in bytes, or None where unknown."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class MemoryBudget:
+    """
+    A soft limit on the memory of each build process. Checked between pages;
+    going over it triggers a garbage collection, and the peak is reported at
+    the end of the build.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.collections = 0
+
+    def check(self):
+        """Collect garbage if the process is over budget. Returns whether it was."""
+        rss = current_rss()
+        if rss is None or rss <= self.max_bytes:
+            return False
+        gc.collect()
+        self.collections += 1
+        return True
+
+    def report(self):
+        """Print the peak memory of the build, and whether it kept to the budget."""
+        peak = build_peak_rss()
+        if peak is None:
+            print("Peak memory: unknown on this platform")
+            return
+        budget = self.max_bytes / (1024 * 1024)
+        print(f"Peak memory: {peak / (1024 * 1024):.1f} MB (budget {budget:.0f} MB)")
+        if peak > self.max_bytes:
+            print(f"Warning: the build went over its memory budget of {budget:.0f} MB")
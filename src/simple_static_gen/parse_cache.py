@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import shutil
+
+from .manifest import GENERATOR_VERSION
+
+CACHE_DIR = os.path.join(".cache", "pages")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class ParseCache:
+    """
+    On-disk cache of rendered pages, mapping the hash of a markdown document
+    (plus the generator version and basepath) to its title and HTML content,
+    so that unchanged documents are never parsed twice.
+    Entries are evicted least recently used first once the cache grows past
+    max_bytes; reading an entry refreshes its mtime to mark it as used.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, markdown, basepath="/", variant=""):
+        """
+        variant holds anything else the HTML depends on, such as the
+        fingerprinted names of the assets the page references.
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{GENERATOR_VERSION}\0{basepath}\0{variant}\0".encode())
+        digest.update(markdown.encode())
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + ".json")
+
+    def get(self, key):
+        """Return the (title, html) pair stored under key, or None."""
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry["title"], entry["html"]
+
+    def put(self, key, title, html):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"title": title, "html": html}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _entries(self):
+        entries = []
+        for dir_path, _, file_names in os.walk(self.directory):
+            for file_name in file_names:
+                if file_name.endswith(".json"):
+                    stat = os.stat(os.path.join(dir_path, file_name))
+                    entries.append((stat.st_mtime_ns, stat.st_size, os.path.join(dir_path, file_name)))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+        return total
+
+    def clear(self):
+        if os.path.exists(self.directory):
+            shutil.rmtree(self.directory)
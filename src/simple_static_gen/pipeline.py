@@ -0,0 +1,53 @@
+import threading
+from collections import deque
+
+DEFAULT_IO_THREADS = 4
+DEFAULT_MAX_IN_FLIGHT = 32
+
+
+def run_pipeline(items, read, process, write, threads=DEFAULT_IO_THREADS,
+                 max_in_flight=DEFAULT_MAX_IN_FLIGHT):
+    """
+    Call read(item) and write(item, processed) for every item in a pool of
+    threads, and process(item, data) in between on the calling thread, in
+    order, so that reading and writing overlap processing. At most
+    max_in_flight items are between the start of their read and the end of
+    their write, which bounds the memory the pipeline holds.
+    Returns a (result, error) pair for every item, in order: the value write
+    returned, or the exception raised by whichever step failed.
+    """
+    items = list(items)
+    if not items:
+        return []
+    from concurrent.futures import ThreadPoolExecutor
+
+    outcomes = [None] * len(items)
+    slots = threading.BoundedSemaphore(max_in_flight)
+    reads = deque()
+    writes = []
+    next_item = 0
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        while next_item < len(items) or reads:
+            # Read ahead while there is room, waiting for a write to finish
+            # only when there is nothing read to process meanwhile
+            while next_item < len(items) and slots.acquire(blocking=not reads):
+                reads.append((next_item, executor.submit(read, items[next_item])))
+                next_item += 1
+
+            position, future = reads.popleft()
+            try:
+                processed = process(items[position], future.result())
+            except Exception as e:
+                outcomes[position] = (None, e)
+                slots.release()
+                continue
+            future = executor.submit(write, items[position], processed)
+            future.add_done_callback(lambda _: slots.release())
+            writes.append((position, future))
+
+        for position, future in writes:
+            try:
+                outcomes[position] = (future.result(), None)
+            except Exception as e:
+                outcomes[position] = (None, e)
+    return outcomes
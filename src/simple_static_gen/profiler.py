@@ -0,0 +1,249 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from .memory import build_peak_rss
+
+# Pipeline phases in the order they run for a page. Phases indented under
+# "parse" run inside it, so their time is also part of the parse time, which
+# includes serializing each block to HTML. A --memory-budget build runs them
+# in "stream" instead, which parses, fills the template and writes a page a
+# block at a time, and where iter_blocks also reads the page's lines.
+PAGE_PHASES = [
+    "read",
+    "parse",
+    "stream",
+    "  iter_blocks",
+    "  text_to_textnodes",
+    "template",
+    "write",
+]
+_PAGE_PHASE_NAMES = {name.strip() for name in PAGE_PHASES}
+
+_active = None
+_instrumented = False
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class NullProfiler:
+    """Stands in for a Profiler when profiling is off, doing nothing cheaply."""
+
+    enabled = False
+    _phase = _NullPhase()
+
+    def phase(self, name):
+        return self._phase
+
+    def count(self, name, amount=1):
+        pass
+
+    def record_page(self, path, seconds):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Accumulates time spent in each build phase, event counters and the time
+    taken by each page. Safe to use from the I/O threads of a pipelined build.
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.phase_seconds = defaultdict(float)
+        self.phase_calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.pages = []
+        self.started = time.perf_counter()
+        self.wall_seconds = None
+        self.peak_rss_bytes = None
+        self._lock = threading.Lock()
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def add_time(self, name, seconds, calls=1):
+        with self._lock:
+            self.phase_seconds[name] += seconds
+            self.phase_calls[name] += calls
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def record_page(self, path, seconds):
+        with self._lock:
+            self.pages.append((seconds, path))
+
+    def stop(self):
+        self.wall_seconds = time.perf_counter() - self.started
+        self.peak_rss_bytes = build_peak_rss()
+
+    def to_dict(self):
+        return {
+            "wall_seconds": self.wall_seconds,
+            "peak_rss_bytes": self.peak_rss_bytes,
+            "phases": {
+                name: {"seconds": self.phase_seconds[name], "calls": self.phase_calls[name]}
+                for name in self.phase_seconds
+            },
+            "counters": dict(self.counters),
+            "pages": [{"path": path, "seconds": seconds} for seconds, path in self.pages],
+        }
+
+    def merge(self, data):
+        """Add the measurements of another profiler, as returned by to_dict."""
+        for name, phase in data["phases"].items():
+            self.add_time(name, phase["seconds"], phase["calls"])
+        for name, amount in data["counters"].items():
+            self.count(name, amount)
+        self.pages.extend((page["seconds"], page["path"]) for page in data["pages"])
+
+    def report(self, slowest=10):
+        """Return the summary table as a string."""
+        wall = self.wall_seconds or (time.perf_counter() - self.started)
+        lines = [f"{'phase':<24} {'calls':>8} {'total ms':>11} {'% of build':>11}"]
+        names = [name for name in PAGE_PHASES if name.strip() in self.phase_seconds]
+        names += sorted(name for name in self.phase_seconds if name not in _PAGE_PHASE_NAMES)
+        for name in names:
+            seconds = self.phase_seconds[name.strip()]
+            lines.append(
+                f"{name:<24} {self.phase_calls[name.strip()]:>8} {seconds * 1000:>11.1f}"
+                f" {seconds / wall * 100 if wall else 0:>10.1f}%"
+            )
+        lines.append(f"{'build (wall clock)':<24} {'':>8} {wall * 1000:>11.1f}")
+        if self.peak_rss_bytes is not None:
+            lines.append(f"{'peak RSS (MB)':<24} {'':>8} {self.peak_rss_bytes / 2**20:>11.1f}")
+
+        lines.append("")
+        lines.append(f"{'counter':<24} {'value':>12}")
+        for name in sorted(self.counters):
+            lines.append(f"{name:<24} {self.counters[name]:>12}")
+
+        if self.pages and slowest:
+            lines.append("")
+            lines.append(f"slowest {min(slowest, len(self.pages))} pages:")
+            for seconds, path in sorted(self.pages, reverse=True)[:slowest]:
+                lines.append(f"  {seconds * 1000:>9.2f} ms  {path}")
+        return "\n".join(lines)
+
+    def write_json(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=1)
+
+
+def get_profiler():
+    """Return the active profiler, or NULL_PROFILER when profiling is off."""
+    return _active if _active is not None else NULL_PROFILER
+
+
+def activate(profiler):
+    """
+    Make profiler the active profiler (None turns profiling off) and return
+    the previously active one.
+    """
+    global _active
+    previous = _active
+    _active = profiler
+    if profiler is not None:
+        _instrument_parser()
+    return previous
+
+
+def _timed(function, phase, on_result=None):
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        profiler = get_profiler()
+        if not profiler.enabled:
+            return function(*args, **kwargs)
+        start = time.perf_counter()
+        result = function(*args, **kwargs)
+        profiler.add_time(phase, time.perf_counter() - start)
+        if on_result is not None:
+            on_result(profiler, result)
+        return result
+
+    return wrapper
+
+
+def _timed_iter(function, phase, on_item=None):
+    """Like _timed, for generator functions: times each step of the iteration."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        iterator = function(*args, **kwargs)
+        profiler = get_profiler()
+        if not profiler.enabled:
+            return iterator
+        return _timed_steps(iterator, profiler, phase, on_item)
+
+    return wrapper
+
+
+def _timed_steps(iterator, profiler, phase, on_item):
+    while True:
+        start = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            profiler.add_time(phase, time.perf_counter() - start)
+            return
+        profiler.add_time(phase, time.perf_counter() - start, calls=0)
+        if on_item is not None:
+            on_item(profiler, item)
+        yield item
+
+
+def _instrument_parser():
+    """
+    Wrap the parser's inner functions in timers. Only done once profiling is
+    first turned on, so that unprofiled builds pay nothing for it.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+    _instrumented = True
+
+    from . import block_markdown
+
+    block_markdown.iter_blocks = _timed_iter(
+        block_markdown.iter_blocks,
+        "iter_blocks",
+        lambda profiler, block: profiler.count(f"blocks.{block[0].value}"),
+    )
+    block_markdown.text_to_textnodes = _timed(
+        block_markdown.text_to_textnodes,
+        "text_to_textnodes",
+        lambda profiler, nodes: profiler.count("inline_nodes", len(nodes)),
+    )
@@ -0,0 +1,149 @@
+import threading
+
+from .block_markdown import extract_title, markdown_to_html
+from .fragment_cache import FragmentCache
+from .frontmatter import split_front_matter
+from .htmlnode import rewrite_urls
+from .template import basepath_rewriter, load_template
+
+DEFAULT_BATCH_SIZE = 64
+
+
+def block_transform(basepath="/", assets=None, images=None):
+    """
+    The changes made to the tree of every block before it is serialized:
+    site-absolute URLs are pointed at the basepath, and at fingerprinted
+    copies with an AssetManifest, and images get their size and resized
+    copies with an ImageManifest.
+    """
+    rewrite = basepath_rewriter(basepath, assets)
+    if images is not None:
+        from .images import add_image_attributes
+
+    def transform(html_node):
+        if images is not None:
+            add_image_attributes(html_node, images)
+        rewrite_urls(html_node, rewrite)
+
+    return transform
+
+
+class Renderer:
+    """
+    Renders markdown documents to HTML, for embedding the generator in other
+    programs such as a preview service. Everything that doesn't depend on
+    the document is set up once: the compiled template, the URL rewriting
+    and a FragmentCache of the blocks rendered so far, so documents sharing
+    blocks are rendered faster. Safe to use from several threads.
+
+    template is a Template, the path of a template file, or None to render
+    only the HTML of the documents; either way the template's URLs are
+    pointed at the basepath like the documents'. With processes > 1, render_many hands
+    large batches to a pool of that many worker processes, each with a
+    renderer of its own; close the renderer, or use it as a context manager,
+    to shut the pool down.
+    """
+
+    def __init__(self, template=None, basepath="/", assets=None, images=None,
+                 fragments=None, processes=0):
+        if isinstance(template, str):
+            template = load_template(template, basepath, assets)
+        elif template is not None:
+            template = template.with_rewriter(basepath_rewriter(basepath, assets))
+        self.template = template
+        self.basepath = basepath
+        self.fragments = fragments if fragments is not None else FragmentCache()
+        self.processes = processes
+        self._transform = block_transform(basepath, assets, images)
+        self._assets = assets
+        self._images = images
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def __getstate__(self):
+        # Sent to worker processes: everything but the pool, and the
+        # fragment cache pickles empty
+        return {
+            "template": self.template,
+            "basepath": self.basepath,
+            "assets": self._assets,
+            "images": self._images,
+            "fragments": self.fragments,
+        }
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def render(self, markdown):
+        """
+        Return the HTML of a markdown document, filled into the template if
+        there is one. Front matter is left out, and its title, if any, is
+        used instead of the document's first "# " heading.
+        """
+        metadata, body = split_front_matter(markdown)
+        html_content = markdown_to_html(body, self.fragments, self._transform)
+        if self.template is None:
+            return html_content
+        title = str(metadata["title"]) if "title" in metadata else extract_title(body)
+        return self.template.render(Title=title, Content=html_content)
+
+    def render_many(self, docs, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        Render a sequence of markdown documents, returning their HTML in the
+        same order. With a process pool, the documents are rendered in
+        batches of batch_size, one batch per task.
+        """
+        docs = list(docs)
+        if self.processes < 2 or len(docs) <= batch_size:
+            return [self.render(markdown) for markdown in docs]
+        batches = [docs[start:start + batch_size] for start in range(0, len(docs), batch_size)]
+        results = []
+        for batch_results in self._get_pool().map(_render_batch, batches):
+            results.extend(batch_results)
+        return results
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                from concurrent.futures import ProcessPoolExecutor
+
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.processes, initializer=_init_worker, initargs=(self,)
+                )
+            return self._pool
+
+    def close(self):
+        """Shut down the process pool, if one was started."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+
+# The Renderer of a worker process of a Renderer's pool
+_worker_renderer = None
+
+
+def _init_worker(renderer):
+    global _worker_renderer
+    _worker_renderer = renderer
+
+
+def _render_batch(docs):
+    return [_worker_renderer.render(markdown) for markdown in docs]
+
+
+def render_many(docs, template=None, basepath="/", processes=0):
+    """
+    Render a sequence of markdown documents to HTML with a Renderer made for
+    the purpose. Keep a Renderer instead to render more batches later.
+    """
+    with Renderer(template, basepath, processes=processes) as renderer:
+        return renderer.render_many(docs)
@@ -0,0 +1,395 @@
+import ctypes
+import ctypes.util
+import glob
+import os
+import select
+import struct
+import threading
+import time
+from fnmatch import fnmatchcase
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from .main import build_incremental, generate_page, page_options
+from .manifest import MANIFEST_PATH
+from .parse_cache import ParseCache
+from .site_index import SiteIndex, build_collections
+from .sync import copy_file, remove_output
+from .template import TEMPLATE_FILENAME, resolve_template
+
+LIVERELOAD_PATH = "/__livereload"
+
+# Polls the server until the site is rebuilt, then reloads the page. The
+# server holds the request open until a rebuild happens, so the reload
+# follows the rebuild immediately.
+LIVERELOAD_SCRIPT = """<script>
+(function () {
+  var generation = %d;
+  function poll() {
+    fetch("%s?since=" + generation)
+      .then(function (response) { return response.text(); })
+      .then(function (text) {
+        if (Number(text) !== generation) { location.reload(); } else { poll(); }
+      })
+      .catch(function () { setTimeout(poll, 1000); });
+  }
+  poll();
+})();
+</script>"""
+
+# inotify(7) event masks
+_IN_MODIFY = 0x00000002
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_ISDIR = 0x40000000
+_IN_WATCH_MASK = (
+    _IN_MODIFY | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher:
+    """
+    Watches files and directory trees with Linux inotify, through libc so
+    that no third-party package is needed. A file path may be a glob
+    pattern such as "site/*.html", to watch files yet to be created.
+    """
+
+    def __init__(self, paths, settle=0.02):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._settle = settle
+        self._directories = {}
+        # Files watched on their own; events for their siblings are ignored
+        self._files = {}
+        for path in paths:
+            if os.path.isdir(path):
+                self._add_tree(path)
+            else:
+                directory = os.path.dirname(path) or "."
+                self._files.setdefault(os.path.normpath(directory), set()).add(
+                    os.path.normpath(path)
+                )
+                self._add_directory(directory)
+
+    def close(self):
+        os.close(self._fd)
+
+    def _add_directory(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _IN_WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self._directories[wd] = os.path.normpath(directory)
+
+    def _add_tree(self, root):
+        for dir_path, _, _ in os.walk(root):
+            self._add_directory(dir_path)
+
+    def wait(self):
+        """Block until something changes and return the set of changed paths."""
+        changed = set()
+        while not changed:
+            select.select([self._fd], [], [])
+            changed |= self._read_events()
+            # Editors often write a file in several steps; collect them all
+            while select.select([self._fd], [], [], self._settle)[0]:
+                changed |= self._read_events()
+        return changed
+
+    def _read_events(self):
+        changed = set()
+        data = os.read(self._fd, 1 << 16)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            directory = self._directories.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.normpath(os.path.join(directory, name))
+            if mask & _IN_ISDIR:
+                if mask & (_IN_CREATE | _IN_MOVED_TO) and directory not in self._files:
+                    self._add_tree(path)
+                    changed.update(_list_tree(path))
+                continue
+            watched_files = self._files.get(directory)
+            if watched_files is not None and not any(
+                fnmatchcase(path, pattern) for pattern in watched_files
+            ):
+                continue
+            changed.add(path)
+        return changed
+
+
+class PollingWatcher:
+    """
+    Watches files and directory trees by comparing mtimes and sizes. A file
+    path may be a glob pattern, as with InotifyWatcher.
+    """
+
+    def __init__(self, paths, interval=0.25):
+        self._paths = paths
+        self._interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for path in self._paths:
+            for file_path in _list_tree(path) if os.path.isdir(path) else glob.glob(path):
+                try:
+                    stat = os.stat(file_path)
+                except FileNotFoundError:
+                    continue
+                snapshot[os.path.normpath(file_path)] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self):
+        """Block until something changes and return the set of changed paths."""
+        while True:
+            time.sleep(self._interval)
+            snapshot = self._take_snapshot()
+            changed = {
+                path
+                for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed:
+                return changed
+
+
+def _list_tree(root):
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            yield os.path.normpath(os.path.join(dir_path, file_name))
+
+
+def create_watcher(paths, polling=False):
+    """Return an inotify watcher for paths, or a polling one if inotify is unavailable."""
+    if not polling:
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), falling back to polling")
+    return PollingWatcher(paths)
+
+
+class SiteRebuilder:
+    """
+    Keeps the generator warm between edits and rebuilds only the outputs of
+    the files that changed.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, dest_dir, basepath="/",
+                 manifest_path=MANIFEST_PATH, cache=None, index=None):
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.dest_dir = dest_dir
+        self.basepath = basepath
+        self.manifest_path = manifest_path
+        self.cache = cache
+        self.index = index
+
+    def build_all(self):
+        build_incremental(
+            self.content_dir, self.static_dir, self.template_path, self.dest_dir,
+            self.basepath, self.manifest_path, cache=self.cache, index=self.index,
+        )
+
+    def rebuild(self, changed_paths):
+        """Rebuild the outputs depending on changed_paths."""
+        changed_paths = sorted(os.path.normpath(path) for path in changed_paths)
+        if any(self._is_template(path) for path in changed_paths):
+            # A template can affect any page below it; let the manifest decide
+            self.build_all()
+            return
+
+        for path in changed_paths:
+            if _is_below(path, self.content_dir):
+                if path.endswith(".md"):
+                    self._rebuild_page(path)
+            elif _is_below(path, self.static_dir):
+                self._rebuild_static(path)
+        if self.index is not None and any(path.endswith(".md") for path in changed_paths):
+            build_collections(
+                self.index, self.content_dir, self.dest_dir, self.template_path, self.basepath
+            )
+            self.index.save()
+
+    def _is_template(self, path):
+        # Templates named in front matter live next to the default template
+        return (
+            path == self.template_path
+            or os.path.basename(path) == TEMPLATE_FILENAME
+            or (
+                path.endswith(".html")
+                and os.path.dirname(path) == os.path.dirname(self.template_path)
+            )
+        )
+
+    def _rebuild_page(self, src_path):
+        rel_path = os.path.relpath(src_path, self.content_dir)
+        dest_path = os.path.join(self.dest_dir, rel_path[:-3] + ".html")
+        template_name, skip = page_options(src_path) if os.path.exists(src_path) else (None, True)
+        if not skip:
+            template_path = resolve_template(
+                src_path, self.content_dir, self.template_path, template_name
+            )
+            entry = generate_page(
+                src_path, template_path, dest_path, self.basepath, cache=self.cache
+            )
+            if self.index is not None:
+                self.index.add(entry)
+        else:
+            remove_output(dest_path, self.dest_dir)
+            if self.index is not None:
+                self.index.remove(dest_path)
+
+    def _rebuild_static(self, src_path):
+        dest_path = os.path.join(self.dest_dir, os.path.relpath(src_path, self.static_dir))
+        if os.path.exists(src_path):
+            print(f"Copying file: {src_path} -> {dest_path}")
+            copy_file(src_path, dest_path)
+        else:
+            remove_output(dest_path, self.dest_dir)
+
+
+def _is_below(path, directory):
+    return path.startswith(directory + os.sep)
+
+
+class LiveReloadState:
+    """Counts rebuilds and lets requests wait for the next one."""
+
+    def __init__(self):
+        self.generation = 0
+        self._condition = threading.Condition()
+
+    def bump(self):
+        with self._condition:
+            self.generation += 1
+            self._condition.notify_all()
+
+    def wait_for_change(self, since, timeout=30):
+        with self._condition:
+            self._condition.wait_for(lambda: self.generation != since, timeout)
+            return self.generation
+
+
+class DevRequestHandler(SimpleHTTPRequestHandler):
+    """Serves the output directory, injecting the live reload script into pages."""
+
+    def __init__(self, *args, livereload=None, **kwargs):
+        self.livereload = livereload
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == LIVERELOAD_PATH:
+            self._send_generation(query)
+            return
+
+        file_path = self.translate_path(path)
+        if os.path.isdir(file_path):
+            if not path.endswith("/"):
+                # Let the base class redirect /blog to /blog/
+                super().do_GET()
+                return
+            file_path = os.path.join(file_path, "index.html")
+        if self.livereload is None or not file_path.endswith(".html") or not os.path.isfile(file_path):
+            super().do_GET()
+            return
+
+        with open(file_path, "rb") as f:
+            body = f.read()
+        script = (LIVERELOAD_SCRIPT % (self.livereload.generation, LIVERELOAD_PATH)).encode()
+        if b"</body>" in body:
+            body = body.replace(b"</body>", script + b"</body>", 1)
+        else:
+            body += script
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_generation(self, query):
+        since = None
+        for parameter in query.split("&"):
+            name, _, value = parameter.partition("=")
+            if name == "since" and value.isdigit():
+                since = int(value)
+        generation = self.livereload.generation
+        if since is not None:
+            generation = self.livereload.wait_for_change(since)
+        body = str(generation).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Long-polling requests would flood the console
+        if not self.path.startswith(LIVERELOAD_PATH):
+            super().log_message(format, *args)
+
+
+def serve(content_dir, static_dir, template_path, dest_dir, port=8888, watch=False,
+          polling=False):
+    """
+    Build the site, serve it on localhost and, with watch, rebuild the
+    affected outputs and reload the browser whenever a source changes.
+    """
+    rebuilder = SiteRebuilder(
+        content_dir, static_dir, template_path, dest_dir, cache=ParseCache(),
+        index=SiteIndex.load(),
+    )
+    rebuilder.build_all()
+
+    livereload = LiveReloadState() if watch else None
+    handler = partial(DevRequestHandler, directory=dest_dir, livereload=livereload)
+    server = ThreadingHTTPServer(("", port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    print(f"\nServing {dest_dir} at http://localhost:{port}/")
+
+    try:
+        if not watch:
+            thread.join()
+            return
+        # Every template a page can name in its front matter sits next to
+        # the default one
+        templates = os.path.join(os.path.dirname(template_path) or ".", "*.html")
+        watcher = create_watcher([content_dir, static_dir, templates], polling)
+        print(f"Watching {content_dir}, {static_dir} and {templates} for changes")
+        while True:
+            changed = watcher.wait()
+            start = time.perf_counter()
+            try:
+                rebuilder.rebuild(changed)
+            except Exception as e:
+                print(f"Rebuild failed: {type(e).__name__}: {e}")
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"Rebuilt {len(changed)} changed file(s) in {elapsed:.1f} ms")
+            livereload.bump()
+    except KeyboardInterrupt:
+        print("\nStopping server")
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,356 @@
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+from .htmlnode import LeafNode, ParentNode, rewrite_urls
+from .manifest import GENERATOR_VERSION, hash_file
+from .sync import remove_output, write_if_changed
+from .template import basepath_rewriter, load_template, resolve_template
+
+INDEX_PATH = os.path.join(".cache", "index.json")
+DEFAULT_PAGE_SIZE = 10
+FEED_SIZE = 20
+TAGS_DIR = "tags"
+
+
+def page_entry(src_path, dest_path, title, metadata, urls=()):
+    """
+    The index entry for a rendered page. urls are the links and images it
+    references, including its template's.
+    """
+    return {
+        "source": src_path,
+        "dest": dest_path,
+        "title": title,
+        "mtime": os.path.getmtime(src_path),
+        "metadata": metadata,
+        "urls": sorted(set(urls)),
+    }
+
+
+class SiteIndex:
+    """
+    Title, path, mtime and front matter of every page, keyed by output path.
+    Filled in as pages are rendered and kept between builds, so that listing
+    pages, feeds and the sitemap can be written without reading any page.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = path
+        self.pages = {}
+        # Collection pages written by the last build, and what they were built from
+        self.outputs = []
+        self.digest = None
+
+    @classmethod
+    def load(cls, path=INDEX_PATH):
+        """Load the index saved by the previous build, or an empty one."""
+        index = cls(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+        if not isinstance(data, dict) or data.get("generator_version") != GENERATOR_VERSION:
+            return index
+        index.pages = data.get("pages", {})
+        index.outputs = data.get("outputs", [])
+        index.digest = data.get("digest")
+        return index
+
+    def save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "generator_version": GENERATOR_VERSION,
+                    "pages": self.pages,
+                    "outputs": self.outputs,
+                    "digest": self.digest,
+                },
+                f, indent=1, sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
+
+    def add(self, entry):
+        # The URLs a page references are for the dependency graph; leaving
+        # them out lets entries be made from the front matter alone
+        self.pages[entry["dest"]] = {key: value for key, value in entry.items() if key != "urls"}
+
+    def remove(self, dest_path):
+        self.pages.pop(dest_path, None)
+
+    def prune(self, dest_paths):
+        """Drop the entries of pages that are no longer in dest_paths."""
+        dest_paths = set(dest_paths)
+        for dest_path in list(self.pages):
+            if dest_path not in dest_paths:
+                del self.pages[dest_path]
+
+
+def page_url(dest_path, dest_dir):
+    """The site-absolute URL of an output file, without the basepath."""
+    rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[:-len("index.html")]
+    return "/" + rel_path
+
+
+def _sort_key(entry):
+    date = entry["metadata"].get("date")
+    if not date:
+        date = datetime.fromtimestamp(entry["mtime"], timezone.utc).date().isoformat()
+    return str(date), entry["title"]
+
+
+def _entry_datetime(entry):
+    date = entry["metadata"].get("date")
+    if date:
+        try:
+            parsed = datetime.fromisoformat(str(date))
+        except ValueError:
+            parsed = None
+        if parsed is not None:
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    return datetime.fromtimestamp(entry["mtime"], timezone.utc)
+
+
+def _tags(entry):
+    # TOML front matter can give numbers, such as tags = [2024], or a lone tag
+    tags = entry["metadata"].get("tags", [])
+    if not isinstance(tags, list):
+        tags = [tags]
+    return [str(tag) for tag in tags]
+
+
+def _slugify(text):
+    slug = "".join(char if char.isalnum() else "-" for char in text.lower())
+    return "-".join(part for part in slug.split("-") if part)
+
+
+def _tag_slugs(tags):
+    """
+    Map each tag to the directory of its listing under TAGS_DIR. Tags with
+    the same slug, such as "C++" and "C", get a short hash of the tag added
+    to it, all but the first in sorted order. Tags without a letter or digit
+    would be listed at TAGS_DIR itself, so they get no listing.
+    """
+    slugs = {}
+    used = set()
+    for tag in sorted(tags):
+        slug = _slugify(tag)
+        if not slug:
+            print(f"Skipping tag {tag!r}: it has no letters or digits to name its listing")
+            continue
+        if slug in used:
+            slug = f"{slug}-{hashlib.sha256(tag.encode()).hexdigest()[:8]}"
+        used.add(slug)
+        slugs[tag] = slug
+    return slugs
+
+
+class _Listing:
+    """A paginated list of pages, written to directory/index.html and directory/page/N/."""
+
+    def __init__(self, title, directory, content_path, entries, is_tag=False):
+        self.title = title
+        self.directory = directory
+        self.content_path = content_path
+        self.entries = sorted(entries, key=_sort_key, reverse=True)
+        self.template = None
+        self.is_tag = is_tag
+
+    def page_dest(self, number):
+        if number == 1:
+            return os.path.join(self.directory, "index.html")
+        return os.path.join(self.directory, "page", str(number), "index.html")
+
+
+def _listings(index, content_dir, dest_dir):
+    """
+    A listing for every directory holding pages but no index page of its own,
+    such as content/blog/, and one for every tag used in front matter.
+    """
+    sections = {}
+    for dest_path, entry in index.pages.items():
+        rel_dir = os.path.dirname(os.path.relpath(dest_path, dest_dir))
+        if os.path.basename(dest_path) == "index.html":
+            rel_dir = os.path.dirname(rel_dir)
+        if rel_dir:
+            sections.setdefault(rel_dir, []).append(entry)
+
+    listings = []
+    for rel_dir in sorted(sections):
+        directory = os.path.join(dest_dir, rel_dir)
+        if os.path.join(directory, "index.html") in index.pages:
+            continue
+        title = os.path.basename(rel_dir).replace("-", " ").replace("_", " ").title()
+        content_path = os.path.join(content_dir, rel_dir, "index.md")
+        listings.append(_Listing(title, directory, content_path, sections[rel_dir]))
+
+    tags = {}
+    for entry in index.pages.values():
+        for tag in _tags(entry):
+            tags.setdefault(tag, []).append(entry)
+    for tag, slug in _tag_slugs(tags).items():
+        directory = os.path.join(dest_dir, TAGS_DIR, slug)
+        content_path = os.path.join(content_dir, TAGS_DIR, "index.md")
+        listings.append(
+            _Listing(f"Tagged: {tag}", directory, content_path, tags[tag], is_tag=True)
+        )
+    return listings
+
+
+def _listing_node(listing, entries, number, page_count, dest_dir):
+    items = []
+    for entry in entries:
+        link = LeafNode("a", entry["title"], {"href": page_url(entry["dest"], dest_dir)})
+        date = _sort_key(entry)[0]
+        items.append(ParentNode("li", [link, LeafNode(None, " "), LeafNode("time", date)]))
+    children = [LeafNode("h1", listing.title), ParentNode("ul", items)]
+
+    links = []
+    if number > 1:
+        newer = page_url(listing.page_dest(number - 1), dest_dir)
+        links.append(LeafNode("a", "Newer", {"href": newer, "rel": "prev"}))
+    if number < page_count:
+        older = page_url(listing.page_dest(number + 1), dest_dir)
+        links.append(LeafNode("a", "Older", {"href": older, "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
+
+
+def _write(path, text):
+    write_if_changed(path, text.encode())
+
+
+def _feed_xml(entries, dest_dir, site_url, basepath):
+    # Imported here, as only sites with a feed need them, and they are slow
+    # to import
+    from email.utils import format_datetime
+    from xml.sax.saxutils import escape
+
+    rewrite = basepath_rewriter(basepath)
+    items = []
+    for entry in entries:
+        url = site_url + rewrite(page_url(entry["dest"], dest_dir))
+        items.append(
+            "  <item>\n"
+            f"   <title>{escape(entry['title'])}</title>\n"
+            f"   <link>{escape(url)}</link>\n"
+            f"   <guid>{escape(url)}</guid>\n"
+            f"   <pubDate>{format_datetime(_entry_datetime(entry))}</pubDate>\n"
+            "  </item>\n"
+        )
+    home = site_url + rewrite("/")
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<rss version="2.0">\n'
+        " <channel>\n"
+        f"  <title>{escape(home)}</title>\n"
+        f"  <link>{escape(home)}</link>\n"
+        f"  <description>Latest pages on {escape(home)}</description>\n"
+        + "".join(items)
+        + " </channel>\n</rss>\n"
+    )
+
+
+def _sitemap_xml(urls, site_url, basepath):
+    from xml.sax.saxutils import escape
+
+    rewrite = basepath_rewriter(basepath)
+    lines = [
+        '<?xml version="1.0" encoding="utf-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
+    for url, lastmod in sorted(urls.items()):
+        lines.append(f"  <url><loc>{escape(site_url + rewrite(url))}</loc>"
+                     + (f"<lastmod>{lastmod}</lastmod>" if lastmod else "")
+                     + "</url>")
+    lines.append("</urlset>")
+    return "\n".join(lines) + "\n"
+
+
+def _digest(index, listings, template_path, basepath, site_url, page_size, assets):
+    """Fingerprint of everything the collection pages are built from."""
+    templates = sorted({template_path} | {listing.template for listing in listings})
+    data = {
+        "pages": index.pages,
+        "listings": [listing.directory for listing in listings],
+        "templates": {path: hash_file(path) for path in templates},
+        "basepath": basepath,
+        "site_url": site_url,
+        "page_size": page_size,
+        "assets": assets.digest if assets is not None else None,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def build_collections(index, content_dir, dest_dir, template_path, basepath="/",
+                      site_url=None, page_size=DEFAULT_PAGE_SIZE, assets=None):
+    """
+    Write listing pages for sections and tags, split into pages of page_size
+    entries, and, when the site_url is known, feed.xml and sitemap.xml.
+    Everything is built from the index alone, and nothing is written when the
+    index, templates and asset fingerprints are unchanged since the previous
+    build.
+    Returns the paths written.
+    """
+    listings = _listings(index, content_dir, dest_dir)
+    for listing in listings:
+        listing.template = resolve_template(listing.content_path, content_dir, template_path)
+    site_url = site_url.rstrip("/") if site_url else None
+
+    digest = _digest(index, listings, template_path, basepath, site_url, page_size, assets)
+    if digest == index.digest and all(os.path.exists(path) for path in index.outputs):
+        print("Collection pages unchanged")
+        return []
+
+    outputs = []
+    lastmods = {
+        page_url(dest_path, dest_dir): _sort_key(entry)[0]
+        for dest_path, entry in index.pages.items()
+    }
+    rewrite = basepath_rewriter(basepath, assets)
+    for listing in listings:
+        template = load_template(listing.template, basepath, assets)
+        page_count = max(1, -(-len(listing.entries) // page_size))
+        for number in range(1, page_count + 1):
+            entries = listing.entries[(number - 1) * page_size:number * page_size]
+            node = _listing_node(listing, entries, number, page_count, dest_dir)
+            rewrite_urls(node, rewrite)
+            title = listing.title if number == 1 else f"{listing.title} (page {number})"
+            dest_path = listing.page_dest(number)
+            print(f"Generating collection page {dest_path}")
+            _write(dest_path, template.render(Title=title, Content=node.to_html()))
+            outputs.append(dest_path)
+            lastmods[page_url(dest_path, dest_dir)] = None
+
+    if site_url:
+        # The feed carries the pages listed in sections, such as blog posts
+        feed_entries = {
+            entry["dest"]: entry
+            for listing in listings if not listing.is_tag
+            for entry in listing.entries
+        }
+        feed_entries = sorted(feed_entries.values(), key=_sort_key, reverse=True)[:FEED_SIZE]
+        feed_path = os.path.join(dest_dir, "feed.xml")
+        print(f"Generating feed {feed_path}")
+        _write(feed_path, _feed_xml(feed_entries, dest_dir, site_url, basepath))
+        sitemap_path = os.path.join(dest_dir, "sitemap.xml")
+        print(f"Generating sitemap {sitemap_path}")
+        _write(sitemap_path, _sitemap_xml(lastmods, site_url, basepath))
+        outputs += [feed_path, sitemap_path]
+
+    for path in set(index.outputs) - set(outputs):
+        remove_output(path, dest_dir)
+    index.outputs = outputs
+    index.digest = digest
+    return outputs
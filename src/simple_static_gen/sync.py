@@ -0,0 +1,257 @@
+import filecmp
+import os
+import shutil
+import threading
+
+from .manifest import hash_file
+
+
+class SyncResult:
+    """Counts of what sync_tree did."""
+
+    def __init__(self):
+        self.copied = []
+        self.unchanged = 0
+        self.removed = []
+
+    def __repr__(self):
+        return (
+            f"SyncResult(copied={len(self.copied)}, unchanged={self.unchanged}, "
+            f"removed={len(self.removed)})"
+        )
+
+
+class WriteCounts:
+    """
+    How many outputs write_if_changed wrote and how many it left alone
+    because they were unchanged. Updated from I/O threads, so locked.
+    """
+
+    def __init__(self):
+        self.written = 0
+        self.unchanged = 0
+        self._lock = threading.Lock()
+
+    def add(self, written=0, unchanged=0):
+        with self._lock:
+            self.written += written
+            self.unchanged += unchanged
+
+    def take(self):
+        """Return (written, unchanged) and start counting again from zero."""
+        with self._lock:
+            counts = (self.written, self.unchanged)
+            self.written = self.unchanged = 0
+        return counts
+
+
+# Counts of this process's writes. Worker processes send theirs to the parent.
+write_counts = WriteCounts()
+
+
+def write_if_changed(path, data, make_dirs=True):
+    """
+    Write data (bytes) to path unless the file there holds exactly data
+    already, so that unchanged outputs keep their mtime and aren't uploaded
+    again. Returns whether the file was written.
+    """
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, "rb") as f:
+                if f.read() == data:
+                    write_counts.add(unchanged=1)
+                    return False
+    except FileNotFoundError:
+        pass
+    directory = os.path.dirname(path)
+    if make_dirs and directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    write_counts.add(written=1)
+    return True
+
+
+def write_stream_if_changed(path, write, make_dirs=True):
+    """
+    Like write_if_changed, for output produced a piece at a time: write(f) is
+    called with a text file next to path, which then replaces path only if
+    their contents differ. Returns whether path was written.
+    """
+    directory = os.path.dirname(path)
+    if make_dirs and directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            write(f)
+        if os.path.isfile(path) and filecmp.cmp(tmp_path, path, shallow=False):
+            os.remove(tmp_path)
+            write_counts.add(unchanged=1)
+            return False
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    write_counts.add(written=1)
+    return True
+
+
+def list_files(root):
+    """
+    Return the paths of all files below root, relative to root, in sorted order.
+    """
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            files.append(os.path.relpath(os.path.join(dir_path, file_name), root))
+    return files
+
+
+def _is_unchanged(src_path, dst_path, checksum):
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src_path)
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(src_path) == hash_file(dst_path)
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def _copy_file_range(src_path, dst_path):
+    """
+    Copy with copy_file_range(2), which lets the kernel share extents on
+    filesystems that support reflinks and avoids copying through user space.
+    """
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_file(src_path, dst_path, link=False):
+    """
+    Copy src_path to dst_path atomically, keeping its mtime so that unchanged
+    files keep the same ETag. With link, hard link instead of copying.
+    Uses copy_file_range where available, and otherwise shutil.copyfile,
+    which uses sendfile on Linux.
+    """
+    os.makedirs(os.path.dirname(dst_path) or ".", exist_ok=True)
+    tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+    if link:
+        try:
+            os.link(src_path, tmp_path)
+            os.replace(tmp_path, dst_path)
+            return
+        except OSError:
+            pass
+
+    try:
+        if hasattr(os, "copy_file_range"):
+            try:
+                _copy_file_range(src_path, tmp_path)
+            except OSError:
+                shutil.copyfile(src_path, tmp_path)
+        else:
+            shutil.copyfile(src_path, tmp_path)
+        shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_empty_dirs(root):
+    """Remove every empty directory below root, but not root itself."""
+    for dir_path, _, _ in os.walk(root, topdown=False):
+        if dir_path != root and not os.listdir(dir_path):
+            os.rmdir(dir_path)
+
+
+def make_dirs(directories):
+    """
+    Create each of directories, and their parents, once, deepest first so
+    that its parents come with it.
+    """
+    created = set()
+    for directory in sorted(set(directories), key=len, reverse=True):
+        if directory and directory not in created:
+            os.makedirs(directory, exist_ok=True)
+            while directory and directory not in created:
+                created.add(directory)
+                directory = os.path.dirname(directory)
+
+
+def remove_output(path, dest_root):
+    """
+    Remove a generated file and any directories left empty by its removal,
+    without ever removing dest_root itself.
+    """
+    if os.path.exists(path):
+        print(f"Removing stale output: {path}")
+        os.remove(path)
+    directory = os.path.dirname(path)
+    dest_root = os.path.abspath(dest_root)
+    while directory and os.path.abspath(directory) != dest_root:
+        if not os.path.isdir(directory) or os.listdir(directory):
+            break
+        os.rmdir(directory)
+        directory = os.path.dirname(directory)
+
+
+def sync_tree(src, dst, keep=(), checksum=False, link=False, threads=8, keep_siblings=None):
+    """
+    Make dst a mirror of src, like rsync --delete: copy only the files that
+    are missing or differ (by size and mtime, or by content with checksum),
+    and remove files in dst that are not in src.
+    Paths in keep (as they would be joined onto dst) are never removed, so
+    that generated pages can live next to the static files. Neither are the
+    files for which keep_siblings(path), if given, returns the path of an
+    expected file, such as compressed copies of pages and static files.
+    Copies run in a pool of threads. Returns a SyncResult.
+    """
+    result = SyncResult()
+    os.makedirs(dst, exist_ok=True)
+    src_files = list_files(src) if os.path.isdir(src) else []
+
+    to_copy = []
+    for rel_path in src_files:
+        src_path = os.path.join(src, rel_path)
+        dst_path = os.path.join(dst, rel_path)
+        if _is_unchanged(src_path, dst_path, checksum):
+            result.unchanged += 1
+        else:
+            to_copy.append((src_path, dst_path))
+
+    for src_path, dst_path in to_copy:
+        print(f"Copying file: {src_path} -> {dst_path}")
+    if to_copy:
+        # Imported only when needed, as it is slow to import and a small
+        # incremental build usually has nothing to copy
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(lambda paths: copy_file(*paths, link=link), to_copy))
+    result.copied = [dst_path for _, dst_path in to_copy]
+
+    expected = {os.path.normpath(os.path.join(dst, rel_path)) for rel_path in src_files}
+    expected.update(os.path.normpath(path) for path in keep)
+    for rel_path in list_files(dst):
+        dst_path = os.path.normpath(os.path.join(dst, rel_path))
+        if dst_path not in expected and not (
+            keep_siblings is not None and keep_siblings(dst_path) in expected
+        ):
+            print(f"Removing stale output: {dst_path}")
+            os.remove(dst_path)
+            result.removed.append(dst_path)
+    remove_empty_dirs(dst)
+    return result
@@ -0,0 +1,133 @@
+import os
+import re
+
+TEMPLATE_FILENAME = "template.html"
+
+_SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+_URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
+
+# Compiled templates, keyed by path, basepath and asset manifest. Builds clear
+# it on start so that templates are read once per build and edits between
+# builds are seen.
+_template_cache = {}
+
+
+def basepath_rewriter(basepath, assets=None):
+    """
+    Return a function that prefixes site-absolute URLs ("/about") with the
+    basepath, after swapping in the fingerprinted URL of static files listed
+    in the AssetManifest assets, if given. Relative URLs, protocol-relative
+    URLs and external URLs are returned unchanged.
+    """
+    prefix = basepath if basepath.endswith("/") else basepath + "/"
+
+    def rewrite_url(url):
+        if url.startswith("/") and not url.startswith("//"):
+            if assets is not None:
+                url = assets.lookup(url)
+            return prefix + url[1:]
+        return url
+
+    return rewrite_url
+
+
+class Template:
+    """
+    A template compiled into literal segments and {{ Name }} slots, so that
+    rendering is a single join instead of repeated search and replace. Slots
+    given no value are left as they are written, so that {{ placeholders }}
+    meant for client-side templating pass through.
+    """
+
+    def __init__(self, text, rewrite_url=None):
+        self.text = text
+        self.segments = []
+        self.slots = []
+        # The href and src URLs of the template, as written in it
+        self.urls = [match.group(2) for match in _URL_ATTRIBUTE_PATTERN.finditer(text)]
+        position = 0
+        for match in _SLOT_PATTERN.finditer(text):
+            self.segments.append(_rewrite_literal(text[position:match.start()], rewrite_url))
+            self.slots.append((len(self.segments), match.group(1)))
+            self.segments.append(match.group(0))
+            position = match.end()
+        self.segments.append(_rewrite_literal(text[position:], rewrite_url))
+
+    def with_rewriter(self, rewrite_url):
+        """
+        Return the template compiled again from its text with rewrite_url,
+        in place of any function it was compiled with.
+        """
+        return Template(self.text, rewrite_url)
+
+    def render(self, **values):
+        parts = list(self.segments)
+        for index, name in self.slots:
+            if name in values:
+                parts[index] = values[name]
+        return "".join(parts)
+
+    def write(self, fp, **values):
+        """
+        Stream the rendered template to a file-like object. A value may be a
+        function, called with fp to write the slot's contents itself.
+        """
+        slots = dict(self.slots)
+        for index, segment in enumerate(self.segments):
+            name = slots.get(index)
+            if name is None or name not in values:
+                fp.write(segment)
+                continue
+            value = values[name]
+            if callable(value):
+                value(fp)
+            else:
+                fp.write(value)
+
+
+def _rewrite_literal(text, rewrite_url):
+    if rewrite_url is None:
+        return text
+    return _URL_ATTRIBUTE_PATTERN.sub(
+        lambda match: f'{match.group(1)}="{rewrite_url(match.group(2))}"', text
+    )
+
+
+def load_template(path, basepath="/", assets=None):
+    """
+    Return the compiled template at path, reading and compiling it only the
+    first time it is requested since the cache was last cleared.
+    """
+    key = (path, basepath, assets.digest if assets is not None else None)
+    template = _template_cache.get(key)
+    if template is None:
+        with open(path, "r") as f:
+            template = Template(f.read(), basepath_rewriter(basepath, assets))
+        _template_cache[key] = template
+    return template
+
+
+def clear_template_cache():
+    """Forget every compiled template, e.g. at the start of a new build."""
+    _template_cache.clear()
+
+
+def resolve_template(page_path, content_root, default_path, name=None):
+    """
+    Return the template for a page: the template named in its front matter,
+    relative to the directory of default_path, or else the template.html
+    closest to the page in the content directory (its own directory first,
+    then each parent up to content_root), or default_path when there is none.
+    """
+    if name:
+        return os.path.join(os.path.dirname(default_path), name)
+    content_root = os.path.normpath(content_root)
+    directory = os.path.dirname(page_path)
+    while True:
+        candidate = os.path.join(directory, TEMPLATE_FILENAME)
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(directory)
+        if os.path.normpath(directory) == content_root or parent == directory:
+            return default_path
+        directory = parent
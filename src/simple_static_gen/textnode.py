@@ -1,6 +1,6 @@
 from enum import Enum
 
-from htmlnode import LeafNode
+from .htmlnode import LeafNode
 
 
 class TextType(Enum):
@@ -21,6 +21,8 @@ class BlockType(Enum):
 
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type: TextType, url=None):
         self.text = text
         self.text_type = text_type
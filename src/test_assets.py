@@ -0,0 +1,108 @@
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from simple_static_gen import main
+from simple_static_gen.assets import (
+    AssetManifest,
+    fingerprinted_name,
+    scan_assets,
+    write_fingerprinted,
+)
+from simple_static_gen.manifest import hash_file
+from testutil import TempDirTestCase
+
+
+class TestAssets(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp, "static")
+        self.assets_path = os.path.join(self.tmp, "assets.json")
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.write(os.path.join(self.static, "images", "logo.png"), "png")
+        self.write(os.path.join(self.static, "robots.txt"), "User-agent: *")
+
+    def test_fingerprinted_name(self):
+        self.assertEqual(
+            fingerprinted_name(os.path.join("images", "logo.png"), "3f2a9c1d0000"),
+            os.path.join("images", "logo.3f2a9c1d.png"),
+        )
+
+    def test_scan_assets(self):
+        assets = scan_assets(self.static, self.assets_path)
+        digest = hash_file(os.path.join(self.static, "index.css"))
+        self.assertEqual(assets.urls["/index.css"], f"/index.{digest[:8]}.css")
+        self.assertIn("/images/logo.png", assets.urls)
+        self.assertNotIn("/robots.txt", assets.urls)
+
+    def test_unchanged_files_are_not_hashed_again(self):
+        old_assets = scan_assets(self.static, self.assets_path)
+        old_assets.save(self.assets_path)
+        with mock.patch("simple_static_gen.assets.hash_file") as hash_file_mock:
+            assets = scan_assets(self.static, self.assets_path)
+        hash_file_mock.assert_not_called()
+        self.assertEqual(assets.urls, old_assets.urls)
+
+    def test_lookup(self):
+        assets = AssetManifest({"/index.css": "/index.abcd1234.css"})
+        self.assertEqual(assets.lookup("/index.css?v=2#x"), "/index.abcd1234.css?v=2#x")
+        self.assertEqual(assets.lookup("/other.css"), "/other.css")
+
+    def test_write_fingerprinted(self):
+        dest = os.path.join(self.tmp, "docs")
+        shutil.copytree(self.static, dest)
+        assets = scan_assets(self.static, self.assets_path)
+        with mock.patch("builtins.print"):
+            write_fingerprinted(assets, dest)
+        for path in assets.outputs(dest):
+            self.assertTrue(os.path.isfile(path))
+        self.assertTrue(os.path.isfile(os.path.join(dest, "index.css")))
+
+
+class TestFingerprintedBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp, "static")
+        self.content = os.path.join(self.tmp, "content")
+        self.docs = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.write(self.template, '<link href="/index.css">{{ Title }}{{ Content }}')
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.write(os.path.join(self.static, "logo.png"), "png")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![logo](/logo.png)")
+        self.write(os.path.join(self.content, "about.md"), "# About")
+
+    def build(self):
+        assets = scan_assets(self.static, os.path.join(self.tmp, "assets.json"))
+        with mock.patch("builtins.print") as output:
+            main.build_incremental(
+                self.content, self.static, self.template, self.docs, "/",
+                os.path.join(self.tmp, "manifest.json"), explain=True, assets=assets,
+            )
+        return assets, [call.args[0] for call in output.call_args_list if call.args]
+
+    def test_pages_reference_fingerprinted_urls(self):
+        assets, _ = self.build()
+        html = self.read(os.path.join(self.docs, "index.html"))
+        self.assertIn(f'href="{assets.urls["/index.css"]}"', html)
+        self.assertIn(f'src="{assets.urls["/logo.png"]}"', html)
+        for path in assets.outputs(self.docs):
+            self.assertTrue(os.path.isfile(path))
+
+    def test_asset_change_rebuilds_referencing_pages_only(self):
+        old_assets, _ = self.build()
+        self.write(os.path.join(self.static, "logo.png"), "new png")
+        assets, output = self.build()
+        self.assertIn(f"Rebuilding {os.path.join(self.docs, 'index.html')}:", output)
+        self.assertNotIn(f"Rebuilding {os.path.join(self.docs, 'about.html')}:", output)
+        html = self.read(os.path.join(self.docs, "index.html"))
+        self.assertIn(assets.urls["/logo.png"], html)
+        # The stale fingerprinted copy is removed
+        self.assertFalse(os.path.exists(
+            os.path.join(self.docs, old_assets.urls["/logo.png"].lstrip("/"))
+        ))
+
+
+if __name__ == "__main__":
+    unittest.main()
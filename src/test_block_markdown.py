@@ -1,6 +1,14 @@
+import io
+import random
 import unittest
-from textnode import BlockType
-from block_markdown import block_to_block_type, markdown_to_html_node, extract_title
+from simple_static_gen.textnode import BlockType
+from simple_static_gen.block_markdown import (
+    block_to_block_type,
+    iter_blocks,
+    markdown_to_html_node,
+    extract_title,
+)
+from simple_static_gen.inline_markdown import markdown_to_blocks
 
 class TestBlockMarkdown(unittest.TestCase):
     def test_heading_h1(self):
@@ -191,6 +199,42 @@ This is content
         with self.assertRaises(Exception):
             extract_title(md)
 
+    def test_long_ordered_list(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 1001))
+        self.assertEqual(block_to_block_type(block), BlockType.ORDERED_LIST)
+        self.assertEqual(block_to_block_type("12. item"), BlockType.PARAGRAPH)
+
+    def test_empty_block_is_paragraph(self):
+        self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
+
+    def test_iter_blocks_matches_markdown_to_blocks(self):
+        md = "\n\n  # Title  \n\n\n\npara\n  \n\n- a\n- b\n \n\n\n```\ncode\n\n```\n"
+        for markdown in md, md.split("\n"):
+            blocks = list(iter_blocks(markdown))
+            self.assertEqual([block for _, block in blocks], markdown_to_blocks(md))
+            self.assertEqual(
+                [block_type for block_type, _ in blocks],
+                [block_to_block_type(block) for block in markdown_to_blocks(md)],
+            )
+
+    def test_iter_blocks_random_documents(self):
+        rng = random.Random(0)
+        pieces = ["", " ", "\t", "# h", "```", "> q", ">", "- a", "1. a", "2. b", "text"]
+        for _ in range(500):
+            md = "\n".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            blocks = list(iter_blocks(md.split("\n")))
+            self.assertEqual([block for _, block in blocks], markdown_to_blocks(md), repr(md))
+            self.assertEqual(list(iter_blocks(md)), blocks, repr(md))
+            for block_type, block in blocks:
+                self.assertEqual(block_type, block_to_block_type(block), repr(block))
+
+    def test_iter_blocks_from_file(self):
+        f = io.StringIO("# Title\n\n1. one\n2. two\n")
+        self.assertEqual(
+            list(iter_blocks(f)),
+            [(BlockType.HEADING, "# Title"), (BlockType.ORDERED_LIST, "1. one\n2. two")],
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
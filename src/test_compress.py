@@ -0,0 +1,86 @@
+import gzip
+import os
+import unittest
+from unittest import mock
+
+from simple_static_gen import compress
+from simple_static_gen.compress import compress_file, compress_tree, sibling_source
+from simple_static_gen.sync import sync_tree
+from testutil import TempDirTestCase
+
+
+class TestCompress(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.page = os.path.join(self.tmp, "index.html")
+        self.write(self.page, "<p>Hello</p>" * 200)
+
+    def test_gzip_sibling(self):
+        result = compress_file(self.page, [".gz"])
+        self.assertEqual(result.compressed, [self.page + ".gz"])
+        with gzip.open(self.page + ".gz", "rt") as f:
+            self.assertEqual(f.read(), "<p>Hello</p>" * 200)
+        self.assertEqual(
+            os.stat(self.page + ".gz").st_mtime_ns, os.stat(self.page).st_mtime_ns
+        )
+
+    def test_unchanged_file_is_skipped(self):
+        compress_file(self.page, [".gz"])
+        result = compress_file(self.page, [".gz"])
+        self.assertEqual((result.compressed, result.unchanged), ([], 1))
+        os.utime(self.page, ns=(0, 10**9))
+        self.assertEqual(compress_file(self.page, [".gz"]).compressed, [self.page + ".gz"])
+
+    def test_small_file_loses_its_sibling(self):
+        compress_file(self.page, [".gz"])
+        self.write(self.page, "<p>Hi</p>")
+        result = compress_file(self.page, [".gz"])
+        self.assertEqual(result.removed, [self.page + ".gz"])
+
+    def test_incompressible_file_is_recorded(self):
+        site = os.path.join(self.tmp, "site")
+        page = self.write(os.path.join(site, "index.html"), "<p>Hello</p>" * 200)
+        record = os.path.join(self.tmp, "compress.json")
+        bigger = mock.Mock(side_effect=lambda data: data + b"!")
+        with mock.patch.dict(compress.COMPRESSORS, {".gz": bigger}, clear=True):
+            compress_tree(site, record_path=record)
+            # Left alone while it is unchanged
+            result = compress_tree(site, record_path=record)
+            self.assertEqual((result.compressed, result.unchanged), ([], 1))
+            self.assertEqual(bigger.call_count, 1)
+            os.utime(page, ns=(0, 10**9))
+            compress_tree(site, record_path=record)
+            self.assertEqual(bigger.call_count, 2)
+        self.assertFalse(os.path.exists(page + ".gz"))
+
+    def test_brotli(self):
+        if compress.brotli is None:
+            self.skipTest("brotli is not installed")
+        compress_file(self.page, [".br"])
+        with open(self.page + ".br", "rb") as f:
+            self.assertEqual(compress.brotli.decompress(f.read()).decode(), "<p>Hello</p>" * 200)
+
+    def test_tree(self):
+        image = os.path.join(self.tmp, "images", "a.png")
+        self.write(image, "x" * 5000)
+        self.write(os.path.join(self.tmp, "old.html.gz"), "stale")
+        self.write(os.path.join(self.tmp, "archive.tar.gz"), "kept")
+        with mock.patch.dict(compress.COMPRESSORS, {".gz": compress._gzip}, clear=True):
+            result = compress_tree(self.tmp)
+        self.assertEqual(result.compressed, [self.page + ".gz"])
+        self.assertEqual(result.removed, [os.path.join(self.tmp, "old.html.gz")])
+        self.assertTrue(os.path.exists(os.path.join(self.tmp, "archive.tar.gz")))
+
+    def test_sync_keeps_siblings(self):
+        static = os.path.join(self.tmp, "static")
+        docs = os.path.join(self.tmp, "docs")
+        self.write(os.path.join(static, "index.css"), "body {}")
+        self.write(os.path.join(docs, "index.css.gz"), "gz")
+        self.write(os.path.join(docs, "gone.css.gz"), "gz")
+        with mock.patch("builtins.print"):
+            sync_tree(static, docs, keep_siblings=sibling_source)
+        self.assertEqual(sorted(os.listdir(docs)), ["index.css", "index.css.gz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import os
+import unittest
+from unittest import mock
+
+from simple_static_gen import main
+from simple_static_gen.depgraph import (
+    ASSET,
+    LINK,
+    SOURCE,
+    TEMPLATE,
+    DependencyGraph,
+    page_dependencies,
+)
+from testutil import TempDirTestCase
+
+
+class TestDependencyGraph(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.graph = DependencyGraph({
+            "docs/a.html": {"a.md": SOURCE, "template.html": TEMPLATE, "b.md": LINK},
+            "docs/b.html": {"b.md": SOURCE, "blog/template.html": TEMPLATE},
+        })
+
+    def test_affected_by_template(self):
+        self.assertEqual(
+            self.graph.affected({"template.html": "changed"}),
+            {"docs/a.html": ["template template.html changed"]},
+        )
+
+    def test_links_do_not_invalidate(self):
+        self.assertEqual(self.graph.affected({"b.md": "changed"}), {
+            "docs/b.html": ["source b.md changed"],
+        })
+        self.assertIn(("docs/a.html", LINK), self.graph.dependents()["b.md"])
+
+    def test_page_dependencies(self):
+        self.write(os.path.join(self.tmp, "images", "a.png"), "")
+        dependencies = page_dependencies(
+            "a.md", "template.html",
+            ["/b#top", "/images/a.png", "/missing.png", "https://example.com", "/a/"],
+            {"/b/": "b.md", "/a/": "a.md"}, self.tmp,
+        )
+        self.assertEqual(dependencies, {
+            "a.md": SOURCE,
+            "template.html": TEMPLATE,
+            "b.md": LINK,
+            os.path.join(self.tmp, "images", "a.png"): ASSET,
+        })
+
+
+class TestIncrementalRebuildSet(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.blog_template = os.path.join(self.content, "blog", "template.html")
+        self.write(self.template, "{{ Title }}{{ Content }}")
+        self.write(self.blog_template, "<main>{{ Title }}{{ Content }}</main>")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n[post](/blog/post)")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+
+    def build(self):
+        with mock.patch("builtins.print") as output:
+            main.build_incremental(
+                self.content, os.path.join(self.tmp, "static"), self.template,
+                os.path.join(self.tmp, "docs"), "/", os.path.join(self.tmp, "manifest.json"),
+                explain=True,
+            )
+        return [call.args[0] for call in output.call_args_list if call.args]
+
+    def test_template_change_rebuilds_its_pages_only(self):
+        self.build()
+        self.write(self.blog_template, "<article>{{ Title }}{{ Content }}</article>")
+        output = self.build()
+        post = os.path.join(self.tmp, "docs", "blog", "post.html")
+        self.assertIn(f"Rebuilding {post}:", output)
+        self.assertIn(f"  template {self.blog_template} changed", output)
+        self.assertIn("1 of 2 pages up to date", output)
+
+    def test_new_and_unchanged_pages(self):
+        self.assertIn("  new page", self.build())
+        self.assertIn("2 of 2 pages up to date", self.build())
+
+
+if __name__ == "__main__":
+    unittest.main()
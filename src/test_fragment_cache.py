@@ -0,0 +1,66 @@
+import pickle
+import threading
+import unittest
+
+from simple_static_gen.fragment_cache import FragmentCache
+from simple_static_gen.textnode import BlockType
+
+
+class TestFragmentCache(unittest.TestCase):
+    def test_get_and_put(self):
+        cache = FragmentCache()
+        self.assertIsNone(cache.get(BlockType.PARAGRAPH, "Hi"))
+        cache.put(BlockType.PARAGRAPH, "Hi", "<p>Hi</p>")
+        self.assertEqual(cache.get(BlockType.PARAGRAPH, "Hi"), "<p>Hi</p>")
+        # Same text, different type
+        self.assertIsNone(cache.get(BlockType.HEADING, "Hi"))
+        self.assertEqual(cache.take_stats(), (1, 2, 0))
+        self.assertEqual(cache.take_stats(), (0, 0, 0))
+
+    def test_least_recently_used_is_evicted(self):
+        # Each entry is 1 + 8 characters
+        cache = FragmentCache(max_bytes=27)
+        for block in "abc":
+            cache.put(BlockType.PARAGRAPH, block, f"<p>{block}</p>")
+        cache.get(BlockType.PARAGRAPH, "a")
+        cache.put(BlockType.PARAGRAPH, "d", "<p>d</p>")
+        self.assertEqual(len(cache), 3)
+        self.assertIsNone(cache.get(BlockType.PARAGRAPH, "b"))
+        self.assertIsNotNone(cache.get(BlockType.PARAGRAPH, "a"))
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.size, 27)
+
+    def test_oversized_entry_is_not_cached(self):
+        cache = FragmentCache(max_bytes=10)
+        cache.put(BlockType.PARAGRAPH, "long block", "<p>long block</p>")
+        self.assertEqual(len(cache), 0)
+
+    def test_pickles_empty(self):
+        cache = FragmentCache(max_bytes=100)
+        cache.put(BlockType.PARAGRAPH, "Hi", "<p>Hi</p>")
+        copy = pickle.loads(pickle.dumps(cache))
+        self.assertEqual((copy.max_bytes, len(copy), copy.size), (100, 0, 0))
+
+    def test_threads(self):
+        cache = FragmentCache(max_bytes=400)
+
+        def work(offset):
+            for i in range(500):
+                block = str((i + offset) % 60)
+                if cache.get(BlockType.PARAGRAPH, block) is None:
+                    cache.put(BlockType.PARAGRAPH, block, f"<p>{block}</p>")
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.hits + cache.misses, 2000)
+        self.assertEqual(
+            cache.size, sum(len(block) + len(html) for (_, block), html in cache._entries.items())
+        )
+        self.assertLessEqual(cache.size, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+
+from simple_static_gen.frontmatter import read_front_matter, read_page_header, split_front_matter
+from testutil import TempDirTestCase
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_split(self):
+        markdown = '---\ndate: 2024-05-01\ntags: [tolkien, "elves"]\ntitle: \'Hi\'\n---\n# Post\n'
+        metadata, body = split_front_matter(markdown)
+        self.assertEqual(
+            metadata, {"date": "2024-05-01", "tags": ["tolkien", "elves"], "title": "Hi"}
+        )
+        self.assertEqual(body, "# Post\n")
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Post\n---\n"), ({}, "# Post\n---\n"))
+
+    def test_unclosed_front_matter_is_content(self):
+        self.assertEqual(split_front_matter("---\n# Post"), ({}, "---\n# Post"))
+
+    def test_front_matter_only(self):
+        self.assertEqual(split_front_matter("---\ndraft: true\n---"), ({"draft": True}, ""))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\nnot a pair\n---\n# Post")
+
+    def test_toml(self):
+        markdown = (
+            '+++\ntitle = "Hi"\ndate = 2024-05-01\ndraft = false\ntags = ["tolkien"]\n'
+            '[extra]\nweight = 3\n+++\n# Post\n'
+        )
+        metadata, body = split_front_matter(markdown)
+        self.assertEqual(metadata, {
+            "title": "Hi", "date": "2024-05-01", "draft": False, "tags": ["tolkien"],
+            "extra": {"weight": 3},
+        })
+        self.assertEqual(body, "# Post\n")
+
+    def test_invalid_toml(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("+++\ntitle = \n+++\n# Post")
+
+
+class TestReadPageHeader(TempDirTestCase):
+    def test_matches_split_front_matter(self):
+        for markdown in [
+            "---\ndate: 2024-05-01\ntags: [a, b]\n---\nIntro\n\n# Post\n\nBody",
+            "+++\ndate = 2024-05-01\n+++\n# Post",
+            "---\n---\n# Post",
+            "# Post\n---\n",
+            "---\n# Post",
+        ]:
+            metadata, _ = split_front_matter(markdown)
+            self.assertEqual(read_page_header(self.write("page.md", markdown)), (metadata, "Post"))
+            self.assertEqual(read_front_matter(self.write("page.md", markdown)), metadata)
+
+    def test_front_matter_title(self):
+        path = self.write("page.md", "---\ntitle: From front matter\n---\n# From heading")
+        self.assertEqual(read_page_header(path), ({"title": "From front matter"},
+                                                  "From front matter"))
+
+    def test_no_title(self):
+        self.assertEqual(read_page_header(self.write("page.md", "Just text")), ({}, None))
+
+    def test_body_is_not_read(self):
+        path = self.write("page.md", "---\ndraft: true\n---\n# Post\n" + "text\n" * 100000)
+        # Bytes that can't be decoded, far past the title: reading them would fail
+        with open(path, "ab") as f:
+            f.write(b"\xff\xfe")
+        self.assertEqual(read_page_header(path), ({"draft": True}, "Post"))
+        self.assertEqual(read_front_matter(path), {"draft": True})
+        with self.assertRaises(UnicodeDecodeError):
+            with open(path) as f:
+                f.read()
+
+
+if __name__ == "__main__":
+    unittest.main()
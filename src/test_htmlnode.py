@@ -1,6 +1,8 @@
 import unittest
 
-from htmlnode import HTMLNode, LeafNode, ParentNode
+import io
+
+from simple_static_gen.htmlnode import HTMLNode, LeafNode, ParentNode
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -19,6 +21,10 @@ class TestHTMLNode(unittest.TestCase):
             "HTMLNode(tag=p, value=Hello, world!, children=None, props=None)",
         )
 
+    def test_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "bold"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
     def test_props_to_html(self):
         node = HTMLNode(
             "a",
@@ -60,6 +66,33 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_to_html_not_implemented(self):
+        with self.assertRaises(NotImplementedError):
+            HTMLNode("p", "Hello").to_html()
+
+    def test_parent_without_children_raises(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div", None).to_html()
+
+    def test_iter_html(self):
+        node = ParentNode(
+            "ul",
+            [ParentNode("li", [LeafNode(None, "one")]), ParentNode("li", [LeafNode("b", "two")])],
+            {"class": "list"},
+        )
+        self.assertEqual(
+            list(node.iter_html()),
+            ['<ul class="list">', "<li>", "one", "</li>", "<li>", "<b>two</b>", "</li>", "</ul>"],
+        )
+
+    def test_write_html(self):
+        items = [ParentNode("li", [LeafNode(None, str(i))]) for i in range(10000)]
+        node = ParentNode("ol", items)
+        buffer = io.StringIO()
+        node.write_html(buffer)
+        self.assertEqual(buffer.getvalue(), node.to_html())
+        self.assertTrue(buffer.getvalue().endswith("<li>9999</li></ol>"))
+
 
 if __name__ == "__main__":
     unittest.main()
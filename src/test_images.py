@@ -0,0 +1,157 @@
+import os
+import shutil
+import struct
+import unittest
+from unittest import mock
+
+from simple_static_gen import images
+from simple_static_gen import main
+from simple_static_gen.htmlnode import LeafNode, ParentNode, rewrite_urls
+from simple_static_gen.images import (
+    ImageManifest,
+    add_image_attributes,
+    image_size,
+    process_images,
+)
+from simple_static_gen.template import basepath_rewriter
+from testutil import TempDirTestCase
+
+STATIC_IMAGES = os.path.join(os.path.dirname(__file__), "..", "static", "images")
+
+
+def _png_header(width, height):
+    return (b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR"
+            + struct.pack(">II", width, height) + b"\x08\x06\x00\x00\x00")
+
+
+class TestImageSize(TempDirTestCase):
+    def test_png(self):
+        self.assertEqual(image_size(os.path.join(STATIC_IMAGES, "rivendell.png")), (1344, 896))
+
+    def test_gif(self):
+        path = self.write("a.gif", b"GIF89a" + struct.pack("<HH", 320, 200) + b"\x00" * 8)
+        self.assertEqual(image_size(path), (320, 200))
+
+    def test_jpeg(self):
+        app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+        sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, 600, 800) + b"\x03" + b"\x00" * 9
+        path = self.write("a.jpg", b"\xff\xd8" + app0 + sof0)
+        self.assertEqual(image_size(path), (800, 600))
+
+    @mock.patch.object(images, "Image", None)
+    def test_unknown_format(self):
+        self.assertIsNone(image_size(self.write("a.webp", b"RIFF\x00\x00\x00\x00WEBP")))
+
+
+class TestImageAttributes(unittest.TestCase):
+    def test_size_and_srcset(self):
+        manifest = ImageManifest({"/images/a.png": {
+            "width": 1200, "height": 800,
+            "srcset": [["/images/a-480w.12345678.webp", 480], ["/images/a.png", 1200]],
+        }})
+        img = LeafNode("img", "", {"src": "/images/a.png", "alt": "a"})
+        other = LeafNode("img", "", {"src": "/images/b.png", "alt": "b"})
+        node = ParentNode("p", [img, other])
+        add_image_attributes(node, manifest)
+        rewrite_urls(node, basepath_rewriter("/site/"))
+        self.assertEqual(img.props["width"], "1200")
+        self.assertEqual(img.props["height"], "800")
+        self.assertEqual(
+            img.props["srcset"],
+            "/site/images/a-480w.12345678.webp 480w, /site/images/a.png 1200w",
+        )
+        self.assertEqual(other.props, {"src": "/site/images/b.png", "alt": "b"})
+
+
+class TestProcessImages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp, "static")
+        self.cache_dir = os.path.join(self.tmp, "cache")
+        self.path = os.path.join(self.tmp, "images.json")
+        os.makedirs(os.path.join(self.static, "images"))
+        shutil.copy(os.path.join(STATIC_IMAGES, "tom.png"), os.path.join(self.static, "images"))
+
+    def process(self, **kwargs):
+        with mock.patch("builtins.print"):
+            return process_images(self.static, (480, 2000), 1, self.path, self.cache_dir,
+                                  **kwargs)
+
+    @mock.patch.object(images, "Image", None)
+    def test_sizes_without_pillow(self):
+        manifest = self.process()
+        self.assertEqual(
+            manifest.images, {"/images/tom.png": {"width": 928, "height": 468, "srcset": []}}
+        )
+        self.assertEqual(manifest.derivatives, {})
+
+    @mock.patch.object(images, "Image", None)
+    def test_unchanged_images_are_not_read_again(self):
+        self.process().save(self.path)
+        with mock.patch("simple_static_gen.images.image_size") as image_size_mock:
+            manifest = self.process()
+        image_size_mock.assert_not_called()
+        self.assertEqual(manifest.images["/images/tom.png"]["width"], 928)
+
+    @unittest.skipIf(images.Image is None, "Pillow is not installed")
+    def test_derivatives_are_cached(self):
+        manifest = self.process()
+        srcset = manifest.images["/images/tom.png"]["srcset"]
+        self.assertEqual([width for _, width in srcset], [480, 928])
+        (url, cache_path), = manifest.derivatives.items()
+        self.assertEqual(image_size(cache_path), (480, 242))
+
+        with mock.patch("simple_static_gen.images._resize_job") as resize_job:
+            self.assertEqual(self.process().derivatives, manifest.derivatives)
+        resize_job.assert_not_called()
+
+        # Other parameters make other copies, and the unused ones are forgotten
+        other = self.process(quality=50)
+        self.assertNotEqual(other.derivatives, manifest.derivatives)
+        self.assertFalse(os.path.exists(cache_path))
+
+
+class TestImagesBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.tmp, "static")
+        self.content = os.path.join(self.tmp, "content")
+        self.docs = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.write(self.template, "{{ Title }}{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n![a](/a.png)")
+        self.write(os.path.join(self.content, "about.md"), "# About")
+        self.write_image(300, 200)
+
+    def write_image(self, width, height):
+        # Sized by the width, so that a new size is seen even within one mtime tick
+        self.write(
+            os.path.join(self.static, "a.png"),
+            _png_header(width, height) + b"\x00" * (width // 100),
+        )
+
+    @mock.patch.object(images, "Image", None)
+    def build(self):
+        manifest = process_images(self.static, path=os.path.join(self.tmp, "images.json"),
+                                  cache_dir=os.path.join(self.tmp, "cache"))
+        with mock.patch("builtins.print") as output:
+            main.build_incremental(
+                self.content, self.static, self.template, self.docs, "/",
+                os.path.join(self.tmp, "manifest.json"), explain=True, images=manifest,
+            )
+        with open(os.path.join(self.docs, "index.html")) as f:
+            html = f.read()
+        return html, [call.args[0] for call in output.call_args_list if call.args]
+
+    def test_resized_image_rebuilds_referencing_pages_only(self):
+        html, _ = self.build()
+        self.assertIn('width="300" height="200"', html)
+        self.write_image(600, 400)
+        html, output = self.build()
+        self.assertIn('width="600" height="400"', html)
+        self.assertIn(f"Rebuilding {os.path.join(self.docs, 'index.html')}:", output)
+        self.assertNotIn(f"Rebuilding {os.path.join(self.docs, 'about.html')}:", output)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,7 @@
 import unittest
 import re
-from textnode import TextNode, TextType
-from inline_markdown import (
+from simple_static_gen.textnode import TextNode, TextType
+from simple_static_gen.inline_markdown import (
     split_nodes_delimiter,
     split_nodes_image,
     split_nodes_link,
@@ -138,6 +138,51 @@ class TestInlineMarkdown(unittest.TestCase):
                 ],
             )
 
+    def test_text_to_textnodes_unclosed_delimiter(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("This is **unclosed bold")
+        with self.assertRaises(Exception):
+            text_to_textnodes("This is `unclosed code")
+
+    def test_text_to_textnodes_url_with_delimiters(self):
+        nodes = text_to_textnodes("See [the docs](https://example.com/some_page_name)")
+        self.assertListEqual(
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("the docs", TextType.LINK, "https://example.com/some_page_name"),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_code_keeps_delimiters(self):
+        nodes = text_to_textnodes("Use `a * b` here")
+        self.assertListEqual(
+            [
+                TextNode("Use ", TextType.TEXT),
+                TextNode("a * b", TextType.CODE),
+                TextNode(" here", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_many_links(self):
+        text = " and ".join(f"[link {i}](/page/{i})" for i in range(300))
+        nodes = text_to_textnodes(text)
+        self.assertEqual(len(nodes), 599)
+        self.assertEqual(nodes[-1], TextNode("link 299", TextType.LINK, "/page/299"))
+        self.assertEqual(nodes[-1].url, "/page/299")
+
+    def test_split_links_repeated(self):
+        node = TextNode("[same](/a) and [same](/a)", TextType.TEXT)
+        self.assertListEqual(
+            [
+                TextNode("same", TextType.LINK, "/a"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("same", TextType.LINK, "/a"),
+            ],
+            split_nodes_link([node]),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
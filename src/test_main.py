@@ -0,0 +1,295 @@
+import os
+import subprocess
+import sys
+import unittest
+from unittest import mock
+
+from simple_static_gen import main
+from simple_static_gen.main import (
+    BuildError,
+    discover_pages,
+    generate_pages,
+    generate_pages_pipelined,
+)
+from simple_static_gen.fragment_cache import FragmentCache
+from simple_static_gen.memory import MemoryBudget
+from simple_static_gen.site_index import SiteIndex
+from simple_static_gen.sync import write_counts
+from testutil import TempDirTestCase
+
+
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp, "content")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.write(self.template, '<title>{{ Title }}</title><a href="/">{{ Content }}</a>')
+        for i in range(6):
+            self.write(
+                os.path.join(self.content, f"dir{i % 2}", f"page{i}.md"),
+                f"# Page {i}\n\nSome **bold** text with a [link](/page{i})",
+            )
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "notes.txt"), "not markdown")
+        self.pages = discover_pages(self.content, os.path.join(self.tmp, "docs"), self.template)
+
+    def read_outputs(self, dest_root):
+        outputs = {}
+        for dir_path, _, file_names in os.walk(dest_root):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                with open(path) as f:
+                    outputs[os.path.relpath(path, dest_root)] = f.read()
+        return outputs
+
+    def test_discover_pages(self):
+        self.assertEqual(len(self.pages), 7)
+        self.assertEqual(self.pages, discover_pages(self.content, os.path.join(self.tmp, "docs"), self.template))
+        self.assertEqual(
+            self.pages[0],
+            (os.path.join(self.content, "index.md"),
+             os.path.join(self.tmp, "docs", "index.html"),
+             self.template),
+        )
+
+    def test_parallel_matches_serial(self):
+        serial_pages = discover_pages(self.content, os.path.join(self.tmp, "serial"), self.template)
+        with mock.patch("builtins.print"):
+            generate_pages(serial_pages, "/blog/", jobs=1)
+            generate_pages(self.pages, "/blog/", jobs=3)
+        serial = self.read_outputs(os.path.join(self.tmp, "serial"))
+        parallel = self.read_outputs(os.path.join(self.tmp, "docs"))
+        self.assertEqual(len(serial), 7)
+        self.assertEqual(serial, parallel)
+
+    def test_failures_are_aggregated(self):
+        self.write(os.path.join(self.content, "dir0", "page0.md"), "No title")
+        self.write(os.path.join(self.content, "dir1", "page1.md"), "Still no title")
+        with mock.patch("builtins.print"):
+            with self.assertRaises(BuildError) as cm:
+                generate_pages(self.pages, "/", jobs=2)
+        failed = [path for path, _ in cm.exception.failures]
+        self.assertEqual(
+            failed,
+            [os.path.join(self.content, "dir0", "page0.md"),
+             os.path.join(self.content, "dir1", "page1.md")],
+        )
+        # The other pages are still generated
+        self.assertEqual(len(self.read_outputs(os.path.join(self.tmp, "docs"))), 5)
+
+    def test_unchanged_pages_are_not_rewritten(self):
+        with mock.patch("builtins.print"):
+            generate_pages(self.pages, "/", jobs=2)
+            for _, dest_path, _ in self.pages:
+                os.utime(dest_path, ns=(1_000_000_000, 1_000_000_000))
+            self.write(os.path.join(self.content, "index.md"), "# New home")
+            write_counts.take()
+            generate_pages(self.pages, "/", jobs=2)
+        self.assertEqual(write_counts.take(), (1, 6))
+        mtimes = {dest: os.stat(dest).st_mtime_ns for _, dest, _ in self.pages}
+        self.assertNotEqual(mtimes.pop(os.path.join(self.tmp, "docs", "index.html")), 1_000_000_000)
+        self.assertEqual(set(mtimes.values()), {1_000_000_000})
+
+    def test_pipelined_matches_serial(self):
+        serial_pages = discover_pages(self.content, os.path.join(self.tmp, "serial"), self.template)
+        with mock.patch("builtins.print"):
+            generate_pages(serial_pages, "/blog/", jobs=1)
+            entries = generate_pages_pipelined(self.pages, "/blog/", threads=3, max_in_flight=2)
+        self.assertEqual([entry["dest"] for entry in entries], [dest for _, dest, _ in self.pages])
+        self.assertEqual(
+            self.read_outputs(os.path.join(self.tmp, "serial")),
+            self.read_outputs(os.path.join(self.tmp, "docs")),
+        )
+
+    def test_pipelined_failures_are_aggregated(self):
+        self.write(os.path.join(self.content, "dir1", "page3.md"), "No title")
+        with mock.patch("builtins.print"):
+            with self.assertRaises(BuildError) as cm:
+                generate_pages_pipelined(self.pages, "/")
+        self.assertEqual(
+            [path for path, _ in cm.exception.failures],
+            [os.path.join(self.content, "dir1", "page3.md")],
+        )
+        self.assertEqual(len(self.read_outputs(os.path.join(self.tmp, "docs"))), 6)
+
+    def test_streamed_matches_serial(self):
+        self.write(
+            os.path.join(self.content, "dir0", "page2.md"),
+            "---\ntitle: From front matter\n---\nIntro with ![img](/a.png)\n\n"
+            "# Page 2\n\n```\ncode\nmore\n```\n\n- a [link](/x)\n- b\n",
+        )
+        serial_pages = discover_pages(self.content, os.path.join(self.tmp, "serial"), self.template)
+        with mock.patch("builtins.print"):
+            serial = generate_pages(serial_pages, "/blog/", jobs=1)
+            streamed = generate_pages(
+                self.pages, "/blog/", jobs=2, memory_budget=MemoryBudget(1 << 40)
+            )
+        self.assertEqual(
+            [(entry["title"], entry["urls"]) for entry in serial],
+            [(entry["title"], entry["urls"]) for entry in streamed],
+        )
+        self.assertEqual(
+            self.read_outputs(os.path.join(self.tmp, "serial")),
+            self.read_outputs(os.path.join(self.tmp, "docs")),
+        )
+
+    def test_fragments_match_serial(self):
+        footer = "\n\n> Shared **disclaimer** with a [link](/legal)\n\n- one\n- two\n"
+        for i in range(6):
+            self.write(os.path.join(self.content, f"dir{i % 2}", f"page{i}.md"),
+                       f"# Page {i}{footer}")
+        serial_pages = discover_pages(self.content, os.path.join(self.tmp, "serial"), self.template)
+        fragments = FragmentCache()
+        with mock.patch("builtins.print"):
+            generate_pages(serial_pages, "/blog/", jobs=1)
+            generate_pages(self.pages, "/blog/", jobs=1, fragments=fragments)
+        self.assertEqual(
+            self.read_outputs(os.path.join(self.tmp, "serial")),
+            self.read_outputs(os.path.join(self.tmp, "docs")),
+        )
+        # Seven headings and the first footer's quote and list are rendered
+        self.assertEqual((fragments.hits, fragments.misses), (10, 9))
+
+        fragments = FragmentCache()
+        with mock.patch("builtins.print"):
+            generate_pages(self.pages, "/blog/", jobs=2, fragments=fragments,
+                           memory_budget=MemoryBudget(1 << 40))
+        self.assertEqual(fragments.hits + fragments.misses, 19)
+        self.assertGreater(fragments.hits, 0)
+        self.assertEqual(len(fragments), 0)
+        self.assertEqual(
+            self.read_outputs(os.path.join(self.tmp, "serial")),
+            self.read_outputs(os.path.join(self.tmp, "docs")),
+        )
+
+    def test_streamed_failures_leave_no_output(self):
+        self.write(os.path.join(self.content, "dir1", "page3.md"), "No title")
+        self.write(os.path.join(self.content, "dir1", "page5.md"), "# Bad\n\n**unclosed")
+        with mock.patch("builtins.print"):
+            with self.assertRaises(BuildError) as cm:
+                generate_pages(self.pages, "/", memory_budget=MemoryBudget(1 << 40))
+        self.assertEqual(len(cm.exception.failures), 2)
+        self.assertEqual(len(self.read_outputs(os.path.join(self.tmp, "docs"))), 5)
+
+
+
+class TestFrontMatterOptions(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp, "content")
+        self.docs = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.write(self.template, "<main>{{ Title }}{{ Content }}</main>")
+        self.write(os.path.join(self.tmp, "wide.html"), "<wide>{{ Title }}{{ Content }}</wide>")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "draft.md"), "---\ndraft: true\n---\n# Draft")
+        self.write(
+            os.path.join(self.content, "blog", "wide.md"),
+            '+++\ntemplate = "wide.html"\ntitle = "Wide page"\n+++\nNo heading',
+        )
+
+    def test_drafts_and_templates(self):
+        pages = discover_pages(self.content, self.docs, self.template)
+        self.assertEqual(
+            [(os.path.relpath(src, self.content), template) for src, _, template in pages],
+            [("index.md", self.template),
+             (os.path.join("blog", "wide.md"), os.path.join(self.tmp, "wide.html"))],
+        )
+        self.assertEqual(len(discover_pages(self.content, self.docs, self.template, True)), 3)
+
+    def test_recursive_build(self):
+        with mock.patch("builtins.print"):
+            main.generate_pages_recursive(self.content, self.template, self.docs)
+        self.assertEqual(
+            self.read(self.docs, "blog", "wide.html"),
+            "<wide>Wide page<div><p>No heading</p></div></wide>",
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog", "draft.html")))
+
+    def test_index_is_filled_from_front_matter(self):
+        index_path = os.path.join(self.tmp, "index.json")
+        manifest_path = os.path.join(self.tmp, "manifest.json")
+        with mock.patch("builtins.print"):
+            index = SiteIndex(index_path)
+            main.build_incremental(self.content, self.tmp, self.template, self.docs, "/",
+                                   manifest_path, index=index)
+            rendered = dict(index.pages)
+            # Losing the index doesn't make the pages render again
+            index = SiteIndex(index_path)
+            with mock.patch.object(main, "_render_page_to_file") as render:
+                main.build_incremental(self.content, self.tmp, self.template, self.docs, "/",
+                                       manifest_path, index=index)
+        render.assert_not_called()
+        self.assertEqual(index.pages, rendered)
+
+
+
+class TestCommands(TempDirTestCase):
+    def test_build_is_the_default_command(self):
+        self.assertEqual(main.parse_args(["build", "/blog/", "-j", "2"]),
+                         main.parse_args(["/blog/", "-j", "2"]))
+        self.assertEqual(main.parse_args([]).command, "build")
+        self.assertEqual(main.parse_args(["bench", "--pages", "10"]).bench_args,
+                         ["--pages", "10"])
+
+    def test_fragment_cache_is_off_by_default(self):
+        self.assertEqual(main.parse_args([]).fragment_cache_size, 0)
+        self.assertEqual(main.parse_args(["--fragment-cache-size", "16"]).fragment_cache_size, 16)
+
+    def test_clean(self):
+        docs = os.path.join(self.tmp, "docs")
+        cache = os.path.join(self.tmp, ".cache")
+        for path in (docs, cache):
+            os.makedirs(os.path.join(path, "sub"))
+        with mock.patch("builtins.print"):
+            main.clean(docs, cache, keep_cache=True)
+            self.assertEqual(os.listdir(self.tmp), [".cache"])
+            main.clean(docs, cache)
+        self.assertEqual(os.listdir(self.tmp), [])
+
+    def test_bench_needs_a_source_checkout(self):
+        with mock.patch.object(main, "BENCH_SCRIPT", os.path.join(self.tmp, "run.py")), \
+                mock.patch("sys.stderr"):
+            self.assertEqual(main.run_bench([]), 2)
+
+
+class TestStartup(unittest.TestCase):
+    # Modules that only the features using them may import, because they are
+    # slow to import
+    LAZY_MODULES = [
+        "PIL", "brotli", "gzip", "simple_static_gen.server", "simple_static_gen.images",
+        "simple_static_gen.compress", "tomllib", "subprocess", "multiprocessing",
+        "concurrent.futures", "email.utils", "xml.sax.saxutils",
+    ]
+    # Generous, so as not to fail on slow machines; typically tens of ms
+    MAX_IMPORT_MS = 150
+
+    def import_times(self, *args):
+        """Run Python with -X importtime and return {module: cumulative microseconds}."""
+        src_dir = os.path.dirname(os.path.abspath(__file__))
+        command = [sys.executable, "-X", "importtime", *args]
+        # Once to write the bytecode caches, which a real build would use
+        subprocess.run(command, cwd=src_dir, capture_output=True, check=True)
+        stderr = subprocess.run(command, cwd=src_dir, capture_output=True, text=True,
+                                check=True).stderr
+        times = {}
+        for line in stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line.split("|")
+                if cumulative.strip().isdigit():
+                    times[name.strip()] = int(cumulative)
+        return times
+
+    def test_heavy_modules_are_imported_lazily(self):
+        for args in (["-c", "import simple_static_gen.main"], ["main.py", "build", "--help"]):
+            imported = self.import_times(*args)
+            self.assertIn("simple_static_gen.site_index", imported)
+            self.assertEqual([name for name in self.LAZY_MODULES if name in imported], [])
+
+    def test_import_time(self):
+        imported = self.import_times("-c", "import simple_static_gen.main")
+        self.assertLess(imported["simple_static_gen.main"] / 1000, self.MAX_IMPORT_MS)
+
+
+if __name__ == "__main__":
+    unittest.main()
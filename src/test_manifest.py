@@ -0,0 +1,106 @@
+import os
+import unittest
+from unittest import mock
+
+from simple_static_gen import main
+from simple_static_gen.manifest import (
+    GENERATOR_VERSION,
+    load_manifest,
+    save_manifest,
+    new_manifest,
+)
+from testutil import TempDirTestCase
+
+
+class TestManifest(TempDirTestCase):
+    def test_load_missing(self):
+        manifest = load_manifest(os.path.join(self.tmp, "missing.json"), "/")
+        self.assertEqual(manifest, new_manifest("/"))
+
+    def test_round_trip(self):
+        path = os.path.join(self.tmp, "cache", "manifest.json")
+        manifest = new_manifest("/")
+        manifest["pages"]["docs/index.html"] = {"source_hash": "abc"}
+        save_manifest(path, manifest)
+        self.assertEqual(load_manifest(path, "/"), manifest)
+
+    def test_basepath_change_discards(self):
+        path = os.path.join(self.tmp, "manifest.json")
+        manifest = new_manifest("/")
+        manifest["pages"]["docs/index.html"] = {"source_hash": "abc"}
+        save_manifest(path, manifest)
+        self.assertEqual(load_manifest(path, "/blog/"), new_manifest("/blog/"))
+
+    def test_version_change_discards(self):
+        path = os.path.join(self.tmp, "manifest.json")
+        manifest = new_manifest("/")
+        manifest["generator_version"] = GENERATOR_VERSION + "-old"
+        save_manifest(path, manifest)
+        self.assertEqual(load_manifest(path, "/"), new_manifest("/"))
+
+
+class TestIncrementalBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp, "content")
+        self.static = os.path.join(self.tmp, "static")
+        self.docs = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.manifest = os.path.join(self.tmp, "manifest.json")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+    def build(self):
+        with mock.patch.object(main, "generate_page", wraps=main.generate_page) as generate, \
+                mock.patch("builtins.print"):
+            main.build_incremental(
+                self.content, self.static, self.template, self.docs, "/", self.manifest
+            )
+        return sorted(call.args[0] for call in generate.call_args_list)
+
+    def test_first_build_renders_everything(self):
+        rendered = self.build()
+        self.assertEqual(len(rendered), 2)
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "blog", "post.html")))
+        self.assertEqual(self.read(os.path.join(self.docs, "index.css")), "body {}")
+
+    def test_unchanged_build_renders_nothing(self):
+        self.build()
+        self.assertEqual(self.build(), [])
+
+    def test_changed_source_is_rerendered(self):
+        self.build()
+        self.write(os.path.join(self.content, "blog", "post.md"), "# New title")
+        self.assertEqual(self.build(), [os.path.join(self.content, "blog", "post.md")])
+        self.assertIn(
+            "New title", self.read(os.path.join(self.docs, "blog", "post.html"))
+        )
+
+    def test_changed_template_rerenders_all(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(len(self.build()), 2)
+
+    def test_changed_static_is_recopied(self):
+        self.build()
+        self.write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        self.build()
+        self.assertEqual(
+            self.read(os.path.join(self.docs, "index.css")), "body { margin: 0 }"
+        )
+
+    def test_removed_sources_delete_outputs(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+from unittest import mock
+
+from simple_static_gen import memory
+from simple_static_gen.memory import MemoryBudget, build_peak_rss, current_rss
+
+
+class TestMemoryBudget(unittest.TestCase):
+    def test_rss_is_measured(self):
+        rss = current_rss()
+        if rss is None:
+            self.skipTest("RSS is not available on this platform")
+        self.assertGreater(rss, 0)
+        self.assertGreaterEqual(build_peak_rss(), rss)
+
+    def test_collects_only_over_budget(self):
+        budget = MemoryBudget(100 * 1024 * 1024)
+        with mock.patch.object(memory, "current_rss", return_value=50 * 1024 * 1024):
+            self.assertFalse(budget.check())
+        with mock.patch.object(memory, "current_rss", return_value=150 * 1024 * 1024), \
+                mock.patch("gc.collect") as collect:
+            self.assertTrue(budget.check())
+        collect.assert_called_once()
+        self.assertEqual(budget.collections, 1)
+
+    def test_report_warns_over_budget(self):
+        with mock.patch.object(memory, "build_peak_rss", return_value=300 * 1024 * 1024), \
+                mock.patch("builtins.print") as print_:
+            MemoryBudget(200 * 1024 * 1024).report()
+        lines = [call.args[0] for call in print_.call_args_list]
+        self.assertEqual(lines[0], "Peak memory: 300.0 MB (budget 200 MB)")
+        self.assertIn("over its memory budget", lines[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import unittest
+from unittest import mock
+
+from simple_static_gen import main
+from simple_static_gen.parse_cache import ParseCache
+from testutil import TempDirTestCase
+
+
+class TestParseCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ParseCache(os.path.join(self.tmp, "cache"))
+
+    def test_round_trip(self):
+        key = self.cache.key("# Hello")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, "Hello", "<div><h1>Hello</h1></div>")
+        self.assertEqual(self.cache.get(key), ("Hello", "<div><h1>Hello</h1></div>"))
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_key_depends_on_basepath(self):
+        self.assertNotEqual(self.cache.key("# Hello", "/"), self.cache.key("# Hello", "/site/"))
+
+    def test_evict_least_recently_used(self):
+        keys = [self.cache.key(f"# Page {i}") for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, f"Page {i}", "x" * 100)
+            path = self.cache._path(key)
+            os.utime(path, ns=(i * 10**9, i * 10**9))
+        # Reading the oldest entry makes it the most recently used
+        self.cache.get(keys[0])
+        size = os.path.getsize(self.cache._path(keys[0]))
+        self.cache.max_bytes = size * 2
+        self.cache.evict()
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_clear(self):
+        key = self.cache.key("# Hello")
+        self.cache.put(key, "Hello", "<h1>Hello</h1>")
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(key))
+
+
+class TestGeneratePageWithCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = ParseCache(os.path.join(self.tmp, "cache"))
+        self.source = os.path.join(self.tmp, "index.md")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.dest = os.path.join(self.tmp, "docs", "index.html")
+        self.write(self.source, "# Hello\n\n[home](/)")
+
+    def tearDown(self):
+        main.clear_template_cache()
+
+    def render(self, template_text):
+        main.clear_template_cache()
+        with open(self.template, "w") as f:
+            f.write(template_text)
+        with mock.patch.object(main, "markdown_to_html", wraps=main.markdown_to_html) as parse, \
+                mock.patch("builtins.print"):
+            main.generate_page(self.source, self.template, self.dest, "/site/", cache=self.cache)
+        with open(self.dest) as f:
+            return parse.call_count, f.read()
+
+    def test_template_change_skips_parsing(self):
+        parses, html = self.render("<title>{{ Title }}</title>{{ Content }}")
+        self.assertEqual(parses, 1)
+        parses, html = self.render("<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(parses, 0)
+        self.assertEqual(html, '<h1>Hello</h1><div><h1>Hello</h1><p><a href="/site/">home</a></p></div>')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import threading
+import time
+import unittest
+
+from simple_static_gen.pipeline import run_pipeline
+from simple_static_gen.sync import make_dirs
+from testutil import TempDirTestCase
+
+
+class TestRunPipeline(unittest.TestCase):
+    def test_results_in_order(self):
+        outcomes = run_pipeline(
+            range(20),
+            read=lambda item: time.sleep((20 - item) / 10000) or item,
+            process=lambda item, data: data * 2,
+            write=lambda item, processed: processed + 1,
+            threads=4,
+        )
+        self.assertEqual(outcomes, [(item * 2 + 1, None) for item in range(20)])
+
+    def test_in_flight_is_bounded(self):
+        lock = threading.Lock()
+        in_flight = [0]
+        most = [0]
+
+        def read(item):
+            with lock:
+                in_flight[0] += 1
+                most[0] = max(most[0], in_flight[0])
+            return item
+
+        def write(item, processed):
+            time.sleep(0.001)
+            with lock:
+                in_flight[0] -= 1
+            return processed
+
+        outcomes = run_pipeline(range(50), read, lambda item, data: data, write,
+                                threads=8, max_in_flight=3)
+        self.assertEqual([result for result, _ in outcomes], list(range(50)))
+        self.assertLessEqual(most[0], 3)
+
+    def test_errors_are_returned_per_item(self):
+        def process(item, data):
+            if item == 1:
+                raise ValueError("bad item")
+            return data
+
+        def write(item, processed):
+            if item == 2:
+                raise OSError("disk full")
+            return processed
+
+        outcomes = run_pipeline(range(4), lambda item: item, process, write, max_in_flight=1)
+        self.assertEqual(outcomes[0], (0, None))
+        self.assertIsInstance(outcomes[1][1], ValueError)
+        self.assertIsInstance(outcomes[2][1], OSError)
+        self.assertEqual(outcomes[3], (3, None))
+
+
+class TestMakeDirs(TempDirTestCase):
+    def test_make_dirs(self):
+        directories = [os.path.join(self.tmp, "a"), os.path.join(self.tmp, "a", "b", "c"),
+                       os.path.join(self.tmp, "d"), os.path.join(self.tmp, "a")]
+        make_dirs(directories)
+        for directory in directories:
+            self.assertTrue(os.path.isdir(directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
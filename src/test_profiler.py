@@ -0,0 +1,93 @@
+import os
+import unittest
+from unittest import mock
+
+from simple_static_gen.block_markdown import markdown_to_html_node
+from simple_static_gen.main import discover_pages, generate_pages
+from simple_static_gen.memory import MemoryBudget
+from simple_static_gen.profiler import NULL_PROFILER, Profiler, activate, get_profiler
+from testutil import TempDirTestCase
+
+
+class TestProfiler(unittest.TestCase):
+    def tearDown(self):
+        activate(None)
+
+    def test_inactive_by_default(self):
+        self.assertIs(get_profiler(), NULL_PROFILER)
+        with get_profiler().phase("read"):
+            pass
+
+    def test_phases_and_counters(self):
+        profiler = Profiler()
+        with profiler.phase("read"):
+            pass
+        with profiler.phase("read"):
+            pass
+        profiler.count("pages", 2)
+        profiler.record_page("a.md", 0.5)
+        profiler.stop()
+        data = profiler.to_dict()
+        self.assertEqual(data["phases"]["read"]["calls"], 2)
+        self.assertEqual(data["counters"], {"pages": 2})
+        self.assertIn("a.md", profiler.report())
+
+    def test_merge(self):
+        first, second = Profiler(), Profiler()
+        first.add_time("parse", 1.0)
+        second.add_time("parse", 2.0)
+        second.count("pages")
+        second.record_page("b.md", 2.0)
+        first.merge(second.to_dict())
+        self.assertEqual(first.phase_seconds["parse"], 3.0)
+        self.assertEqual(first.phase_calls["parse"], 2)
+        self.assertEqual(first.pages, [(2.0, "b.md")])
+
+    def test_parser_instrumented(self):
+        profiler = Profiler()
+        activate(profiler)
+        markdown_to_html_node("# Title\n\n- one\n- **two**\n\nText")
+        self.assertEqual(profiler.counters["blocks.heading"], 1)
+        self.assertEqual(profiler.counters["blocks.unordered_list"], 1)
+        self.assertEqual(profiler.counters["blocks.paragraph"], 1)
+        self.assertGreater(profiler.counters["inline_nodes"], 0)
+        self.assertIn("text_to_textnodes", profiler.phase_seconds)
+
+
+class TestProfiledBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        content = os.path.join(self.tmp, "content")
+        template = os.path.join(self.tmp, "template.html")
+        self.write(template, "{{ Title }}{{ Content }}")
+        for i in range(4):
+            self.write(os.path.join(content, f"page{i}.md"), f"# Page {i}\n\nText")
+        self.pages = discover_pages(content, os.path.join(self.tmp, "docs"), template)
+
+    def tearDown(self):
+        activate(None)
+
+    def test_worker_profiles_are_merged(self):
+        profiler = Profiler()
+        activate(profiler)
+        with mock.patch("builtins.print"):
+            generate_pages(self.pages, "/", jobs=2)
+        self.assertEqual(profiler.counters["pages"], 4)
+        self.assertEqual(profiler.phase_calls["write"], 4)
+        self.assertEqual(len(profiler.pages), 4)
+
+    def test_streamed_build_is_profiled(self):
+        profiler = Profiler()
+        activate(profiler)
+        with mock.patch("builtins.print"):
+            generate_pages(self.pages, "/", memory_budget=MemoryBudget(1 << 40))
+        self.assertEqual(profiler.counters["blocks.heading"], 4)
+        self.assertEqual(profiler.counters["blocks.paragraph"], 4)
+        self.assertGreater(profiler.counters["bytes_read"], 0)
+        self.assertGreater(profiler.counters["bytes_written"], 0)
+        phases = [line.split()[0] for line in profiler.report().splitlines()[1:5]]
+        self.assertEqual(phases, ["read", "stream", "iter_blocks", "text_to_textnodes"])
+
+
+if __name__ == "__main__":
+    unittest.main()
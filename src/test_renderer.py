@@ -0,0 +1,61 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from simple_static_gen.block_markdown import markdown_to_html_node
+from simple_static_gen.renderer import Renderer, render_many
+from simple_static_gen.template import Template
+from testutil import TempDirTestCase
+
+DOCS = [
+    f"# Post {i}\n\nSee [home](/) and **bold** text.\n\n> Shared disclaimer\n\n- a\n- b"
+    for i in range(20)
+]
+
+
+class TestRenderer(TempDirTestCase):
+    def test_matches_markdown_to_html_node(self):
+        renderer = Renderer()
+        for markdown in DOCS[:3]:
+            self.assertEqual(renderer.render(markdown), markdown_to_html_node(markdown).to_html())
+        self.assertGreater(renderer.fragments.hits, 0)
+
+    def test_template_and_basepath(self):
+        renderer = Renderer(Template('<title>{{ Title }}</title><a href="/">{{ Content }}</a>'),
+                            "/blog/")
+        self.assertEqual(
+            renderer.render("---\ntitle: Front\n---\n# Heading\n\n[x](/x)"),
+            '<title>Front</title><a href="/blog/">'
+            '<div><h1>Heading</h1><p><a href="/blog/x">x</a></p></div></a>',
+        )
+        with self.assertRaises(Exception):
+            renderer.render("No title")
+
+    def test_template_path(self):
+        path = self.write("template.html", '<link href="/index.css">{{ Title }}')
+        self.assertEqual(Renderer(path, "/site/").render("# Hi"),
+                         '<link href="/site/index.css">Hi')
+
+    def test_render_many_threads(self):
+        renderer = Renderer(basepath="/blog/")
+        expected = [Renderer(basepath="/blog/").render(markdown) for markdown in DOCS]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            batches = list(executor.map(lambda _: renderer.render_many(DOCS), range(8)))
+        self.assertEqual(batches, [expected] * 8)
+
+    def test_render_many_processes(self):
+        expected = render_many(DOCS, basepath="/blog/")
+        with Renderer(basepath="/blog/", processes=2) as renderer:
+            self.assertEqual(renderer.render_many(DOCS, batch_size=3), expected)
+            # The pool is kept for the next batch
+            self.assertEqual(renderer.render_many(DOCS[::-1], batch_size=3), expected[::-1])
+        self.assertIsNone(renderer._pool)
+
+    def test_template_in_processes(self):
+        template = Template('<a href="/">{{ Content }}</a>')
+        expected = Renderer(template, "/blog/").render_many(DOCS)
+        with Renderer(template, "/blog/", processes=2) as renderer:
+            self.assertEqual(renderer.render_many(DOCS, batch_size=3), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import threading
+import unittest
+import urllib.request
+from functools import partial
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+from simple_static_gen import main, server
+from simple_static_gen.server import (
+    DevRequestHandler,
+    InotifyWatcher,
+    LiveReloadState,
+    PollingWatcher,
+    SiteRebuilder,
+)
+from testutil import TempDirTestCase
+
+
+class ServerTestCase(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp, "content")
+        self.static = os.path.join(self.tmp, "static")
+        self.docs = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.write(self.template, "<body>{{ Content }}</body><!-- {{ Title }} -->")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+
+
+class TestSiteRebuilder(ServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rebuilder = SiteRebuilder(
+            self.content, self.static, self.template, self.docs, "/",
+            os.path.join(self.tmp, "manifest.json"),
+        )
+        self.print_patch = mock.patch("builtins.print")
+        self.print_patch.start()
+        self.rebuilder.build_all()
+
+    def tearDown(self):
+        self.print_patch.stop()
+        super().tearDown()
+
+    def test_rebuilds_only_changed_page(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "# Edited")
+        with mock.patch.object(server, "generate_page", wraps=main.generate_page) as generate:
+            self.rebuilder.rebuild({post})
+        self.assertEqual(generate.call_count, 1)
+        self.assertIn("<h1>Edited</h1>", self.read(os.path.join(self.docs, "blog", "post.html")))
+
+    def test_removed_page_and_asset(self):
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.rebuilder.rebuild({
+            os.path.join(self.content, "blog", "post.md"),
+            os.path.join(self.static, "index.css"),
+        })
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "index.css")))
+
+    def test_changed_asset_is_copied(self):
+        css = os.path.join(self.static, "index.css")
+        self.write(css, "body { margin: 0 }")
+        self.rebuilder.rebuild({css})
+        self.assertEqual(self.read(os.path.join(self.docs, "index.css")), "body { margin: 0 }")
+
+    def test_front_matter_template_change_rebuilds(self):
+        wide = os.path.join(self.tmp, "wide.html")
+        self.write(wide, "<main>{{ Content }}</main>")
+        post = os.path.join(self.content, "blog", "post.md")
+        self.write(post, "---\ntemplate: wide.html\n---\n# Post")
+        self.rebuilder.rebuild({post})
+        self.write(wide, "<main class=\"wide\">{{ Content }}</main>")
+        self.rebuilder.rebuild({wide})
+        self.assertIn('<main class="wide">', self.read(self.docs, "blog", "post.html"))
+
+
+class TestWatchers(ServerTestCase):
+    def check_watcher(self, watcher, path):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(watcher.wait()))
+        thread.start()
+        threading.Timer(0.05, self.write, (path, "# Edited")).start()
+        thread.join(timeout=5)
+        self.assertTrue(result)
+        self.assertIn(os.path.normpath(path), result[0])
+
+    def paths(self):
+        return [self.content, os.path.join(self.tmp, "*.html")]
+
+    def test_polling_watcher(self):
+        watcher = PollingWatcher(self.paths(), interval=0.02)
+        self.check_watcher(watcher, os.path.join(self.content, "blog", "post.md"))
+        self.check_watcher(watcher, os.path.join(self.tmp, "wide.html"))
+
+    def test_inotify_watcher(self):
+        try:
+            watcher = InotifyWatcher(self.paths())
+        except (OSError, AttributeError):
+            self.skipTest("inotify is not available")
+        self.addCleanup(watcher.close)
+        self.check_watcher(watcher, os.path.join(self.content, "blog", "post.md"))
+        self.check_watcher(watcher, os.path.join(self.tmp, "wide.html"))
+
+
+class TestDevRequestHandler(ServerTestCase):
+    def test_livereload_script_injected(self):
+        self.write(os.path.join(self.docs, "index.html"), "<body><p>Hi</p></body>")
+        livereload = LiveReloadState()
+        handler = partial(DevRequestHandler, directory=self.docs, livereload=livereload)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with mock.patch("sys.stderr"):
+                page = urllib.request.urlopen(url + "/").read().decode()
+                livereload.bump()
+                generation = urllib.request.urlopen(url + "/__livereload?since=0").read()
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertIn("<p>Hi</p><script>", page)
+        self.assertEqual(generation, b"1")
+
+    def test_directory_without_slash_redirects(self):
+        self.write(os.path.join(self.docs, "blog", "index.html"), "<body></body>")
+        handler = partial(DevRequestHandler, directory=self.docs, livereload=LiveReloadState())
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}"
+            with mock.patch("sys.stderr"):
+                response = urllib.request.urlopen(url + "/blog")
+        finally:
+            server.shutdown()
+            server.server_close()
+        self.assertEqual(response.url, url + "/blog/")
+
+
+if __name__ == "__main__":
+    unittest.main()
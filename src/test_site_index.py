@@ -0,0 +1,115 @@
+import os
+import shutil
+import unittest
+from unittest import mock
+
+from simple_static_gen.main import build_incremental, clear_template_cache
+from simple_static_gen.site_index import SiteIndex, build_collections, page_url
+from testutil import TempDirTestCase
+
+
+class TestCollections(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.tmp, "content")
+        self.docs = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.index_path = os.path.join(self.tmp, "index.json")
+        self.write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        self.write(os.path.join(self.content, "index.md"), "# Home")
+        for i in range(12):
+            self.write(
+                os.path.join(self.content, "blog", f"post{i:02}", "index.md"),
+                f"---\ndate: 2024-01-{i + 1:02}\ntags: [{'even' if i % 2 == 0 else 'odd'}]\n---\n"
+                f"# Post {i}\n\nBody",
+            )
+        self.print_patch = mock.patch("builtins.print")
+        self.print_patch.start()
+
+    def tearDown(self):
+        self.print_patch.stop()
+        clear_template_cache()
+
+    def build(self, site_url="https://example.com"):
+        index = SiteIndex.load(self.index_path)
+        build_incremental(
+            self.content, os.path.join(self.tmp, "static"), self.template, self.docs, "/site/",
+            os.path.join(self.tmp, "manifest.json"), index=index, site_url=site_url, page_size=5,
+        )
+        return index
+
+    def test_paginated_section_listing(self):
+        self.build()
+        first = self.read(self.docs, "blog", "index.html")
+        self.assertIn("<title>Blog</title>", first)
+        self.assertIn('<a href="/site/blog/post11/">Post 11</a>', first)
+        self.assertNotIn("Post 6<", first)
+        self.assertIn('<a href="/site/blog/page/2/" rel="next">Older</a>', first)
+        last = self.read(self.docs, "blog", "page", "3", "index.html")
+        self.assertIn("Post 0<", last)
+        self.assertNotIn("Older", last)
+
+    def test_tags_feed_and_sitemap(self):
+        self.build()
+        self.assertIn("Post 10", self.read(self.docs, "tags", "even", "index.html"))
+        self.assertNotIn("Post 11", self.read(self.docs, "tags", "even", "index.html"))
+        feed = self.read(self.docs, "feed.xml")
+        self.assertIn("<link>https://example.com/site/blog/post11/</link>", feed)
+        self.assertNotIn("<guid>https://example.com/site/</guid>", feed)
+        sitemap = self.read(self.docs, "sitemap.xml")
+        self.assertIn("<loc>https://example.com/site/blog/page/2/</loc>", sitemap)
+        self.assertIn("<loc>https://example.com/site/</loc>", sitemap)
+
+    def test_tags_with_the_same_slug(self):
+        self.write(
+            os.path.join(self.content, "langs.md"), "---\ntags: [C++, C, ???]\n---\n# Languages"
+        )
+        self.build()
+        tags = os.path.join(self.docs, "tags")
+        self.assertIn("Tagged: C<", self.read(tags, "c", "index.html"))
+        hashed = [name for name in os.listdir(tags) if name.startswith("c-")]
+        self.assertEqual(len(hashed), 1)
+        self.assertIn("Tagged: C++", self.read(tags, hashed[0], "index.html"))
+        self.assertFalse(os.path.exists(os.path.join(tags, "index.html")))
+
+    def test_toml_tags_that_are_not_strings(self):
+        self.write(os.path.join(self.content, "year.md"), "+++\ntags = [2024]\n+++\n# Year")
+        self.write(os.path.join(self.content, "lone.md"), "+++\ntags = 7\n+++\n# Lone")
+        self.build()
+        self.assertIn("Year", self.read(self.docs, "tags", "2024", "index.html"))
+        self.assertIn("Lone", self.read(self.docs, "tags", "7", "index.html"))
+
+    def test_unchanged_index_writes_nothing(self):
+        self.build()
+        clear_template_cache()
+        index = SiteIndex.load(self.index_path)
+        outputs = build_collections(
+            index, self.content, self.docs, self.template, "/site/", "https://example.com", 5
+        )
+        self.assertEqual(outputs, [])
+
+    def test_listings_follow_index_changes(self):
+        self.build()
+        shutil.rmtree(os.path.join(self.content, "blog", "post11"))
+        self.write(
+            os.path.join(self.content, "blog", "post00", "index.md"), "# Renamed\n\nBody"
+        )
+        clear_template_cache()
+        index = self.build(site_url=None)
+        listing = self.read(self.docs, "blog", "index.html")
+        self.assertNotIn("Post 11", listing)
+        # Without a date in its front matter, the page is dated by its mtime
+        self.assertIn("Renamed", listing)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "feed.xml")))
+        self.assertEqual(len(index.pages), 12)
+        # The index is read back by the next build instead of parsing pages again
+        self.assertEqual(SiteIndex.load(self.index_path).pages, index.pages)
+
+    def test_page_url(self):
+        self.assertEqual(page_url(os.path.join("docs", "index.html"), "docs"), "/")
+        self.assertEqual(page_url(os.path.join("docs", "a", "index.html"), "docs"), "/a/")
+        self.assertEqual(page_url(os.path.join("docs", "a", "b.html"), "docs"), "/a/b.html")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import unittest
+from unittest import mock
+
+from simple_static_gen.sync import (
+    copy_file,
+    sync_tree,
+    write_counts,
+    write_if_changed,
+    write_stream_if_changed,
+)
+from testutil import TempDirTestCase
+
+
+class TestSyncTree(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp, "static")
+        self.dst = os.path.join(self.tmp, "docs")
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "tom.png"), "png bytes")
+        self.print_patch = mock.patch("builtins.print")
+        self.print_patch.start()
+
+    def tearDown(self):
+        self.print_patch.stop()
+
+    def test_first_sync_copies_everything(self):
+        result = sync_tree(self.src, self.dst)
+        self.assertEqual(len(result.copied), 2)
+        self.assertEqual(self.read(os.path.join(self.dst, "images", "tom.png")), "png bytes")
+
+    def test_copy_preserves_mtime(self):
+        sync_tree(self.src, self.dst)
+        self.assertEqual(
+            os.stat(os.path.join(self.src, "index.css")).st_mtime_ns,
+            os.stat(os.path.join(self.dst, "index.css")).st_mtime_ns,
+        )
+
+    def test_second_sync_copies_nothing(self):
+        sync_tree(self.src, self.dst)
+        result = sync_tree(self.src, self.dst)
+        self.assertEqual((result.copied, result.unchanged, result.removed), ([], 2, []))
+
+    def test_changed_file_is_copied(self):
+        sync_tree(self.src, self.dst)
+        self.write(os.path.join(self.src, "index.css"), "body { margin: 0 }")
+        result = sync_tree(self.src, self.dst)
+        self.assertEqual(result.copied, [os.path.join(self.dst, "index.css")])
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "body { margin: 0 }")
+
+    def test_checksum_detects_same_size_change(self):
+        sync_tree(self.src, self.dst)
+        css = os.path.join(self.src, "index.css")
+        mtime_ns = os.stat(css).st_mtime_ns
+        self.write(css, "body []")
+        os.utime(css, ns=(mtime_ns, mtime_ns))
+        self.assertEqual(sync_tree(self.src, self.dst).copied, [])
+        self.assertEqual(len(sync_tree(self.src, self.dst, checksum=True).copied), 1)
+
+    def test_orphans_removed_but_kept_paths_stay(self):
+        sync_tree(self.src, self.dst)
+        page = os.path.join(self.dst, "blog", "index.html")
+        self.write(page, "<p>page</p>")
+        self.write(os.path.join(self.dst, "old", "stale.css"), "")
+        os.remove(os.path.join(self.src, "images", "tom.png"))
+        result = sync_tree(self.src, self.dst, keep=[page])
+        self.assertEqual(len(result.removed), 2)
+        self.assertTrue(os.path.exists(page))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "old")))
+        self.assertFalse(os.path.exists(os.path.join(self.dst, "images")))
+
+    def test_copy_file_link(self):
+        src = os.path.join(self.src, "index.css")
+        dst = os.path.join(self.dst, "index.css")
+        copy_file(src, dst, link=True)
+        self.assertEqual(self.read(dst), "body {}")
+
+
+
+class TestWriteIfChanged(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.tmp, "out", "index.html")
+        write_counts.take()
+
+    def test_unchanged_file_is_not_written(self):
+        self.assertTrue(write_if_changed(self.path, b"<p>hello</p>"))
+        os.utime(self.path, ns=(1_000_000_000, 1_000_000_000))
+        self.assertFalse(write_if_changed(self.path, b"<p>hello</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(write_counts.take(), (1, 1))
+
+    def test_changed_file_is_written(self):
+        write_if_changed(self.path, b"<p>hello</p>")
+        # Same size, different bytes
+        self.assertTrue(write_if_changed(self.path, b"<p>jello</p>"))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>jello</p>")
+        self.assertEqual(write_counts.take(), (2, 0))
+
+    def test_streamed_output(self):
+        def write(f):
+            f.write("<p>")
+            f.write("héllo</p>")
+
+        self.assertTrue(write_stream_if_changed(self.path, write))
+        os.utime(self.path, ns=(1_000_000_000, 1_000_000_000))
+        self.assertFalse(write_stream_if_changed(self.path, write))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+        self.assertFalse(write_if_changed(self.path, "<p>héllo</p>".encode()))
+        self.assertTrue(write_stream_if_changed(self.path, lambda f: f.write("<p>bye</p>")))
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>bye</p>")
+        self.assertEqual(write_counts.take(), (2, 2))
+
+    def test_failed_stream_leaves_output_alone(self):
+        write_if_changed(self.path, b"<p>hello</p>")
+
+        def write(f):
+            f.write("<p>partial")
+            raise ValueError("bad block")
+
+        with self.assertRaises(ValueError):
+            write_stream_if_changed(self.path, write)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), b"<p>hello</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["index.html"])
+
+
+if __name__ == "__main__":
+    unittest.main()
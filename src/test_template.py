@@ -0,0 +1,117 @@
+import io
+import os
+import unittest
+
+from simple_static_gen.htmlnode import LeafNode, ParentNode, rewrite_urls
+from simple_static_gen.template import (
+    Template,
+    basepath_rewriter,
+    clear_template_cache,
+    load_template,
+    resolve_template,
+)
+from testutil import TempDirTestCase
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>Body</p>"),
+            "<title>Hi</title><main><p>Body</p></main>",
+        )
+
+    def test_render_repeated_slot(self):
+        template = Template("{{ Title }} | {{Title}}")
+        self.assertEqual(template.render(Title="Hi"), "Hi | Hi")
+
+    def test_unknown_slot_passes_through(self):
+        template = Template("<h1>{{ Title }}</h1><script>{{ other }} {{count}}</script>")
+        self.assertEqual(
+            template.render(Title="Hi"), "<h1>Hi</h1><script>{{ other }} {{count}}</script>"
+        )
+        out = io.StringIO()
+        template.write(out, Title="Hi")
+        self.assertEqual(out.getvalue(), template.render(Title="Hi"))
+
+    def test_write_matches_render(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>{{Title}}")
+        out = io.StringIO()
+        template.write(out, Title="Hi", Content=lambda fp: fp.writelines(["<p>", "Body</p>"]))
+        self.assertEqual(out.getvalue(), template.render(Title="Hi", Content="<p>Body</p>"))
+
+    def test_template_urls_rewritten(self):
+        template = Template(
+            '<link href="/index.css"><img src="/a.png"><a href="https://x.com/">{{ Content }}',
+            basepath_rewriter("/site/"),
+        )
+        self.assertEqual(
+            template.render(Content='<a href="/raw">'),
+            '<link href="/site/index.css"><img src="/site/a.png">'
+            '<a href="https://x.com/"><a href="/raw">',
+        )
+
+    def test_with_rewriter_starts_from_the_text(self):
+        template = Template('<a href="/a">{{ Content }}', basepath_rewriter("/site/"))
+        self.assertEqual(template.with_rewriter(basepath_rewriter("/blog/")).render(),
+                         '<a href="/blog/a">{{ Content }}')
+        self.assertEqual(template.with_rewriter(None).render(), '<a href="/a">{{ Content }}')
+
+    def test_basepath_rewriter(self):
+        rewrite = basepath_rewriter("/site")
+        self.assertEqual(rewrite("/about"), "/site/about")
+        self.assertEqual(rewrite("/"), "/site/")
+        self.assertEqual(rewrite("//cdn.example.com/a.js"), "//cdn.example.com/a.js")
+        self.assertEqual(rewrite("relative/page"), "relative/page")
+        self.assertEqual(rewrite("https://example.com/"), "https://example.com/")
+
+    def test_rewrite_urls(self):
+        node = ParentNode(
+            "p",
+            [
+                LeafNode("a", "home", {"href": "/"}),
+                LeafNode("img", "", {"src": "/images/tom.png", "alt": "/not-a-url"}),
+                LeafNode(None, 'text mentioning href="/"'),
+            ],
+        )
+        rewrite_urls(node, basepath_rewriter("/site/"))
+        self.assertEqual(
+            node.to_html(),
+            '<p><a href="/site/">home</a><img src="/site/images/tom.png" alt="/not-a-url"></img>'
+            'text mentioning href="/"</p>',
+        )
+
+
+class TestLoadTemplate(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        clear_template_cache()
+
+    def tearDown(self):
+        clear_template_cache()
+
+    def test_load_template_cached_until_cleared(self):
+        path = os.path.join(self.tmp, "template.html")
+        self.write(path, "one {{ Content }}")
+        first = load_template(path)
+        self.write(path, "two {{ Content }}")
+        self.assertIs(load_template(path), first)
+        clear_template_cache()
+        self.assertEqual(load_template(path).render(Content="x"), "two x")
+
+    def test_resolve_template(self):
+        content = os.path.join(self.tmp, "content")
+        default = os.path.join(self.tmp, "template.html")
+        blog_template = os.path.join(content, "blog", "template.html")
+        self.write(blog_template, "{{ Content }}")
+        self.assertEqual(
+            resolve_template(os.path.join(content, "index.md"), content, default), default
+        )
+        self.assertEqual(
+            resolve_template(os.path.join(content, "blog", "post", "index.md"), content, default),
+            blog_template,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
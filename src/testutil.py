@@ -0,0 +1,28 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+
+class TempDirTestCase(unittest.TestCase):
+    """
+    A test case working in a temporary directory, self.tmp, made before each
+    test and removed after it. Relative paths given to write and read are
+    taken from self.tmp.
+    """
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, path, data):
+        """Write text or bytes to path, making its directory, and return the path."""
+        path = os.path.join(self.tmp, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        return path
+
+    def read(self, *parts):
+        with open(os.path.join(self.tmp, *parts)) as f:
+            return f.read()